@@ -1,95 +1,472 @@
-from fastapi import FastAPI, UploadFile, Form
+from functools import lru_cache
 from pathlib import Path
-from src.data_loader import read_file
-from src.similarity import DualSimilarity
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-from PyPDF2 import PdfReader
-from fastapi import HTTPException
-from src.data_loader import read_file
+from typing import List, Optional
 
+from fastapi import FastAPI, File, Form, Response, UploadFile, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from src.data_loader import read_bytes
+from src.deadline import NO_DEADLINE, Deadline, DeadlineExceeded
+from src.pipeline import Analysis, MANY_STAGES, SCORE_STAGES, analyze_batch, analyze_many, get_similarity, parse_stages
+from src.job_scraper import fetch
+from src.skill_index import QueryError, SkillIndex
+from src.suggester import rewrite_cache, stream_rewrites  # Import the suggester functions
+from src import metrics
+from src.cache import LRUCache, SQLiteCache, TieredCache, make_key, model_version
+from src.config import (
+    API_EXECUTOR, API_MAX_WORKERS, API_MAX_QUEUE, API_BATCH_MAX_JOBS, API_DEADLINE_MS, SKILL_INDEX_DIR,
+    API_RESPONSE_CACHE_SIZE, API_RESPONSE_CACHE_TTL, API_RESPONSE_CACHE_MAX_ENTRIES, API_RESPONSE_CACHE_PATH,
+    CLASSIFY_MODEL, EARLY_EXIT_GATE, HF_MODEL_EMBED,
+    JOB_DB_PATH, JOB_WORKERS, JOB_BATCH_SIZE, JOB_RESULT_TTL, JOB_MAX_QUEUED,
+)
+from backend.executor import StageExecutor, Overloaded
+from backend.jobs import JobError, JobStore, JobWorkerPool
 
-
-from fastapi import FastAPI, UploadFile, HTTPException
-from pathlib import Path
-from src.data_loader import read_file
-from src.similarity import DualSimilarity
-from src.suggester import suggest_resume  # Import the suggester function
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+log = logging.getLogger(__name__)
 
 app = FastAPI()
 
-# Load the trained model and tokenizer
-model_path = "models/resume-fit"
-tokenizer = AutoTokenizer.from_pretrained(model_path)
-model = AutoModelForSequenceClassification.from_pretrained(model_path)
+# Load SBERT once for all requests (the classifier loads with src.suggester)
+get_similarity()
+
+# Blocking model work runs here, never on the event loop
+executor = StageExecutor(API_EXECUTOR, max_workers=API_MAX_WORKERS, max_queue=API_MAX_QUEUE)
+
+
+def _run_job_batch(kind: str, payloads: list) -> list:
+    """Job handler: kind is the comma-joined stage list shared by the batch."""
+    metrics.BATCH_SIZE.observe(len(payloads), kind="job")
+    # an unreadable upload fails its own job, not the rest of the batch
+    results, pairs = [], []
+    for p in payloads:
+        try:
+            pairs.append((
+                read_bytes(base64.b64decode(p["resume"]), p["resume_name"]),
+                read_bytes(base64.b64decode(p["job"]), p["job_name"]),
+            ))
+            results.append(None)
+        except Exception as e:
+            results.append(JobError(f"{type(e).__name__}: {e}"))
+    analysed = iter(analyze_batch(pairs, kind.split(",")) if pairs else [])
+    return [next(analysed) if r is None else r for r in results]
+
+
+# Long analyses: SQLite job store + local worker threads (started per process)
+job_store = JobStore(JOB_DB_PATH, result_ttl=JOB_RESULT_TTL)
+job_pool = JobWorkerPool(job_store, _run_job_batch, workers=JOB_WORKERS, batch_size=JOB_BATCH_SIZE)
+
+# Queue depths and cache effectiveness, read when /metrics is scraped
+metrics.gauge("resume_executor_in_flight", "Stage calls running or waiting in the executor", lambda: executor.in_flight)
+metrics.gauge("resume_executor_queued", "Stage calls waiting for a free worker", lambda: executor.queued)
+metrics.gauge("resume_jobs_queued", "Background jobs waiting to be claimed", job_store.queued)
+metrics.gauge("resume_rewrite_cache_lookups", "Rewrite cache lookups by outcome", lambda: rewrite_cache().stats, label="result")
+metrics.gauge("resume_rewrite_cache_hit_rate", "Share of rewrite cache lookups served from a tier", lambda: rewrite_cache().hit_rate)
+
+# Identical resubmissions to /analyze/ and /score: the SQLite tier is shared,
+# so a result computed by one worker is served by all of them
+response_cache = TieredCache(
+    LRUCache(API_RESPONSE_CACHE_SIZE, ttl=API_RESPONSE_CACHE_TTL),
+    SQLiteCache(API_RESPONSE_CACHE_PATH, ttl=API_RESPONSE_CACHE_TTL, max_entries=API_RESPONSE_CACHE_MAX_ENTRIES),
+)
+metrics.gauge("resume_response_cache_lookups", "Response cache lookups by outcome", lambda: response_cache.stats, label="result")
+
+
+@lru_cache(maxsize=1)
+def _model_versions() -> tuple:
+    from src.parser import nlp
+    return (
+        model_version(HF_MODEL_EMBED), model_version(CLASSIFY_MODEL), model_version(EARLY_EXIT_GATE),
+        f"{nlp.meta['name']}@{nlp.meta['version']}",
+    )
+
+
+def _response_key(endpoint: str, resume_bytes: bytes, resume_name: str, job_bytes: bytes, job_name: str,
+                  **options) -> str:
+    # the file extension picks the extractor, so it is part of the content's identity
+    def content(data: bytes, name: str) -> str:
+        return f"{hashlib.sha256(data).hexdigest()}{Path(name or '').suffix.lower()}"
+
+    return make_key(
+        endpoint, content(resume_bytes, resume_name), content(job_bytes, job_name), options, _model_versions(),
+    )
+
+
+def _run_and_store(key: str, fn, *args):
+    """Runs in the executor, so the SQLite write stays off the event loop."""
+    result = fn(*args)
+    if not result.get("degraded"):      # a later request with more time gets the full answer
+        response_cache.set(key, result)
+    return result
+
+
+async def _cached_offload(response: Response, key: str, fn, *args):
+    # a memory hit would be fine on the loop, but a miss falls through to SQLite,
+    # so the lookup takes a thread hop (default pool, not the stage executor)
+    hit = await asyncio.to_thread(response_cache.get, key)
+    response.headers["X-Cache"] = "hit" if hit is not None else "miss"
+    if hit is not None:
+        return hit
+    return await _offload(_run_and_store, key, fn, *args)
+
+
+@app.on_event("startup")
+def _start_job_pool():
+    job_pool.start()
+
+
+@app.on_event("shutdown")
+def _shutdown_executor():
+    job_pool.stop()
+    executor.shutdown()
+
+
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Server busy, retry shortly", headers={"Retry-After": "2"})
+
+
+async def _offload(fn, *args):
+    """
+    Run fn in the stage executor; 503 + Retry-After when the queue is full,
+    504 when the request's time budget ran out before anything could be scored.
+    """
+    try:
+        return await executor.run(fn, *args)
+    except Overloaded:
+        raise _busy()
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+def _deadline(budget_ms: Optional[float]) -> Deadline:
+    """Time budget of a request, counted from its arrival (queueing included)."""
+    return Deadline.after_ms(API_DEADLINE_MS if budget_ms is None else budget_ms)
+
+
+def _run_analysis(
+    resume_bytes: bytes, resume_name: str, job_bytes: bytes, job_name: str, stages: tuple,
+    incremental: bool = False, cascade: bool = False, deadline: Deadline = NO_DEADLINE,
+) -> dict:
+    """Blocking pipeline for /analyze/ and /score (runs inside the executor)."""
+    # Parse the uploads in memory
+    resume_text = read_bytes(resume_bytes, resume_name, deadline)
+    job_text = read_bytes(job_bytes, job_name, deadline)
+
+    log.debug("extracted resume text (%d chars): %.500s", len(resume_text), resume_text)
+    log.debug("extracted job text (%d chars): %.500s", len(job_text), job_text)
+
+    # Each requested stage runs once; suggestions reuse the fit and gaps results
+    return Analysis(
+        resume_text, job_text, incremental=incremental, cascade=cascade, deadline=deadline,
+    ).result(stages)
+
+
+def _stages_or_400(spec: str) -> tuple:
+    try:
+        return parse_stages(spec)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _run_stage(analysis: Analysis, stage: str):
+    """
+    One stage for /analyze/stream. The analysis is returned too, so a
+    process pool hands back the copy that now caches this stage's result.
+    """
+    fields = analysis.stage_result(stage)
+    if analysis.skipped(stage):
+        fields = {**fields, "skipped": True}
+    return analysis, fields
+
+
+def _start_analysis(
+    resume_bytes: bytes, resume_name: str, job_bytes: bytes, job_name: str,
+    incremental: bool = False, cascade: bool = False, deadline: Deadline = NO_DEADLINE,
+) -> Analysis:
+    return Analysis(
+        read_bytes(resume_bytes, resume_name, deadline), read_bytes(job_bytes, job_name, deadline),
+        incremental=incremental, cascade=cascade, deadline=deadline,
+    )
+
+
+def _format_event(name: str, data: dict, fmt: str) -> str:
+    if fmt == "sse":
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": name, **data}) + "\n"
+
+
+@app.get("/health")
+async def health():
+    """Answered on the event loop, so it stays responsive under load."""
+    return {
+        "status": "ok",
+        "in_flight": executor.in_flight,
+        "queued": executor.queued,
+        "max_workers": executor.max_workers,
+        "max_queue": executor.max_queue,
+    }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape target (stage latencies, batch sizes, queues, cache)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.post("/analyze/")
-async def analyze(resume: UploadFile, job: UploadFile):
-    # Save uploaded files temporarily
-    resume_path = Path(f"temp_{resume.filename}")
-    job_path = Path(f"temp_{job.filename}")
+async def analyze(
+    response: Response, resume: UploadFile, job: UploadFile, stages: str = "all",
+    incremental: bool = False, cascade: bool = False, budget_ms: Optional[float] = None,
+):
+    """
+    Full analysis by default; `?stages=similarity,gaps` runs only the named
+    stages (similarity, fit, gaps, suggestions). `?incremental=true` reuses
+    cached résumé sections from earlier scans (edit → re-scan loops).
+    `?cascade=true` lets the early-exit gate skip fit/gaps/suggestions for
+    clear mismatches and near-perfect matches (see `skipped_stages`).
+    Repeated identical requests are answered from the response cache
+    (`X-Cache: hit`). `?budget_ms=` (default API_DEADLINE_MS) bounds the
+    request: stages that no longer fit are skipped and the result is marked
+    `degraded`.
+    """
+    deadline = _deadline(budget_ms)
+    wanted = _stages_or_400(stages)
+    resume_bytes = await resume.read()
+    job_bytes = await job.read()
+    key = _response_key(
+        "analyze", resume_bytes, resume.filename, job_bytes, job.filename,
+        stages=wanted, incremental=incremental, cascade=cascade,
+    )
+    return await _cached_offload(
+        response, key,
+        _run_analysis, resume_bytes, resume.filename, job_bytes, job.filename, wanted, incremental, cascade,
+        deadline,
+    )
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(
+    resume: UploadFile, job: UploadFile, stages: str = "all", format: str = "ndjson",
+    incremental: bool = False, cascade: bool = False, budget_ms: Optional[float] = None,
+):
+    """
+    Progressive /analyze/: one event per stage, sent as soon as that stage
+    finishes ("extracted", then "similarity", "fit", "gaps", "suggestions",
+    then "done"). format=ndjson (one JSON object per line) or format=sse.
+    Stages skipped by the early-exit gate (`?cascade=true`) or for lack of
+    time (`?budget_ms=`) carry "skipped": true; "done" reports `degraded`.
+    """
+    deadline = _deadline(budget_ms)
+    wanted = _stages_or_400(stages)
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    t0 = time.perf_counter()
+    # extraction runs before the response starts, so overload is still a plain 503
+    analysis = await _offload(
+        _start_analysis, await resume.read(), resume.filename, await job.read(), job.filename,
+        incremental, cascade, deadline,
+    )
+
+    async def events():
+        nonlocal analysis
+        yield _format_event("extracted", {
+            "resume_chars": len(analysis.resume_text),
+            "job_chars": len(analysis.job_text),
+            "elapsed_ms": (time.perf_counter() - t0) * 1000,
+        }, format)
+        for stage in wanted:
+            try:
+                analysis, fields = await executor.run(_run_stage, analysis, stage)
+            except Overloaded:
+                yield _format_event("error", {"stage": stage, "status": 503, "detail": "Server busy"}, format)
+                return
+            except Exception as e:
+                yield _format_event("error", {"stage": stage, "status": 500, "detail": str(e)}, format)
+                return
+            yield _format_event(stage, {**fields, "elapsed_ms": (time.perf_counter() - t0) * 1000}, format)
+        yield _format_event("done", {
+            "elapsed_ms": (time.perf_counter() - t0) * 1000,
+            "degraded": bool(analysis.timed_out),
+        }, format)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+def _run_many(
+    resume_bytes: bytes, resume_name: str, job_files: list, job_texts: list, job_urls: list, stages: tuple,
+    deadline: Deadline = NO_DEADLINE,
+) -> dict:
+    """
+    Blocking part of /analyze/batch: extract and fetch every job, then rank.
+    Job files and postings not read before the deadline are reported in
+    `failed`; fit and gaps are skipped if ranking would overrun it.
+    """
+    resume_text = read_bytes(resume_bytes, resume_name, deadline)
+    sources, texts, failed = [], [], []
+    for data, name in job_files:
+        try:
+            text = read_bytes(data, name, deadline)
+        except DeadlineExceeded as e:
+            failed.append({"source": name, "error": f"{type(e).__name__}: {e}"})
+            continue
+        sources.append(name)
+        texts.append(text)
+    for i, text in enumerate(job_texts):
+        sources.append(f"text[{i}]")
+        texts.append(text)
+    for url in job_urls:
+        try:
+            text = fetch(url, deadline)
+        except Exception as e:
+            failed.append({"source": url, "error": f"{type(e).__name__}: {e}"})
+            continue
+        if not text:
+            failed.append({"source": url, "error": "no job description text found"})
+            continue
+        sources.append(url)
+        texts.append(text)
+
+    results = analyze_many(resume_text, texts, stages, deadline=deadline)
+    for r in results:
+        r["source"] = sources[r["index"]]
+    return {"count": len(results), "results": results, "failed": failed}
+
+
+@app.post("/analyze/batch")
+async def analyze_batch_endpoint(
+    resume: UploadFile,
+    jobs: List[UploadFile] = File(default=[]),
+    job_texts: List[str] = Form(default=[]),
+    job_urls: List[str] = Form(default=[]),
+    stages: str = ",".join(MANY_STAGES),
+    budget_ms: Optional[float] = None,
+):
+    """
+    One résumé against many job descriptions (uploaded files, pasted texts
+    and/or posting URLs), ranked best match first. The résumé is parsed,
+    embedded and tokenized once; each stage runs as one batched pass.
+    `?budget_ms=` bounds extraction and fetching; results ranked without
+    the fit or gaps pass for lack of time carry `degraded: true`.
+    """
+    deadline = _deadline(budget_ms)
+    wanted = _stages_or_400(stages)
+    total = len(jobs) + len(job_texts) + len(job_urls)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="Provide at least one of jobs, job_texts or job_urls")
+    if total > API_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=413, detail=f"At most {API_BATCH_MAX_JOBS} job descriptions per request")
+    job_files = [(await f.read(), f.filename) for f in jobs]
+    return await _offload(
+        _run_many, await resume.read(), resume.filename, job_files, job_texts, job_urls, wanted, deadline,
+    )
 
+
+@lru_cache(maxsize=1)
+def _skill_index() -> SkillIndex:
+    return SkillIndex.load(SKILL_INDEX_DIR)
+
+
+@app.get("/candidates/search")
+def search_candidates(q: str, limit: int = 100):
+    """
+    Boolean skill/keyword search over Resume_Database, e.g.
+    `?q=python AND kubernetes NOT intern`. Needs `python -m src.skill_index build`.
+    """
     try:
-        # Write the uploaded files to disk
-        with open(resume_path, "wb") as f:
-            f.write(await resume.read())
-        with open(job_path, "wb") as f:
-            f.write(await job.read())
-
-        # Use read_file to parse the files
-        resume_text = read_file(resume_path)
-        job_text = read_file(job_path)
-
-        # Debugging: Print extracted text
-        print(f"Extracted Resume Text (first 500 chars): {resume_text[:500]}")
-        print(f"Extracted Job Text (first 500 chars): {job_text[:500]}")
-
-        # Predict fit score
-        tf, sb = DualSimilarity(hf_model="sentence-transformers/all-MiniLM-L6-v2").score(resume_text, job_text)
-
-        inputs = tokenizer(
-            resume_text,
-            job_text,
-            truncation=True,
-            padding="max_length",
-            max_length=512,
-            return_tensors="pt",
-        )
-        with torch.no_grad():
-            
-            outputs = model(**inputs)
-            logits = outputs.logits
-            predicted_class = torch.argmax(logits, dim=1).item()
-
-        # Generate suggestions using suggester.py
-        markdown, keywords = suggest_resume(resume_text, job_text)
-
-        # Map predicted_class to descriptive string
-        if predicted_class == 0:
-            fit_level = "Not a Fit"
-        elif predicted_class == 1:
-            fit_level = "Potential Fit"
-        else:
-            fit_level = "Good Fit"
-
-        # Return the response
-        return {
-            "tf_idf_score": tf,
-            "sbert_score": sb,
-            "predicted_class": predicted_class,  # Numeric class
-            "fit_level": fit_level,  # Descriptive string
-            "suggestions_markdown": markdown,  # Include markdown in the response
-            "missing_keywords": keywords,     # Include missing keywords
-        }
-
-    finally:
-        # Clean up temporary files
-        if resume_path.exists():
-            resume_path.unlink()
-        if job_path.exists():
-            job_path.unlink()
\ No newline at end of file
+        index = _skill_index()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    t0 = time.perf_counter()
+    try:
+        ids = index.search(q)
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "query": q,
+        "count": len(ids),
+        "person_ids": ids[:max(limit, 0)],
+        "took_ms": (time.perf_counter() - t0) * 1000,
+    }
+
+
+@app.post("/score")
+async def score(
+    response: Response, resume: UploadFile, job: UploadFile, cascade: bool = False,
+    budget_ms: Optional[float] = None,
+):
+    """
+    Fast path: TF-IDF, SBERT and fit class only, no keyword gaps or suggestions.
+    `?cascade=true` takes the fit class from the early-exit gate when it is confident.
+    With a tight `?budget_ms=` the fit class may be skipped (`degraded`).
+    """
+    deadline = _deadline(budget_ms)
+    resume_bytes = await resume.read()
+    job_bytes = await job.read()
+    key = _response_key("score", resume_bytes, resume.filename, job_bytes, job.filename, cascade=cascade)
+    return await _cached_offload(
+        response, key,
+        _run_analysis, resume_bytes, resume.filename, job_bytes, job.filename, SCORE_STAGES, False, cascade,
+        deadline,
+    )
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(resume: UploadFile, job: UploadFile, stages: str = "all"):
+    """Queue an analysis; poll GET /jobs/{job_id} for the result."""
+    wanted = _stages_or_400(stages)
+    if job_store.queued() >= JOB_MAX_QUEUED:
+        raise HTTPException(status_code=503, detail="Job queue full", headers={"Retry-After": "30"})
+    job_id = job_store.submit(",".join(wanted), {
+        "resume": base64.b64encode(await resume.read()).decode("ascii"),
+        "resume_name": resume.filename,
+        "job": base64.b64encode(await job.read()).decode("ascii"),
+        "job_name": job.filename,
+    })
+    job_pool.notify()
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, plus `result` (or `error`) once finished; 404 once expired."""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+
+def _read_pair(resume_bytes: bytes, resume_name: str, job_bytes: bytes, job_name: str):
+    return read_bytes(resume_bytes, resume_name), read_bytes(job_bytes, job_name)
+
+
+@app.post("/rewrite/")
+async def rewrite(resume: UploadFile, job: UploadFile):
+    """
+    Stream bullet rewrites as NDJSON: a "bullets" event, then "token" deltas
+    and a "done" event per bullet while Flan-T5 decodes. Generation holds
+    one executor slot for the whole stream, so a full queue is a 503 up
+    front; a failure after the stream started becomes an "error" event.
+    """
+    resume_text, job_text = await _offload(
+        _read_pair, await resume.read(), resume.filename, await job.read(), job.filename,
+    )
+    try:
+        stream = executor.open_stream(stream_rewrites, resume_text, job_text)
+    except Overloaded:
+        raise _busy()
+
+    async def events():
+        try:
+            async for ev in stream:
+                yield json.dumps(ev) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "status": 500, "detail": str(e)}) + "\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -0,0 +1,138 @@
+"""
+Bounded executor for the CPU-bound analysis stages of the API.
+
+FastAPI handlers are coroutines, so running pdfplumber, spaCy, SBERT or
+DistilBERT inline would block the event loop and stall every other
+connection (health checks included).  `StageExecutor.run` hands such work
+to a thread or process pool instead and keeps the loop free.
+
+At most `max_workers` calls run at once; up to `max_queue` more may wait.
+Anything beyond that raises `Overloaded` immediately, which the API turns
+into `503 Service Unavailable` + `Retry-After` rather than letting
+requests pile up until the gateway times out.
+
+`open_stream` does the same for a blocking generator (e.g. token-by-token
+rewrites): admission happens when it is called, before any response is
+sent, and the returned async iterator keeps its slot until the generator
+is exhausted or closed.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
+
+
+class Overloaded(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class StageExecutor:
+    def __init__(self, kind: str = "thread", max_workers: int = 2, max_queue: int = 8):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"executor kind must be 'thread' or 'process', not {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0          # only touched from the event loop thread
+        self._pool: Optional[Executor] = None
+        self._stream_pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> Executor:
+        # created lazily so a pre-forking launcher never forks live pool threads
+        if self._pool is None:
+            if self.kind == "process":
+                # fork: children inherit the already loaded models
+                self._pool = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("fork"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="stage")
+        return self._pool
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    def _get_stream_pool(self) -> Executor:
+        # generators cannot cross a process boundary, so a process executor
+        # steps them in threads; the slot accounting still bounds them
+        if self.kind == "thread":
+            return self._get_pool()
+        if self._stream_pool is None:
+            self._stream_pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="stream")
+        return self._stream_pool
+
+    def _admit(self) -> None:
+        if self.in_flight >= self.max_workers + self.max_queue:
+            raise Overloaded(f"{self.in_flight} requests in flight")
+        self.in_flight += 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+
+    def open_stream(self, fn: Callable[..., Iterator], *args) -> "_Stream":
+        """
+        Reserve a slot for iterating fn(*args) (raises Overloaded now), then
+        `async for item in stream` steps the generator in a worker thread.
+        """
+        self._admit()
+        return _Stream(self, fn(*args))
+
+    def shutdown(self) -> None:
+        for pool in (self._pool, self._stream_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._stream_pool = None
+
+
+_DONE = object()
+
+
+class _Stream:
+    """Async iterator over a blocking generator; holds one executor slot until closed."""
+
+    def __init__(self, executor: StageExecutor, gen: Iterator):
+        self._executor = executor
+        self._gen = gen
+        self._open = True
+
+    def __aiter__(self) -> "_Stream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if not self._open:
+            raise StopAsyncIteration
+        loop = asyncio.get_running_loop()
+        try:
+            item = await loop.run_in_executor(self._executor._get_stream_pool(), next, self._gen, _DONE)
+        except BaseException:
+            await self.aclose()
+            raise
+        if item is _DONE:
+            await self.aclose()
+            raise StopAsyncIteration
+        return item
+
+    async def aclose(self) -> None:
+        if not self._open:
+            return
+        self._open = False
+        self._executor.in_flight -= 1
+        try:
+            self._gen.close()
+        except ValueError:
+            pass                    # still running in its thread (client went away); it ends on its own
+
+    def __del__(self):
+        # a stream dropped without being iterated to the end still frees its slot
+        if self._open:
+            self._open = False
+            self._executor.in_flight -= 1
@@ -0,0 +1,225 @@
+"""
+Background analysis jobs for requests too slow for one HTTP round trip.
+
+`JobStore` keeps every job's status, payload and result in SQLite, so any
+API worker process can answer a poll for any job. `JobWorkerPool` runs
+local threads that claim queued jobs and execute them. A claim takes the
+oldest queued job plus up to `batch_size - 1` more of the same kind, so
+compatible jobs share one batched SBERT and classifier pass.
+
+Lifecycle: queued → running → done | failed.  Finished jobs expire after
+`result_ttl` seconds and are purged by the pool.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+
+class JobError(Exception):
+    """Returned (not raised) by a handler in place of one payload's result: that job fails alone."""
+
+
+# handler(kind, payloads) → one JSON-able result or JobError per payload, same order
+BatchHandler = Callable[[str, List[dict]], List[Union[dict, JobError]]]
+
+
+class JobStore:
+    def __init__(self, path: str | Path, result_ttl: float = 3600):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id       TEXT PRIMARY KEY,
+                kind     TEXT NOT NULL,
+                status   TEXT NOT NULL,
+                payload  TEXT,
+                result   TEXT,
+                error    TEXT,
+                created  REAL NOT NULL,
+                started  REAL,
+                finished REAL,
+                expires  REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, kind, created)")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # reopened after fork(): pre-forked API workers share the file, not the handle
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(
+                str(self.path), check_same_thread=False, timeout=30, isolation_level=None,
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._db
+
+    def submit(self, kind: str, payload: dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), time.time()),
+            )
+        return job_id
+
+    def queued(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def claim(self, limit: int) -> Tuple[Optional[str], List[Tuple[str, dict]]]:
+        """
+        Atomically mark up to `limit` queued jobs of the oldest queued kind as
+        running. Returns (kind, [(id, payload), ...]) or (None, []).
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")     # serialises claims across processes
+            try:
+                head = self._conn.execute(
+                    "SELECT kind FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+                ).fetchone()
+                if head is None:
+                    self._conn.execute("COMMIT")
+                    return None, []
+                rows = self._conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'queued' AND kind = ? "
+                    "ORDER BY created LIMIT ?",
+                    (head[0], limit),
+                ).fetchall()
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                    [(now, job_id) for job_id, _ in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return head[0], [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+    def complete(self, job_id: str, result: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, payload = NULL, finished = ?, expires = ? "
+                "WHERE id = ?",
+                (json.dumps(result), now, now + self.result_ttl, job_id),
+            )
+
+    def fail(self, job_id: str, error: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, payload = NULL, finished = ?, expires = ? "
+                "WHERE id = ?",
+                (error, now, now + self.result_ttl, job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job status (and result/error once finished); None if unknown or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, result, error, created, started, finished, expires "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None or (row[8] is not None and row[8] < time.time()):
+            return None
+        cols = ("job_id", "kind", "status", "result", "error", "created", "started", "finished", "expires")
+        job = dict(zip(cols, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM jobs WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+        return cur.rowcount
+
+    def requeue_stale(self, older_than: float) -> int:
+        """Put jobs left 'running' by a crashed worker back on the queue."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND started < ?",
+                (time.time() - older_than,),
+            )
+        return cur.rowcount
+
+
+class JobWorkerPool:
+    def __init__(
+        self,
+        store: JobStore,
+        handler: BatchHandler,
+        workers: int = 1,
+        batch_size: int = 8,
+        poll_interval: float = 0.5,
+        stale_after: float = 900,
+    ):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        requeued = self.store.requeue_stale(self.stale_after)
+        if requeued:
+            log.warning("requeued %d stale running job(s)", requeued)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads.clear()
+
+    def notify(self) -> None:
+        """Wake an idle worker right away instead of at the next poll."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        last_purge = 0.0
+        while not self._stop.is_set():
+            if time.time() - last_purge > 60:
+                self.store.purge_expired()
+                last_purge = time.time()
+
+            kind, jobs = self.store.claim(self.batch_size)
+            if not jobs:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            try:
+                results = self.handler(kind, [payload for _, payload in jobs])
+            except Exception as e:
+                log.exception("job batch of %d (%s) failed", len(jobs), kind)
+                for job_id, _ in jobs:
+                    self.store.fail(job_id, f"{type(e).__name__}: {e}")
+                continue
+            for (job_id, _), result in zip(jobs, results):
+                if isinstance(result, JobError):
+                    self.store.fail(job_id, str(result))
+                else:
+                    self.store.complete(job_id, result)
@@ -1,13 +1,16 @@
 import pandas as pd
 import json
+from pathlib import Path
 
-def parse_data():
+def parse_data(root="Resume_Database"):
+    """Join the five Resume_Database CSVs under root into one dict per person."""
+    root = Path(root)
     # Load CSV files
-    people = pd.read_csv("Resume_Database/01_people.csv")
-    abilities = pd.read_csv("Resume_Database/02_abilities.csv")
-    education = pd.read_csv("Resume_Database/03_education.csv")
-    experience = pd.read_csv("Resume_Database/04_experience.csv")
-    person_skills = pd.read_csv("Resume_Database/05_person_skills.csv")
+    people = pd.read_csv(root / "01_people.csv")
+    abilities = pd.read_csv(root / "02_abilities.csv")
+    education = pd.read_csv(root / "03_education.csv")
+    experience = pd.read_csv(root / "04_experience.csv")
+    person_skills = pd.read_csv(root / "05_person_skills.csv")
 
     # Drop unwanted columns
     people = people[["person_id", "name"]]
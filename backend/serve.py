@@ -0,0 +1,151 @@
+"""
+Pre-forking launcher for the API: load every model once, then fork.
+
+    python -m backend.serve --workers 4 --port 8000
+
+Running N separate uvicorn workers loads DistilBERT, SBERT, spaCy (and
+Flan-T5 with --rewriter) N times.  Here the parent imports `backend.api`,
+which loads them, runs one warm-up analysis, and only then forks.  The
+children share the weight pages copy-on-write: tensor storage lives outside
+the Python objects, so refcount updates never touch (and copy) it, and
+`gc.freeze()` keeps the collector from writing to the surviving objects.
+
+All workers accept on one listening socket opened by the parent.  Each sets
+its own torch intra-op thread count (default: cores // workers), so N
+workers do not each spin up a thread per core.  Dead workers are respawned;
+SIGINT / SIGTERM stop them all.
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import typer
+
+from src.config import SERVE_HOST, SERVE_PORT, SERVE_WORKERS
+
+log = logging.getLogger("backend.serve")
+
+_WARMUP_RESUME = "Experience\n• Built data pipelines in Python and SQL for a retail analytics team"
+_WARMUP_JOB = "We are hiring a data engineer with Python, SQL and cloud experience."
+
+
+def preload(rewriter: bool = False) -> None:
+    """Import the API (loads the models) and push one request through every stage."""
+    import torch
+    # warm up single-threaded: an OpenMP pool created before fork() is not
+    # safe to use in the children, which size their own pools afterwards
+    torch.set_num_threads(1)
+
+    from src.pipeline import Analysis, STAGES
+    import backend.api  # noqa: F401  (module import loads the classifier, spaCy and SBERT)
+
+    Analysis(_WARMUP_RESUME, _WARMUP_JOB).result(STAGES)
+    if rewriter:
+        from src.rewriter import get_rewriter
+        get_rewriter().rewrite(["Built data pipelines"])
+
+    gc.collect()
+    gc.freeze()
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(sock: socket.socket, threads: int) -> None:
+    import torch
+    import uvicorn
+    from backend.api import app
+
+    torch.set_num_threads(threads)
+    # drop the supervisor's handlers; uvicorn installs its own for a graceful stop
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket, threads: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _worker(sock, threads)
+        except BaseException:
+            log.exception("worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def run(
+    host: str = SERVE_HOST,
+    port: int = SERVE_PORT,
+    workers: int = SERVE_WORKERS,
+    threads: Optional[int] = None,
+    rewriter: bool = False,
+) -> None:
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    t0 = time.perf_counter()
+    preload(rewriter)
+    log.info("models loaded and warmed in %.1fs", time.perf_counter() - t0)
+
+    sock = bind(host, port)
+    children: Dict[int, int] = {}          # pid → slot
+    stopping = False
+
+    def stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(workers):
+        children[_spawn(sock, threads)] = slot
+    log.info("%d workers on %s:%d, %d torch thread(s) each", workers, host, port, threads)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        log.warning("worker %d exited (status %d); respawning", pid, status)
+        time.sleep(1)                      # don't spin if a worker dies on start-up
+        children[_spawn(sock, threads)] = slot
+    sock.close()
+
+
+def main(
+    host: str = typer.Option(SERVE_HOST, help="Interface to bind"),
+    port: int = typer.Option(SERVE_PORT, help="TCP port"),
+    workers: int = typer.Option(SERVE_WORKERS, help="Worker processes forked after preloading"),
+    threads: int = typer.Option(None, help="torch intra-op threads per worker [default: cores // workers]"),
+    rewriter: bool = typer.Option(False, help="Also preload the Flan-T5 rewriter"),
+):
+    """Load and warm the models once, then fork API workers that share them."""
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+    run(host, port, workers, threads, rewriter)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,162 @@
+# distill_classifier.py
+"""
+Distil models/resume-fit (teacher) into a small DistilBERT student.
+
+The student keeps the teacher's vocabulary and tokenizer but has far fewer
+and narrower layers. It is trained on a mix of the hard labels and the
+teacher's temperature-softened logits, then saved as a normal
+`AutoModelForSequenceClassification` checkpoint. Point CLASSIFY_MODEL in
+src/config.py at STUDENT_DIR to serve it.
+
+Finally both models are scored on the test split with the same accuracy and
+classification report as test_classifier.py, plus CPU latency, and the
+comparison is written to STUDENT_DIR/distill_report.json.
+"""
+import json
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from datasets import load_dataset, ClassLabel
+from sklearn.metrics import accuracy_score, classification_report
+from transformers import (
+    AutoConfig,
+    AutoTokenizer,
+    AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
+    TrainingArguments,
+    Trainer,
+)
+from src.config import CLASSIFY_MODEL, CLASSIFY_STUDENT_MODEL
+from src.token_cache import tokenize_pairs_cached, LENGTH_COLUMN
+
+TEACHER_DIR = CLASSIFY_MODEL
+STUDENT_DIR = CLASSIFY_STUDENT_MODEL
+MAX_LEN     = 512
+TEMPERATURE = 2.0
+ALPHA       = 0.7            # weight of the soft-label (KL) term
+STUDENT_ARCH = dict(n_layers=2, dim=256, hidden_dim=1024, n_heads=4)
+LATENCY_SAMPLES = 200        # single-example CPU timings per model
+
+# 1. Load both splits with the column names train_classifier.py uses
+def load_split(split):
+    ds = load_dataset("cnamuangtoun/resume-job-description-fit", split=split)
+    ds = ds.rename_column("resume_text", "resume") \
+           .rename_column("job_description_text", "job_description") \
+           .rename_column("label", "labels")
+    if not isinstance(ds.features["labels"], ClassLabel):
+        ds = ds.class_encode_column("labels")
+    return ds
+
+tok = AutoTokenizer.from_pretrained(TEACHER_DIR)
+train_ds = tokenize_pairs_cached(load_split("train"), tok, max_length=MAX_LEN)
+test_ds  = tokenize_pairs_cached(load_split("test"), tok, max_length=MAX_LEN)
+label_names = test_ds.features["labels"].names
+
+# 2. Teacher (frozen) and a freshly initialised student with the same head
+teacher = AutoModelForSequenceClassification.from_pretrained(TEACHER_DIR).eval()
+for p in teacher.parameters():
+    p.requires_grad_(False)
+
+student_cfg = AutoConfig.from_pretrained(TEACHER_DIR, **STUDENT_ARCH)
+student = AutoModelForSequenceClassification.from_config(student_cfg)
+
+# 3. Soft-label loss: KL(student/T || teacher/T)·T² blended with hard-label CE
+class DistillTrainer(Trainer):
+    def compute_loss(self, model, inputs, return_outputs=False):
+        labels = inputs.pop("labels")
+        outputs = model(**inputs)
+        with torch.no_grad():
+            teacher_logits = teacher.to(outputs.logits.device)(**inputs).logits
+        soft = F.kl_div(
+            F.log_softmax(outputs.logits / TEMPERATURE, dim=-1),
+            F.softmax(teacher_logits / TEMPERATURE, dim=-1),
+            reduction="batchmean",
+        ) * TEMPERATURE ** 2
+        hard = F.cross_entropy(outputs.logits, labels)
+        loss = ALPHA * soft + (1 - ALPHA) * hard
+        return (loss, outputs) if return_outputs else loss
+
+collator = DataCollatorWithPadding(tok, pad_to_multiple_of=8)
+
+args = TrainingArguments(
+    output_dir=STUDENT_DIR,
+    per_device_train_batch_size=16,
+    learning_rate=5e-4,
+    num_train_epochs=8,
+    eval_strategy="epoch",
+    logging_steps=200,
+    save_strategy="no",
+    group_by_length=True,
+    length_column_name=LENGTH_COLUMN,
+)
+
+# 4. Metrics shared with test_classifier.py
+def compute_metrics(eval_pred):
+    logits, labels = eval_pred
+    preds = np.argmax(logits, axis=1)
+    return {"accuracy": accuracy_score(labels, preds)}
+
+def evaluate(model):
+    trainer = Trainer(model=model, tokenizer=tok, data_collator=collator, compute_metrics=compute_metrics)
+    pred = trainer.predict(test_ds)
+    y_pred = np.argmax(pred.predictions, axis=1)
+    return {
+        "accuracy": float(accuracy_score(pred.label_ids, y_pred)),
+        "report": classification_report(pred.label_ids, y_pred, target_names=label_names, output_dict=True),
+    }
+
+def cpu_latency_ms(model):
+    """Median / p95 single-pair latency over the first LATENCY_SAMPLES test rows."""
+    model = model.to("cpu").eval()
+    times = []
+    with torch.no_grad():
+        for row in test_ds.select(range(min(LATENCY_SAMPLES, len(test_ds)))):
+            batch = collator([{"input_ids": row["input_ids"], "attention_mask": row["attention_mask"]}])
+            t0 = time.perf_counter()
+            model(**batch)
+            times.append((time.perf_counter() - t0) * 1000)
+    return {"p50": float(np.percentile(times, 50)), "p95": float(np.percentile(times, 95))}
+
+def summarize(model):
+    return {
+        "params": sum(p.numel() for p in model.parameters()),
+        **evaluate(model),
+        "latency_ms": cpu_latency_ms(model),
+    }
+
+# 5. Train, save, compare
+if __name__ == "__main__":
+    trainer = DistillTrainer(
+        model=student,
+        args=args,
+        train_dataset=train_ds,
+        eval_dataset=test_ds,
+        tokenizer=tok,
+        data_collator=collator,
+        compute_metrics=compute_metrics,
+    )
+    trainer.train()
+    trainer.save_model(STUDENT_DIR)
+    tok.save_pretrained(STUDENT_DIR)
+
+    report = {
+        "teacher": {"path": TEACHER_DIR, **summarize(teacher)},
+        "student": {"path": STUDENT_DIR, "arch": STUDENT_ARCH, **summarize(student)},
+        "temperature": TEMPERATURE,
+        "alpha": ALPHA,
+    }
+    t, s = report["teacher"], report["student"]
+    report["speedup_p50"] = t["latency_ms"]["p50"] / s["latency_ms"]["p50"]
+    report["accuracy_delta"] = s["accuracy"] - t["accuracy"]
+
+    with open(f"{STUDENT_DIR}/distill_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'':10}{'params':>12}{'accuracy':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for name in ("teacher", "student"):
+        r = report[name]
+        print(f"{name:10}{r['params']:>12,}{r['accuracy']:>10.3f}"
+              f"{r['latency_ms']['p50']:>9.1f}{r['latency_ms']['p95']:>9.1f}")
+    print(f"speed-up ×{report['speedup_p50']:.1f}, accuracy Δ {report['accuracy_delta']:+.3f}")
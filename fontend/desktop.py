@@ -1,5 +1,7 @@
 import streamlit as st
 import requests
+import hashlib
+import json
 import os
 import plotly.graph_objects as go
 
@@ -13,55 +15,70 @@ st.set_page_config(
 # ── Session state ────────────────────────────────────────────────────────────
 if "scan_done" not in st.session_state:
     st.session_state.scan_done = False
+if "result_cache" not in st.session_state:
+    st.session_state.result_cache = {}   # content hash → finished analysis
 
-# ── Scan callback: save inputs to disk ─────────────────────────────────────────
-def start_scan(resume_text, uploaded_file, jd_text):
-    # Ensure the uploads directory exists
-    os.makedirs("uploads", exist_ok=True)
 
-    # Save pasted resume text
-    if resume_text:
-        st.write("Saving resume text to file...")
-        with open(os.path.join("uploads", "resume_text.txt"), "w", encoding="utf-8") as f:
-            f.write(resume_text)
+# ── Backend connection: one pooled keep-alive session per server process ─────
+@st.cache_resource
+def backend_session():
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
 
-    # Save uploaded resume file
-    resume_path = None
-    if uploaded_file is not None:
-        st.write("Parsing...")
-        resume_path = os.path.join("uploads", uploaded_file.name)  # Save with original name
-        with open(resume_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-    # Save job description text
-    if jd_text:
-        st.write("Analyzing...")
-        job_path = os.path.join("uploads", "job_description.txt")
-        with open(job_path, "w", encoding="utf-8") as f:
-            f.write(jd_text)
-    else:
+
+def content_key(resume, job):
+    """Hash of both uploads; the same pair is never analyzed twice."""
+    h = hashlib.sha256()
+    for _, data in (resume, job):
+        h.update(hashlib.sha256(data).digest())
+    return h.hexdigest()
+
+
+# ── Scan callback: forward the inputs straight from memory ────────────────────
+def start_scan(resume_text, uploaded_file, jd_text):
+    if not jd_text:
         st.error("Please provide a job description.")
         return
 
-    # Send the resume and job description to the backend API
-    if resume_path:
-        st.write("Generating Result...")
-        with open(resume_path, "rb") as resume_file, open(job_path, "rb") as job_file:
-            response = requests.post(
-                "http://127.0.0.1:8000/analyze/",
-                files={"resume": resume_file, "job": job_file},
-            )
-
-        # Parse the response
-        if response.status_code == 200:
-            result = response.json()
-            st.session_state.result = result  # Store the result in session state
-            st.session_state.scan_done = True  # Set scan_done to True
-        else:
-            st.error("Error: Could not process the request.")
+    # Uploaded file wins; pasted text is sent as a .txt upload
+    if uploaded_file is not None:
+        resume = (uploaded_file.name, uploaded_file.getvalue())
+    elif resume_text:
+        resume = ("resume_text.txt", resume_text.encode("utf-8"))
     else:
         st.error("Please upload a resume file.")
-   
+        return
+    job = ("job_description.txt", jd_text.encode("utf-8"))
+
+    key = content_key(resume, job)
+    st.session_state.scan_key = key
+    st.session_state.scan_done = True
+    if key in st.session_state.result_cache:
+        st.session_state.result = dict(st.session_state.result_cache[key])
+    else:
+        # The results page streams the analysis from the backend API
+        st.session_state.pending = (resume, job)
+        st.session_state.result = {}
+
+
+# ── Streaming analysis: one event per finished stage ─────────────────────────
+def stream_analysis(resume, job):
+    response = backend_session().post(
+        "http://127.0.0.1:8000/analyze/stream",
+        params={"incremental": "true"},       # re-scans only reprocess edited sections
+        files={"resume": resume, "job": job},
+        stream=True,
+    )
+    if response.status_code != 200:
+        yield "error", {"detail": "Could not process the request."}
+        return
+    with response:
+        for line in response.iter_lines():
+            if line:
+                data = json.loads(line)
+                yield data.pop("event"), data
+
 
 # ── Top bar ───────────────────────────────────────────────────────────────────
 logo_col, _, premium_col = st.columns([2, 6, 1])
@@ -190,11 +207,7 @@ else:
                 st.markdown("**Match Class**")
             with c2:
                 # Display the Predicted Compatibility Class
-                if "result" in st.session_state:
-                    fit_level = st.session_state.result["fit_level"]
-                    st.markdown(f"**Fit Level:** {fit_level}")
-                else:
-                    st.markdown("No results available yet.")
+                fit_slot = st.empty()
 
 
             c1, c2 = st.columns([2,8])
@@ -221,11 +234,7 @@ else:
             with c3:
                 st.markdown("**Match Score**")
             with c4:
-                if "result" in st.session_state:
-                    tf_idf_score = st.session_state.result["tf_idf_score"]
-                    st.markdown(f"**TF-IDF Score:** {tf_idf_score:.3f}")
-                else:
-                    st.markdown("No results available yet.")
+                tf_idf_slot = st.empty()
 
             st.markdown("---")
 
@@ -243,11 +252,7 @@ else:
             with c5:
                 st.markdown("**Match Score**")
             with c6:
-                if "result" in st.session_state:
-                    sbert_score = st.session_state.result["sbert_score"]
-                    st.markdown(f"**BSERT Score:** {sbert_score:.3f}")
-                else:
-                    st.markdown("No results available yet.")
+                sbert_slot = st.empty()
 
 
 
@@ -259,4 +264,40 @@ else:
             st.markdown(
                 "_(Here you could highlight keywords from the job description and compare them to your resume.)_"
             )
-            st.markdown(st.session_state.result["suggestions_markdown"], unsafe_allow_html=True)
+            suggestions_slot = st.empty()
+
+    # — Fill the slots; while streaming, again after every stage event
+    def render():
+        result = st.session_state.get("result", {})
+        waiting = "Analyzing…" if "pending" in st.session_state else "No results available yet."
+        if "fit_level" in result:
+            fit_slot.markdown(f"**Fit Level:** {result['fit_level']}")
+        else:
+            fit_slot.markdown(waiting)
+        if "tf_idf_score" in result:
+            tf_idf_slot.markdown(f"**TF-IDF Score:** {result['tf_idf_score']:.3f}")
+        else:
+            tf_idf_slot.markdown(waiting)
+        if "sbert_score" in result:
+            sbert_slot.markdown(f"**BSERT Score:** {result['sbert_score']:.3f}")
+        else:
+            sbert_slot.markdown(waiting)
+        if "suggestions_markdown" in result:
+            suggestions_slot.markdown(result["suggestions_markdown"], unsafe_allow_html=True)
+        else:
+            suggestions_slot.markdown(waiting)
+
+    render()
+    # Only a new scan reaches the backend; tab switches and title edits rerun
+    # the script but render from session state
+    if "pending" in st.session_state:
+        for event, data in stream_analysis(*st.session_state.pending):
+            if event == "error":
+                st.error(f"Error: {data.get('detail', 'Could not process the request.')}")
+                break
+            st.session_state.result.update(data)
+            render()
+            if event == "done":
+                st.session_state.result_cache[st.session_state.scan_key] = dict(st.session_state.result)
+        del st.session_state.pending
+        render()
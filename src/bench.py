@@ -0,0 +1,445 @@
+"""
+Offline benchmark harness.
+
+`classifier` measures the resume-fit classifier across batch sizes, sequence
+lengths, torch intra-op thread counts and inference backends, and writes one
+JSON record per configuration (latency percentiles + throughput) so runs can
+be diffed across releases or hosts:
+
+    python -m src.bench classifier --threads 1,2,4 --backends torch,int8
+
+`suite` times every stage on its own (file extraction per format, parse_data,
+build-json, similarity, keyword gaps, fit, suggestions) and the full
+pipeline on synthetic corpora of increasing size, then compares the
+medians against a JSON baseline and exits non-zero on a regression:
+
+    python -m src.bench suite --update-baseline      # record on a quiet host
+    python -m src.bench suite --threshold 0.25       # later: fail if >25% slower
+
+Inputs are synthetic (or rows of a tokenized cache, see src/token_cache.py),
+so no network access is needed.  Heavy libraries are imported inside the
+commands to keep `--help` instant.
+"""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import random
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+import typer
+
+from .config import CLASSIFY_MODEL
+
+app = typer.Typer(help="Resume Optimizer benchmarks")
+
+
+@app.callback()
+def main():
+    """Resume Optimizer benchmarks (results are written as JSON)."""
+
+BACKENDS = ("torch", "torchscript", "int8", "onnx")
+
+# Vocabulary for synthetic resume/job text; realistic enough for WordPiece
+_WORDS = (
+    "python sql spark kubernetes docker aws azure gcp terraform airflow etl "
+    "pipeline data analytics dashboard reporting machine learning model "
+    "training deployment api backend frontend react typescript java scala "
+    "led managed designed built improved reduced increased optimized "
+    "customers revenue latency throughput team stakeholders requirements "
+    "bachelor master degree university engineer analyst manager senior "
+    "junior intern experience years communication collaboration agile"
+).split()
+
+
+# --------------------------------------------------------------------------- #
+# Helpers
+# --------------------------------------------------------------------------- #
+
+def _csv_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _synthetic_text(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n_words))
+
+
+def _percentiles(times_ms: List[float]) -> dict:
+    arr = np.asarray(times_ms)
+    return {
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "mean_ms": float(arr.mean()),
+    }
+
+
+def _time_calls(fn: Callable[[], object], iters: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def _host_info() -> dict:
+    try:
+        import torch
+        torch_version = torch.__version__
+    except ImportError:             # file / dataset stages run without torch
+        torch_version = None
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "torch": torch_version,
+    }
+
+
+def _write_results(results: List[dict], out: Path) -> None:
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+# --------------------------------------------------------------------------- #
+# Classifier
+# --------------------------------------------------------------------------- #
+
+def _classifier_inputs(tokenizer, batch_size: int, seq_len: int, dataset: Path | None, seed: int):
+    """Batch padded/truncated to exactly seq_len, from a token cache or synthetic text."""
+    if dataset is not None:
+        import torch
+        from datasets import load_from_disk
+        ds = load_from_disk(str(dataset))
+        rows = ds.select([i % len(ds) for i in range(batch_size)])
+        pad = tokenizer.pad_token_id
+        ids = [(r["input_ids"][:seq_len] + [pad] * seq_len)[:seq_len] for r in rows]
+        input_ids = torch.tensor(ids)
+        return {"input_ids": input_ids, "attention_mask": (input_ids != pad).long()}
+
+    rng = random.Random(seed)
+    resumes = [_synthetic_text(rng, seq_len) for _ in range(batch_size)]
+    jobs = [_synthetic_text(rng, seq_len) for _ in range(batch_size)]
+    enc = tokenizer(resumes, jobs, truncation=True, padding="max_length",
+                    max_length=seq_len, return_tensors="pt")
+    return {"input_ids": enc["input_ids"], "attention_mask": enc["attention_mask"]}
+
+
+def _load_backend(backend: str, model_path: str, sample: dict, threads: int):
+    """Return a callable running one forward pass on a batch dict, or raise RuntimeError."""
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    if backend == "torch":
+        model = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+        return lambda b: model(**b).logits
+
+    if backend == "int8":
+        model = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return lambda b: model(**b).logits
+
+    if backend == "torchscript":
+        model = AutoModelForSequenceClassification.from_pretrained(model_path, torchscript=True).eval()
+        traced = torch.jit.trace(model, (sample["input_ids"], sample["attention_mask"]), strict=False)
+        traced = torch.jit.freeze(traced)
+        return lambda b: traced(b["input_ids"], b["attention_mask"])[0]
+
+    if backend == "onnx":
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("onnxruntime is not installed") from e
+        import tempfile
+        model = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+        onnx_path = Path(tempfile.mkdtemp()) / "model.onnx"
+        torch.onnx.export(
+            model, (sample["input_ids"], sample["attention_mask"]), str(onnx_path),
+            input_names=["input_ids", "attention_mask"], output_names=["logits"],
+            dynamic_axes={k: {0: "batch", 1: "seq"} for k in ("input_ids", "attention_mask")},
+            opset_version=14,
+        )
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads
+        sess = ort.InferenceSession(str(onnx_path), opts, providers=["CPUExecutionProvider"])
+        return lambda b: sess.run(None, {k: b[k].numpy() for k in ("input_ids", "attention_mask")})[0]
+
+    raise RuntimeError(f"unknown backend {backend!r} (choose from {', '.join(BACKENDS)})")
+
+
+@app.command()
+def classifier(
+    model: str        = typer.Option(CLASSIFY_MODEL, help="Classifier checkpoint directory"),
+    batch_sizes: str  = typer.Option("1,8,32", help="Comma-separated batch sizes"),
+    seq_lens: str     = typer.Option("128,256,512", help="Comma-separated sequence lengths"),
+    threads: str      = typer.Option(str(os.cpu_count() or 1), help="Comma-separated torch.set_num_threads values"),
+    backends: str     = typer.Option("torch", help=f"Comma-separated backends: {', '.join(BACKENDS)}"),
+    iters: int        = typer.Option(20, help="Timed iterations per configuration"),
+    warmup: int       = typer.Option(3, help="Untimed warm-up iterations"),
+    dataset: Path     = typer.Option(None, help="Tokenized cache dir (src/token_cache.py) instead of synthetic text"),
+    out: Path         = typer.Option(Path("benchmarks/results/classifier.json"), help="JSON results path"),
+    seed: int         = typer.Option(0, help="Seed for synthetic inputs"),
+):
+    """Latency percentiles and throughput of classifier inference per configuration."""
+    import torch
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    host = _host_info()
+    results: List[dict] = []
+
+    for backend in backends.split(","):
+        for n_threads in _csv_ints(threads):
+            torch.set_num_threads(n_threads)
+            sample = _classifier_inputs(tokenizer, 1, min(_csv_ints(seq_lens)), dataset, seed)
+            try:
+                runner = _load_backend(backend, model, sample, n_threads)
+            except RuntimeError as e:
+                typer.echo(f"[bench] skipping backend {backend}: {e}", err=True)
+                break
+
+            for seq_len in _csv_ints(seq_lens):
+                for bs in _csv_ints(batch_sizes):
+                    batch = _classifier_inputs(tokenizer, bs, seq_len, dataset, seed)
+                    with torch.inference_mode():
+                        times = _time_calls(lambda: runner(batch), iters, warmup)
+                    stats = _percentiles(times)
+                    rec = {
+                        "bench": "classifier",
+                        "model": model,
+                        "backend": backend,
+                        "threads": n_threads,
+                        "batch_size": bs,
+                        "seq_len": seq_len,
+                        "iters": iters,
+                        **stats,
+                        "throughput_pairs_s": bs * 1000 / stats["mean_ms"],
+                        **host,
+                    }
+                    results.append(rec)
+                    typer.echo(
+                        f"{backend:12} threads={n_threads:<3} bs={bs:<4} len={seq_len:<4} "
+                        f"p50={stats['p50_ms']:8.1f}ms p95={stats['p95_ms']:8.1f}ms "
+                        f"p99={stats['p99_ms']:8.1f}ms {rec['throughput_pairs_s']:8.1f} pairs/s"
+                    )
+
+    _write_results(results, out)
+    typer.echo(f"[bench] Wrote {len(results)} results to {out}")
+
+
+# --------------------------------------------------------------------------- #
+# End-to-end suite
+# --------------------------------------------------------------------------- #
+
+# size → (résumé words, job words, people in the synthetic database)
+SUITE_SIZES = {
+    "small": (150, 120, 50),
+    "medium": (600, 400, 500),
+    "large": (2500, 1200, 5000),
+}
+SUITE_STAGES = (
+    "read_txt", "read_docx", "read_pdf", "parse_data", "build_json",
+    "similarity", "keyword_gaps", "predict_fit", "suggest_resume", "pipeline",
+)
+_SECTIONS = ("SUMMARY", "EXPERIENCE", "PROJECTS", "EDUCATION", "SKILLS")
+
+
+def _synthetic_resume(rng: random.Random, n_words: int) -> str:
+    """Section headings followed by '- ' bullets of ~12 words."""
+    lines, words = [], 0
+    while words < n_words:
+        lines.append(_SECTIONS[len(lines) % len(_SECTIONS)])
+        for _ in range(rng.randint(2, 5)):
+            lines.append("- " + _synthetic_text(rng, 12))
+            words += 12
+    return "\n".join(lines)
+
+
+def _write_documents(root: Path, text: str) -> dict:
+    """The same résumé as .txt, .docx and .pdf."""
+    import docx
+    from fpdf import FPDF
+
+    root.mkdir(parents=True, exist_ok=True)
+    paths = {"txt": root / "resume.txt", "docx": root / "resume.docx", "pdf": root / "resume.pdf"}
+    paths["txt"].write_text(text, encoding="utf-8")
+
+    doc = docx.Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    doc.save(str(paths["docx"]))
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=11)
+    for line in text.splitlines():
+        pdf.multi_cell(pdf.w - pdf.l_margin - pdf.r_margin, 6, line)
+    pdf.output(str(paths["pdf"]))
+    return paths
+
+
+def _write_database(root: Path, n_people: int, rng: random.Random) -> Path:
+    """Resume_Database-shaped CSVs (see backend/parsing.py) for n_people."""
+    import csv
+
+    tables = {
+        "01_people.csv": (["person_id", "name", "email", "phone", "linkedin"], []),
+        "02_abilities.csv": (["person_id", "ability"], []),
+        "03_education.csv": (["person_id", "institution", "program", "start_date", "location"], []),
+        "04_experience.csv": (["person_id", "title", "firm", "start_date", "end_date", "location"], []),
+        "05_person_skills.csv": (["person_id", "skill"], []),
+    }
+    for pid in range(1, n_people + 1):
+        tables["01_people.csv"][1].append([pid, _synthetic_text(rng, 2).title(), "", "", ""])
+        for _ in range(rng.randint(1, 4)):
+            tables["02_abilities.csv"][1].append([pid, _synthetic_text(rng, 6)])
+        tables["03_education.csv"][1].append(
+            [pid, _synthetic_text(rng, 2).title() + " University", _synthetic_text(rng, 3), "2015", ""]
+        )
+        for _ in range(rng.randint(1, 3)):
+            tables["04_experience.csv"][1].append(
+                [pid, _synthetic_text(rng, 2).title(), _synthetic_text(rng, 1).title(), "2018", "2022", ""]
+            )
+        for _ in range(rng.randint(3, 10)):
+            tables["05_person_skills.csv"][1].append([pid, rng.choice(_WORDS)])
+
+    root.mkdir(parents=True, exist_ok=True)
+    for name, (header, rows) in tables.items():
+        with open(root / name, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return root
+
+
+def _suite_runners(stages: List[str], size: str, workdir: Path, seed: int) -> dict:
+    """Build the corpus for one size; stage → zero-argument callable."""
+    import contextlib
+    import io
+
+    rng = random.Random(seed)
+    resume_words, job_words, n_people = SUITE_SIZES[size]
+    resume = _synthetic_resume(rng, resume_words)
+    job = _synthetic_text(rng, job_words)
+    root = workdir / size
+    runners: dict = {}
+
+    if any(s.startswith("read_") for s in stages):
+        from .data_loader import read_file
+        docs = _write_documents(root / "docs", resume)
+        for fmt, path in docs.items():
+            runners[f"read_{fmt}"] = lambda path=path: read_file(path)
+
+    if "parse_data" in stages or "build_json" in stages:
+        from backend.parsing import parse_data
+        from .dataset_builder import build_json
+        db = _write_database(root / "db", n_people, rng)
+        parsed = root / "parsed.json"
+        parsed.write_text(json.dumps(parse_data(db)), encoding="utf-8")
+        runners["parse_data"] = lambda: parse_data(db)
+
+        def run_build_json():
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_json(parsed, root / "pairs.jsonl", dedup=False, threshold=0.8, num_perm=128, report=None)
+        runners["build_json"] = run_build_json
+
+    if {"similarity", "keyword_gaps", "predict_fit", "suggest_resume", "pipeline"} & set(stages):
+        from .config import TOP_N_GAPS
+        from .pipeline import Analysis, STAGES, get_similarity
+        from .suggester import _keyword_gaps, _predict_fit, suggest_resume
+        sim = get_similarity()
+        runners["similarity"] = lambda: sim.score(resume, job)
+        runners["keyword_gaps"] = lambda: _keyword_gaps(resume, job, TOP_N_GAPS)
+        runners["predict_fit"] = lambda: _predict_fit(resume, job)
+        runners["suggest_resume"] = lambda: suggest_resume(resume, job)
+        runners["pipeline"] = lambda: Analysis(resume, job).result(STAGES)
+
+    return {s: runners[s] for s in stages}
+
+
+def _compare(results: List[dict], baseline: List[dict], threshold: float, min_delta_ms: float) -> List[dict]:
+    """Stages whose p50 grew by more than threshold (and min_delta_ms) over the baseline."""
+    base = {(r["stage"], r["size"]): r["p50_ms"] for r in baseline}
+    regressions = []
+    for r in results:
+        before = base.get((r["stage"], r["size"]))
+        if before is None:
+            continue
+        now = r["p50_ms"]
+        if now > before * (1 + threshold) and now - before > min_delta_ms:
+            regressions.append({
+                "stage": r["stage"], "size": r["size"],
+                "baseline_ms": before, "current_ms": now, "ratio": now / before,
+            })
+    return regressions
+
+
+@app.command()
+def suite(
+    stages: str       = typer.Option(",".join(SUITE_STAGES), help="Comma-separated stages to time"),
+    sizes: str        = typer.Option(",".join(SUITE_SIZES), help=f"Comma-separated corpus sizes: {', '.join(SUITE_SIZES)}"),
+    iters: int        = typer.Option(5, help="Timed iterations per stage and size"),
+    warmup: int       = typer.Option(1, help="Untimed warm-up iterations"),
+    baseline: Path    = typer.Option(Path("benchmarks/baselines/suite.json"), help="Baseline JSON to compare against"),
+    update_baseline: bool = typer.Option(False, "--update-baseline", help="Save this run as the new baseline"),
+    threshold: float  = typer.Option(0.2, help="Allowed p50 slowdown vs. baseline (0.2 = 20%)"),
+    min_delta_ms: float = typer.Option(1.0, help="Ignore slowdowns smaller than this many ms"),
+    out: Path         = typer.Option(Path("benchmarks/results/suite.json"), help="JSON results path"),
+    seed: int         = typer.Option(0, help="Seed for the synthetic corpora"),
+):
+    """Per-stage and end-to-end timings on synthetic corpora, checked against a baseline."""
+    import tempfile
+
+    wanted = [s.strip() for s in stages.split(",") if s.strip()]
+    unknown = sorted(set(wanted) - set(SUITE_STAGES)) + sorted(
+        set(z.strip() for z in sizes.split(",")) - set(SUITE_SIZES)
+    )
+    if unknown:
+        typer.echo(f"Unknown stage/size: {', '.join(unknown)}", err=True)
+        raise typer.Exit(2)
+
+    host = _host_info()
+    results: List[dict] = []
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as tmp:
+        for size in (z.strip() for z in sizes.split(",")):
+            runners = _suite_runners(wanted, size, Path(tmp), seed)
+            for stage, fn in runners.items():
+                stats = _percentiles(_time_calls(fn, iters, warmup))
+                results.append({"bench": "suite", "stage": stage, "size": size, "iters": iters, **stats, **host})
+                typer.echo(f"{stage:15} {size:7} p50={stats['p50_ms']:9.1f}ms p95={stats['p95_ms']:9.1f}ms")
+
+    _write_results(results, out)
+    typer.echo(f"[bench] Wrote {len(results)} results to {out}")
+
+    if update_baseline:
+        _write_results(results, baseline)
+        typer.echo(f"[bench] Baseline saved to {baseline}")
+        return
+    if not baseline.exists():
+        typer.echo(f"[bench] No baseline at {baseline}; run with --update-baseline to create one")
+        return
+
+    regressions = _compare(results, json.loads(baseline.read_text(encoding="utf-8")), threshold, min_delta_ms)
+    for r in regressions:
+        typer.echo(
+            f"[bench] REGRESSION {r['stage']} ({r['size']}): "
+            f"{r['baseline_ms']:.1f}ms → {r['current_ms']:.1f}ms (x{r['ratio']:.2f})",
+            err=True,
+        )
+    if regressions:
+        raise typer.Exit(1)
+    typer.echo(f"[bench] No stage slower than {threshold:.0%} over baseline")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,184 @@
+"""
+Small two-tier key/value cache: an in-process LRU in front of SQLite.
+
+Values are anything `json` can encode.  The SQLite tier runs in WAL mode
+so several worker processes can share one file; the memory tier is
+per-process.  Both tiers are thread-safe, and the SQLite tier reopens its
+connection in a forked child (see backend/serve.py).
+
+    cache = TieredCache(LRUCache(4096), SQLiteCache("data/cache/x.sqlite"))
+    value = cache.get(key)            # None on miss
+    cache.set(key, value)
+    cache.stats                       # {"memory_hits", "disk_hits", "misses"}
+
+Both tiers take an optional `ttl` in seconds (entries older than that read
+as misses), and `SQLiteCache(max_entries=...)` drops the oldest rows once
+the file holds more than that.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+
+def make_key(*parts: Any) -> str:
+    """sha256 over the JSON encoding of parts (dict keys sorted)."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def model_version(path: str | Path) -> str:
+    """
+    Identifier that changes whenever a model is retrained.
+    Local checkpoint dirs (or single-file models) hash their file names,
+    sizes and mtimes; anything else (a Hub id) is returned as is.  Computed
+    once per process, like the models themselves are loaded once per process.
+    """
+    p = Path(path)
+    if not p.exists():
+        return str(path)
+    h = hashlib.sha1()
+    for f in sorted(p.glob("*")) if p.is_dir() else [p]:
+        if f.is_file():
+            st = f.stat()
+            h.update(f"{f.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return f"{p.name}@{h.hexdigest()[:12]}"
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._expires: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            if self.ttl is not None and self._expires[key] <= time.monotonic():
+                del self._data[key], self._expires[key]
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                old, _ = self._data.popitem(last=False)
+                self._expires.pop(old, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    def __init__(self, path: str | Path, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created)")
+        self._conn.commit()
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # a connection must not be used across fork(); each process opens its own
+        if self._pid != os.getpid():
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._db
+
+    def get(self, key: str) -> Optional[Any]:
+        oldest = time.time() - self.ttl if self.ttl is not None else float("-inf")
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND created > ?", (key, oldest),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+            self._writes += 1
+            # trimming scans the index, so do it every 64 writes rather than on each one
+            if self._writes % 64 == 0:
+                self._prune()
+            self._conn.commit()
+
+    def prune(self) -> None:
+        """Delete expired rows and, beyond max_entries, the oldest ones."""
+        with self._lock:
+            self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM cache WHERE created <= ?", (time.time() - self.ttl,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """Memory LRU first, then SQLite; disk hits are promoted to memory."""
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                self.memory.set(key, value)
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.stats.values())
+        return (self.stats["memory_hits"] + self.stats["disk_hits"]) / total if total else 0.0
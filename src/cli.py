@@ -1,51 +1,69 @@
 import typer, rich
 from pathlib import Path
-from .data_loader import read_file
-from .similarity  import DualSimilarity
-from .suggester   import suggest_resume
-from .job_scraper  import fetch as fetch_job
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+from . import daemon
+from .profiling import StageProfiler
 
+# Heavy imports (torch, transformers, spaCy, SBERT) happen inside the commands
+# that need them, so --help and daemon-backed runs start instantly.
 app = typer.Typer(help="Resume Optimizer CLI")
-# Load the trained model and tokenizer
-model_path = "models/resume-fit"
-tokenizer = AutoTokenizer.from_pretrained(model_path)
-model = AutoModelForSequenceClassification.from_pretrained(model_path)
+
+def _load_texts(resume: Path, job: Path | None, job_url: str | None) -> tuple[str, str]:
+    from .data_loader import read_file
+
+    res_text = read_file(resume)
+    if job_url:
+        from .job_scraper import fetch as fetch_job
+        job_text = fetch_job(job_url)
+    else:
+        job_text = read_file(job) if job else None
+    if job_text is None:
+        typer.echo("Provide --job or --job-url", err=True)
+        raise typer.Exit(1)
+    return res_text, job_text
+
+def _profiler(profile: bool, profile_out: Path | None) -> StageProfiler:
+    return StageProfiler(enabled=profile or profile_out is not None, dump=profile_out)
+
+def _report(prof: StageProfiler) -> None:
+    if not prof.enabled:
+        return
+    rich.print(prof.table())
+    if prof.dump:
+        rich.print(f"[green]Wrote →[/] {prof.dump.with_suffix('.pstats')}, {prof.dump.with_suffix('.collapsed')}")
+
+_PROFILE_HELP = "Print wall/CPU time and peak memory per stage (runs in-process, not on the daemon)"
+_PROFILE_OUT_HELP = "Also write <path>.pstats (cProfile) and <path>.collapsed (flamegraph stacks); implies --profile"
 
 @app.command()
 def analyze(
     resume: Path,
     job: Path     = typer.Option(None, help="Path to job description file"),
     job_url: str  = typer.Option(None, help="URL of online job posting"),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+    profile_out: Path = typer.Option(None, help=_PROFILE_OUT_HELP),
 ):
     """Show similarity scores and compatibility prediction between RESUME and JOB."""
-    res_text = read_file(resume)
-    job_text = fetch_job(job_url) if job_url else read_file(job) if job else None
-    if job_text is None:
-        typer.echo("Provide --job or --job-url", err=True)
-        raise typer.Exit(1)
-
-    # Calculate similarity scores
-    tf, sb = DualSimilarity(hf_model="sentence-transformers/all-MiniLM-L6-v2").score(res_text, job_text)
-    rich.print(f"[bold]TF‑IDF:[/] {tf:.3f}")
-    rich.print(f"[bold]SBERT :[/] {sb:.3f}")
-
-    # Predict compatibility using the trained model
-    inputs = tokenizer(
-        res_text,
-        job_text,
-        truncation=True,
-        padding="max_length",
-        max_length=512,
-        return_tensors="pt",
-    )
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        predicted_class = torch.argmax(logits, dim=1).item()
-
-    rich.print(f"[bold green]Predicted Compatibility Class:[/] {predicted_class}")
+    prof = _profiler(profile, profile_out)
+    with prof:
+        with prof.stage("extract"):
+            res_text, job_text = _load_texts(resume, job, job_url)
+
+        # A running `serve` daemon already has the models loaded
+        result = None if prof.enabled else daemon.call("analyze", resume_text=res_text, job_text=job_text)
+        if result is None:
+            with prof.stage("load_models"):
+                from .pipeline import Analysis, SCORE_STAGES, get_similarity
+                get_similarity()
+            analysis = Analysis(res_text, job_text)
+            result = {}
+            for stage in SCORE_STAGES:
+                with prof.stage(stage):
+                    result.update(analysis.stage_result(stage))
+
+    rich.print(f"[bold]TF‑IDF:[/] {result['tf_idf_score']:.3f}")
+    rich.print(f"[bold]SBERT :[/] {result['sbert_score']:.3f}")
+    rich.print(f"[bold green]Predicted Compatibility Class:[/] {result['predicted_class']}")
+    _report(prof)
 
 def _safe_break_line(line: str, max_len: int = 40) -> str:
     """
@@ -61,35 +79,10 @@ def _safe_break_line(line: str, max_len: int = 40) -> str:
             pieces.append(token)
     return " ".join(pieces)
 
-@app.command()
-def suggest(
-    resume: Path,
-    job: Path     = typer.Option(None, help="Path to job description file"),
-    job_url: str  = typer.Option(None, help="URL of online job posting"),
-    out: Path     = typer.Option(None, help="Output path (.pdf or .md)"),
-    markdown: bool = typer.Option(False, "--md", help="Save result as Markdown"),
-):
-    """Generate résumé improvements plus keyword recommendations."""
-    res_text = read_file(resume)
-    job_text = fetch_job(job_url) if job_url else read_file(job) if job else None
-    if job_text is None:
-        typer.echo("Provide --job or --job-url", err=True)
-        raise typer.Exit(1)
-
-    rich.print("[yellow]🔍 Analyzing…[/]")
-    improved, gaps = suggest_resume(res_text, job_text)
-
-    # Build Markdown document (with emojis)
-    kw_md = "## 🔑 Keywords / Skills to Consider Adding\n\n" + "\n".join(f"- {k}" for k in gaps)
-    md_doc = f"{kw_md}\n\n---\n\n## 📄 Revised Resume\n\n{improved}"
-
-    default = resume.with_name(resume.stem + ("_improved.md" if markdown else "_improved.pdf"))
-    out_path = out or default
-
+def _write_document(md_doc: str, out_path: Path, markdown: bool) -> None:
     # ── Markdown output ────────────────────────────────
     if markdown or out_path.suffix.lower() == ".md":
         out_path.write_text(md_doc, encoding="utf-8")
-        rich.print(f"[green]Wrote →[/] {out_path}")
         return
 
     # ── PDF output ────────────────────────────────────
@@ -113,7 +106,115 @@ def suggest(
         pdf.multi_cell(usable_w, 6, safe_line)
 
     pdf.output(str(out_path))
+
+@app.command()
+def suggest(
+    resume: Path,
+    job: Path     = typer.Option(None, help="Path to job description file"),
+    job_url: str  = typer.Option(None, help="URL of online job posting"),
+    out: Path     = typer.Option(None, help="Output path (.pdf or .md)"),
+    markdown: bool = typer.Option(False, "--md", help="Save result as Markdown"),
+    rewrite: bool  = typer.Option(False, "--rewrite", help="Add Flan-T5 rewrites under each bullet"),
+    profile: bool = typer.Option(False, "--profile", help=_PROFILE_HELP),
+    profile_out: Path = typer.Option(None, help=_PROFILE_OUT_HELP),
+):
+    """Generate résumé improvements plus keyword recommendations."""
+    prof = _profiler(profile, profile_out)
+    with prof:
+        with prof.stage("extract"):
+            res_text, job_text = _load_texts(resume, job, job_url)
+
+        rich.print("[yellow]🔍 Analyzing…[/]")
+        remote = None if prof.enabled else daemon.call(
+            "suggest", resume_text=res_text, job_text=job_text, rewrite=rewrite,
+        )
+        if remote is not None:
+            improved, gaps = remote
+        else:
+            with prof.stage("load_models"):
+                from .pipeline import Analysis
+                from .suggester import suggest_resume
+            analysis = Analysis(res_text, job_text)
+            with prof.stage("fit"):
+                fit = analysis.fit
+            with prof.stage("gaps"):
+                keywords = analysis.gaps
+            with prof.stage("rewrite+suggestions" if rewrite else "suggestions"):
+                improved, gaps = suggest_resume(
+                    analysis.resume_text, job_text, rewrite=rewrite, fit=fit, keywords=keywords,
+                )
+
+        # Build Markdown document (with emojis)
+        kw_md = "## 🔑 Keywords / Skills to Consider Adding\n\n" + "\n".join(f"- {k}" for k in gaps)
+        md_doc = f"{kw_md}\n\n---\n\n## 📄 Revised Resume\n\n{improved}"
+
+        default = resume.with_name(resume.stem + ("_improved.md" if markdown else "_improved.pdf"))
+        out_path = out or default
+        with prof.stage("write_output"):
+            _write_document(md_doc, out_path, markdown)
+
     rich.print(f"[green]Wrote →[/] {out_path}")
+    _report(prof)
+
+@app.command()
+def rewrite(
+    resume: Path,
+    job: Path     = typer.Option(None, help="Path to job description file"),
+    job_url: str  = typer.Option(None, help="URL of online job posting"),
+):
+    """Rewrite every bullet with the generation model, showing text as it is decoded."""
+    from rich.live import Live
+    from rich.table import Table
+    from .suggester import stream_rewrites
+
+    res_text, job_text = _load_texts(resume, job, job_url)
+
+    bullets: list[str] = []
+    rewrites: list[str] = []
+    done: set[int] = set()
+
+    def render() -> Table:
+        table = Table(show_lines=True, expand=True)
+        table.add_column("Original")
+        table.add_column("Rewrite")
+        for i, (b, r) in enumerate(zip(bullets, rewrites)):
+            table.add_row(b, r if i in done else f"{r}[dim]▌[/]")
+        return table
+
+    with Live(render(), refresh_per_second=12) as live:
+        for ev in stream_rewrites(res_text, job_text):
+            if ev["event"] == "bullets":
+                bullets = ev["bullets"]
+                rewrites = [""] * len(bullets)
+            elif ev["event"] == "token":
+                rewrites[ev["index"]] += ev["text"]
+            elif ev["event"] == "done":
+                done.add(ev["index"])
+            live.update(render())
+
+    if not bullets:
+        rich.print("[yellow]No bullet lines found to rewrite.[/]")
+
+@app.command()
+def serve(
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon instead"),
+):
+    """Keep the models loaded; analyze/suggest use this daemon while it runs."""
+    if stop:
+        if daemon.call("shutdown") is None:
+            rich.print("[yellow]No daemon running.[/]")
+        else:
+            rich.print("[green]Daemon stopped.[/]")
+        return
+
+    import logging
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+    rich.print("[yellow]Loading models…[/]")
+    try:
+        daemon.serve()
+    except RuntimeError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1)
 
 if __name__ == "__main__":
     app()
@@ -1,9 +1,14 @@
 
+import os
 from pathlib import Path
 
 # Base paths
 BASE_DIR    = Path(__file__).resolve().parent.parent
 MODELS_DIR  = BASE_DIR / "models"
+DATA_DIR    = BASE_DIR / "data"
+
+# ↳ Arrow cache of tokenized training/eval splits
+TOKEN_CACHE_DIR = DATA_DIR / "cache" / "tokenized"
 
 # ↳ SBERT model for similarity
 HF_MODEL_EMBED = "sentence-transformers/all-MiniLM-L6-v2"
@@ -12,8 +17,66 @@ HF_MODEL_EMBED = "sentence-transformers/all-MiniLM-L6-v2"
 HF_MODEL_GENERATION = "models/fast-flant5"
 
 CLASSIFY_MODEL      = "models/resume-fit"
+# ↳ compact student distilled from CLASSIFY_MODEL (distill_classifier.py);
+#   set CLASSIFY_MODEL to this path to serve it instead
+CLASSIFY_STUDENT_MODEL = "models/resume-fit-student"
 
 # Generation & gap settings
-MAX_NEW_TOKENS = 10000
+MAX_NEW_TOKENS = 64        # per rewritten bullet (bullets are ~15–40 tokens)
+GEN_NUM_BEAMS  = 1         # >1 switches to beam search (not used when streaming)
+GEN_BATCH_SIZE = 32        # bullets per padded generate() call
+
+# ↳ rewrite cache: in-process LRU entries + shared SQLite file
+REWRITE_CACHE_SIZE = 4096
+REWRITE_CACHE_PATH = DATA_DIR / "cache" / "rewrites.sqlite"
 
 TOP_N_GAPS      = 10
+
+# ↳ cascade mode (src/early_exit.py): gate over (TF-IDF, SBERT) that skips fit/gaps/suggestions
+EARLY_EXIT_GATE          = MODELS_DIR / "early-exit-gate.json"
+EARLY_EXIT_MIN_PRECISION = 0.95   # threshold tuning target for each exit side
+
+# ↳ incremental re-scoring (src/incremental.py): cached résumé sections per process
+SECTION_CACHE_SIZE = 20000
+# ↳ parser's shared string table: once it holds this many strings new documents
+#   intern into a fresh one (~100 B per string, so ~50 MB); cached sections keep
+#   their old table alive until they are evicted
+STRING_TABLE_MAX = 500_000
+
+# ↳ boolean skill/keyword index over Resume_Database (python -m src.skill_index build)
+SKILL_INDEX_DIR = DATA_DIR / "index" / "skills"
+
+# API worker pool (backend/api.py): blocking stages run off the event loop
+API_EXECUTOR    = "thread"   # "thread" or "process"
+API_MAX_WORKERS = 2          # stages running at once
+API_MAX_QUEUE   = 8          # requests allowed to wait; beyond that → 503
+API_BATCH_MAX_JOBS = 50      # job descriptions per POST /analyze/batch
+API_DEADLINE_MS = 25000      # default per-request time budget (?budget_ms= overrides)
+
+# ↳ request deadlines (src/deadline.py): stage cost guesses until real timings come in
+STAGE_COST_PRIORS_MS = {"similarity": 80, "fit": 200, "gaps": 100, "suggestions": 150}
+SCRAPE_JS_MIN_SECONDS = 5    # job_scraper.fetch skips the JS-render fallback with less time left
+
+# ↳ response cache for /analyze/ and /score: per-worker LRU + SQLite file shared by workers
+API_RESPONSE_CACHE_SIZE        = 1024
+API_RESPONSE_CACHE_TTL         = 3600     # seconds
+API_RESPONSE_CACHE_MAX_ENTRIES = 50000    # rows kept in the SQLite tier
+API_RESPONSE_CACHE_PATH        = DATA_DIR / "cache" / "responses.sqlite"
+
+# Pre-forking launcher (python -m backend.serve): models load once, then fork
+SERVE_HOST    = "127.0.0.1"
+SERVE_PORT    = 8000
+SERVE_WORKERS = 2          # torch threads per worker default to cores // workers
+
+# Background jobs (POST /jobs): SQLite-backed queue + local worker threads
+JOB_DB_PATH    = DATA_DIR / "cache" / "jobs.sqlite"
+JOB_WORKERS    = 1
+JOB_BATCH_SIZE = 8         # queued jobs with the same stages run as one model batch
+JOB_RESULT_TTL = 3600      # seconds a finished job stays retrievable
+JOB_MAX_QUEUED = 1000      # beyond that, POST /jobs → 503
+
+# ↳ stage timers / counters behind GET /metrics; RESUME_METRICS=0 turns them off
+METRICS_ENABLED = os.environ.get("RESUME_METRICS", "1") != "0"
+
+# ↳ Unix socket of the warm CLI daemon (`python -m src.cli serve`)
+DAEMON_SOCKET = Path(os.environ.get("RESUME_DAEMON_SOCKET", f"/tmp/resume-optimizer-{os.getuid()}.sock"))
@@ -0,0 +1,127 @@
+"""
+Warm model daemon for the CLI.
+
+`python -m src.cli serve` loads the classifier, SBERT and spaCy once and
+answers requests on a local Unix socket (`DAEMON_SOCKET`).  While it runs,
+`analyze` and `suggest` send their texts there instead of loading the
+models themselves, so a script looping over many résumés pays the load cost
+once.  When no daemon is listening, `call` returns None and the CLI falls
+back to running in-process.
+
+Protocol: one JSON object per line each way.
+    → {"op": "analyze", "args": {"resume_text": ..., "job_text": ...}}
+    ← {"ok": true, "result": {...}}   or   {"ok": false, "error": "..."}
+
+This module imports nothing heavy; the models load inside `serve()`.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .config import DAEMON_SOCKET
+
+log = logging.getLogger(__name__)
+
+
+class DaemonError(RuntimeError):
+    """The daemon was reached but the request failed there."""
+
+
+def _recv_line(sock: socket.socket) -> bytes:
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+def call(op: str, socket_path: Path = DAEMON_SOCKET, **args) -> Optional[Any]:
+    """Run op on the daemon; None when no daemon is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    with sock:
+        sock.sendall(json.dumps({"op": op, "args": args}).encode("utf-8") + b"\n")
+        reply = json.loads(_recv_line(sock) or b'{"ok": false, "error": "daemon closed the connection"}')
+    if not reply["ok"]:
+        raise DaemonError(reply["error"])
+    return reply["result"]
+
+
+def _ops() -> Dict[str, Callable[..., Any]]:
+    # heavy imports: the classifier and spaCy load with src.suggester
+    from .pipeline import Analysis, SCORE_STAGES, get_similarity
+    from .suggester import suggest_resume
+
+    get_similarity()
+
+    def analyze(resume_text: str, job_text: str) -> dict:
+        return Analysis(resume_text, job_text).result(SCORE_STAGES)
+
+    def suggest(resume_text: str, job_text: str, rewrite: bool = False) -> list:
+        improved, gaps = suggest_resume(resume_text, job_text, rewrite=rewrite)
+        return [improved, gaps]
+
+    return {"ping": lambda: os.getpid(), "analyze": analyze, "suggest": suggest}
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    ops: Dict[str, Callable[..., Any]] = {}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            req = json.loads(line)
+            if req["op"] == "shutdown":
+                reply = {"ok": True, "result": None}
+                # shutdown() blocks until serve_forever returns; not from this thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                fn = self.server.ops.get(req["op"])
+                if fn is None:
+                    raise ValueError(f"unknown op {req['op']!r}")
+                reply = {"ok": True, "result": fn(**req.get("args", {}))}
+        except Exception as e:
+            log.exception("daemon request failed")
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def serve(socket_path: Path = DAEMON_SOCKET, ops: Optional[Dict[str, Callable[..., Any]]] = None) -> None:
+    """Load the models and answer requests until a shutdown op (or Ctrl-C)."""
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        if call("ping", socket_path) is not None:
+            raise RuntimeError(f"a daemon is already listening on {socket_path}")
+        socket_path.unlink()         # left behind by a daemon that was killed
+
+    ops = ops or _ops()
+    with _Server(str(socket_path), _Handler) as server:
+        server.ops = ops
+        os.chmod(socket_path, 0o600)
+        log.info("models warm; listening on %s (pid %d)", socket_path, os.getpid())
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
@@ -1,30 +1,45 @@
+from io import BytesIO
 from pathlib import Path
 import pdfplumber
 import docx
 
-def read_file(path: str | Path) -> str:
-    path = Path(path)
-    suffix = path.suffix.lower()
+from .deadline import NO_DEADLINE, Deadline
+from .metrics import timed
+
+def _clean(text: str) -> str:
+    # normalize line endings & strip trailing spaces, but keep blank lines
+    lines = text.splitlines()
+    cleaned = [ln.rstrip() for ln in lines]
+    return "\n".join(cleaned)
 
+def _extract(source, suffix: str, deadline: Deadline = NO_DEADLINE) -> str:
+    """source is a path or a binary file object; suffix picks the parser."""
     if suffix == ".pdf":
         # extract each page’s text (with line breaks)
         pages = []
-        with pdfplumber.open(path) as pdf:
+        with pdfplumber.open(source) as pdf:
             for page in pdf.pages:
+                deadline.check("PDF extraction")
                 pages.append(page.extract_text() or "")
-        text = "\n".join(pages)
+        return "\n".join(pages)
 
-    elif suffix in {".docx", ".doc"}:
+    if suffix in {".docx", ".doc"}:
         # extract each paragraph (preserves manual line breaks)
-        doc = docx.Document(path)
+        doc = docx.Document(source)
         paras = [p.text for p in doc.paragraphs]
-        text = "\n".join(paras)
+        return "\n".join(paras)
 
-    else:
-        # plain text file
-        text = path.read_text(encoding="utf-8")
+    # plain text file
+    if isinstance(source, Path):
+        return source.read_text(encoding="utf-8")
+    return source.read().decode("utf-8")
 
-    # normalize line endings & strip trailing spaces, but keep blank lines
-    lines = text.splitlines()
-    cleaned = [ln.rstrip() for ln in lines]
-    return "\n".join(cleaned)
+@timed("read_file")
+def read_file(path: str | Path, deadline: Deadline = NO_DEADLINE) -> str:
+    path = Path(path)
+    return _clean(_extract(path, path.suffix.lower(), deadline))
+
+@timed("read_bytes")
+def read_bytes(data: bytes, filename: str, deadline: Deadline = NO_DEADLINE) -> str:
+    """Same as read_file for an in-memory upload; filename only supplies the suffix."""
+    return _clean(_extract(BytesIO(data), Path(filename).suffix.lower(), deadline))
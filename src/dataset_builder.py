@@ -1,5 +1,7 @@
 from pathlib import Path
-import json, typer
+from collections import Counter
+import json, re, zlib, typer
+import numpy as np
 
 app = typer.Typer()
 
@@ -55,17 +57,144 @@ def _entry_to_text(e: dict) -> str:
         f"EXPERIENCE: {experience}\n"
     )
 
+# --------------------------------------------------------------------------- #
+# Near-duplicate detection (MinHash + LSH banding)
+# --------------------------------------------------------------------------- #
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _shingles(text: str, k: int = 3) -> np.ndarray:
+    """
+    Hashed k-word shingles of text (lower-cased), as a uint64 array.
+    crc32 keeps the hashes stable across processes, unlike hash().
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    if len(words) < k:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i : i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def _minhash(shingles: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    MinHash signature: per permutation, the min of (a*x + b) mod p over all
+    shingles, p = 2**61 - 1.  Shingles, a and b are all below 2**32, so
+    a*x + b < 2**64 never wraps in uint64 before the modulus.
+    """
+    if not len(shingles):
+        return np.full(len(a), _MAX_HASH, dtype=np.uint64)
+    hv = (np.outer(shingles, a) + b) % _MERSENNE & _MAX_HASH
+    return hv.min(axis=0)
+
+
+def _lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """
+    Pick (bands, rows) with bands*rows <= num_perm whose S-curve midpoint
+    (1/bands)**(1/rows) lies closest to the Jaccard threshold.
+    """
+    best, best_err = (1, num_perm), float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+def find_near_duplicates(
+    texts: list[str],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    shingle_size: int = 3,
+    seed: int = 1,
+) -> list[list[int]]:
+    """
+    Group texts whose estimated Jaccard similarity is >= threshold.
+
+    Signatures are bucketed per LSH band, so only texts that collide in at
+    least one band are ever compared; each bucket member is checked against
+    the bucket head only, which keeps the whole pass roughly linear.
+    Returns every cluster (singletons included) as sorted index lists,
+    ordered by their first member.
+    """
+    rng = np.random.RandomState(seed)
+    # below 2**32 like the crc32 shingles, see _minhash
+    a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    sigs = np.stack([_minhash(_shingles(t, shingle_size), a, b) for t in texts]) if texts \
+        else np.empty((0, num_perm), dtype=np.uint64)
+
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bands, rows = _lsh_params(threshold, num_perm)
+    for band in range(bands):
+        cols = sigs[:, band * rows : (band + 1) * rows]
+        buckets: dict[bytes, int] = {}
+        for i in range(len(texts)):
+            key = cols[i].tobytes()
+            head = buckets.setdefault(key, i)
+            if head == i:
+                continue
+            ri, rh = find(i), find(head)
+            if ri != rh and np.mean(sigs[i] == sigs[head]) >= threshold:
+                parent[max(ri, rh)] = min(ri, rh)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda c: c[0])
+
+
+def _cluster_report(clusters: list[list[int]], ids: list[str], top: int = 10) -> dict:
+    """Summary of cluster sizes, plus the largest duplicate clusters by record id."""
+    sizes = Counter(len(c) for c in clusters)
+    dupes = sorted((c for c in clusters if len(c) > 1), key=len, reverse=True)
+    return {
+        "records": sum(len(c) for c in clusters),
+        "kept": len(clusters),
+        "dropped": sum(len(c) - 1 for c in clusters),
+        "cluster_sizes": {str(k): v for k, v in sorted(sizes.items())},
+        "largest": [[ids[i] for i in c] for c in dupes[:top]],
+    }
+
+
 @app.command("build-json")
 def build_json(
     json_file: Path = typer.Argument(..., help="Path to Parsed Resume.json"),
     out: Path       = typer.Option(Path("data/pairs.jsonl"), help="Output JSONL path"),
+    dedup: bool     = typer.Option(False, "--dedup", help="Drop near-duplicate records (MinHash LSH)"),
+    threshold: float = typer.Option(0.8, help="Jaccard threshold for --dedup"),
+    num_perm: int   = typer.Option(128, help="MinHash permutations for --dedup"),
+    report: Path    = typer.Option(None, help="Write the --dedup cluster report as JSON"),
 ):
     out.parent.mkdir(parents=True, exist_ok=True)
     data = json.load(open(json_file, encoding="utf-8"))
+    ids = list(data)
+    texts = [_entry_to_text(data[rid]) for rid in ids]
+
+    if dedup:
+        clusters = find_near_duplicates(texts, threshold=threshold, num_perm=num_perm)
+        summary = _cluster_report(clusters, ids)
+        typer.echo(
+            f"[dataset_builder] Dedup: kept {summary['kept']} of {summary['records']} "
+            f"(cluster sizes: {summary['cluster_sizes']})"
+        )
+        if report:
+            report.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        texts = [texts[c[0]] for c in clusters]
+
     total = 0
     with open(out, "w", encoding="utf-8") as fo:
-        for rid, entry in data.items():
-            text = _entry_to_text(entry)
+        for text in texts:
             # input==target for self-supervised use
             json.dump({"input": text, "target": text}, fo)
             fo.write("\n")
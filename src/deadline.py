@@ -0,0 +1,88 @@
+"""
+Request-level time budgets.
+
+    deadline = Deadline.after_ms(3000)        # starts counting now
+    text = read_bytes(data, name, deadline)   # DeadlineExceeded if it runs out mid-file
+    Analysis(resume, job, deadline=deadline).result(stages)
+
+A `Deadline` is an absolute point on the monotonic clock, so it keeps
+counting while a request waits in a queue and means the same thing in
+another process on the same host.  Work that cannot produce anything useful
+without finishing (extracting text, fetching a posting) raises
+`DeadlineExceeded`; the analysis pipeline instead skips optional stages it
+no longer expects to finish and flags the result as degraded.
+
+Expected stage costs come from `COSTS`, an exponentially weighted average
+of how long each stage actually took in this process, seeded with
+`STAGE_COST_PRIORS_MS` until a stage has been seen.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+from .config import STAGE_COST_PRIORS_MS
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline:
+    __slots__ = ("expires",)
+
+    def __init__(self, expires: Optional[float] = None):
+        self.expires = expires              # time.monotonic() value; None = no limit
+
+    @classmethod
+    def after_ms(cls, budget_ms: Optional[float]) -> "Deadline":
+        return cls(None if budget_ms is None else time.monotonic() + budget_ms / 1000)
+
+    def remaining(self) -> float:
+        """Seconds left (inf without a limit, never negative)."""
+        if self.expires is None:
+            return math.inf
+        return max(self.expires - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, seconds: float) -> bool:
+        return self.remaining() >= seconds
+
+    def timeout(self, cap: float) -> float:
+        """A network/render timeout that also ends at the deadline."""
+        return max(min(cap, self.remaining()), 0.001)
+
+    def check(self, what: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"time budget exhausted during {what}")
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+NO_DEADLINE = Deadline()
+
+
+class StageCosts:
+    """Running estimate of each stage's wall time (seconds)."""
+
+    def __init__(self, priors_ms: Dict[str, float], alpha: float = 0.2):
+        self.alpha = alpha
+        self._est = {k: v / 1000 for k, v in priors_ms.items()}
+        self._lock = threading.Lock()
+
+    def estimate(self, stage: str) -> float:
+        return self._est.get(stage, 0.0)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            prev = self._est.get(stage)
+            self._est[stage] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+
+
+COSTS = StageCosts(STAGE_COST_PRIORS_MS)
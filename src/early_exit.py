@@ -0,0 +1,294 @@
+"""
+Confidence-based early exit for `Analysis(..., cascade=True)`.
+
+The similarity stage is cheap; the fit classifier, keyword gaps and
+suggestions are not.  An `ExitGate` — multinomial logistic regression over
+(TF-IDF, SBERT) trained on the fit dataset `train_classifier.py` uses —
+turns the two scores into class probabilities:
+
+    p(not fit)  ≥ reject_threshold  → "reject": clear mismatch
+    p(good fit) ≥ accept_threshold  → "accept": near-perfect match
+    otherwise                       → "continue": run the requested stages
+
+On an exit the fit stage is answered by the gate (`fit_source: "cascade"`)
+and gaps / suggestions are skipped; the response lists them in
+`skipped_stages`.
+
+    python -m src.early_exit fit --limit 4000        # train + pick thresholds
+    python -m src.early_exit evaluate --reject 0.85 --accept 0.9 --classifier
+
+`fit` uses the same 90/10 split (seed 42) as train_classifier.py and fits
+the gate on the train part.  The held-out part is halved: on the
+calibration half it picks the lowest thresholds whose exits agree with the
+true label at least `min_precision` of the time, and the report comes from
+the evaluation half, which played no part in choosing them.  `evaluate`
+reports exit rate and exit precision on that same evaluation half for given
+thresholds and, with `--classifier`, how often the cascade's fit label
+differs from the DistilBERT classifier's.  The gate is a few floats in
+JSON (EARLY_EXIT_GATE), so serving it needs only numpy.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import typer
+
+from .config import EARLY_EXIT_GATE, EARLY_EXIT_MIN_PRECISION
+from .fit_labels import label_rank
+
+log = logging.getLogger(__name__)
+
+app = typer.Typer(help="Early-exit gate for the analysis cascade")
+
+
+@app.callback()
+def main():
+    """Train and evaluate the early-exit gate."""
+
+
+# stages the gate can make unnecessary
+EXIT_STAGES = ("fit", "gaps", "suggestions")
+
+
+@dataclass
+class ExitGate:
+    coef: List[List[float]]          # classes × 2, on standardised (tf, sb)
+    intercept: List[float]
+    mean: List[float]
+    scale: List[float]
+    reject_class: int
+    accept_class: int
+    reject_threshold: float = 1.01   # > 1 never exits
+    accept_threshold: float = 1.01
+    label_names: List[str] = field(default_factory=list)   # dataset class names by id
+
+    def proba(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for rows of (tf, sb)."""
+        x = (np.atleast_2d(np.asarray(features, dtype=np.float64)) - self.mean) / self.scale
+        logits = x @ np.asarray(self.coef).T + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def decide(self, tf: float, sb: float) -> dict:
+        p = self.proba([tf, sb])[0]
+        p_reject, p_accept = float(p[self.reject_class]), float(p[self.accept_class])
+        if p_reject >= self.reject_threshold:
+            decision, label, conf = "reject", self.reject_class, p_reject
+        elif p_accept >= self.accept_threshold:
+            decision, label, conf = "accept", self.accept_class, p_accept
+        else:
+            decision, label, conf = "continue", int(p.argmax()), float(p.max())
+        return {"decision": decision, "label": label, "confidence": conf,
+                "fit_level": self.label_names[label] if self.label_names else None,
+                "p_not_fit": p_reject, "p_good_fit": p_accept}
+
+    def save(self, path: str | Path = EARLY_EXIT_GATE) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path = EARLY_EXIT_GATE) -> "ExitGate":
+        return cls(**json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+@lru_cache(maxsize=1)
+def get_gate() -> Optional[ExitGate]:
+    """Process-wide gate, or None (cascade never exits) if it has not been trained."""
+    try:
+        return ExitGate.load(EARLY_EXIT_GATE)
+    except FileNotFoundError:
+        log.warning("no early-exit gate at %s; run `python -m src.early_exit fit`", EARLY_EXIT_GATE)
+        return None
+
+
+def fit_gate(features: np.ndarray, labels: np.ndarray, label_names: Sequence[str]) -> ExitGate:
+    from sklearn.linear_model import LogisticRegression
+
+    features = np.asarray(features, dtype=np.float64)
+    mean, scale = features.mean(axis=0), features.std(axis=0)
+    scale[scale == 0] = 1.0
+    model = LogisticRegression(max_iter=1000).fit((features - mean) / scale, labels)
+    if list(model.classes_) != list(range(len(label_names))):
+        raise ValueError(f"every class needs training examples; got {list(model.classes_)}")
+    reject, accept = _extreme_classes(label_names)
+    return ExitGate(
+        coef=model.coef_.tolist(), intercept=model.intercept_.tolist(),
+        mean=mean.tolist(), scale=scale.tolist(),
+        reject_class=reject, accept_class=accept, label_names=list(label_names),
+    )
+
+
+def _extreme_classes(label_names: Sequence[str]) -> Tuple[int, int]:
+    """Indices of the "no fit" and "good fit" labels in the dataset's encoding."""
+    ranks = [label_rank(n) for n in label_names]
+    reject = next((i for i, r in enumerate(ranks) if r == 0), 0)
+    accept = next((i for i, r in enumerate(ranks) if r == 2), len(ranks) - 1)
+    return reject, accept
+
+
+# --------------------------------------------------------------------------- #
+# Thresholds
+# --------------------------------------------------------------------------- #
+
+THRESHOLD_GRID = np.round(np.arange(0.5, 1.0, 0.01), 2)
+
+
+def sweep(p: np.ndarray, correct: np.ndarray) -> List[dict]:
+    """Exit rate and precision of `p ≥ t` for every t in THRESHOLD_GRID."""
+    rows = []
+    for t in THRESHOLD_GRID:
+        exits = p >= t
+        n = int(exits.sum())
+        rows.append({
+            "threshold": float(t),
+            "exit_rate": n / max(len(p), 1),
+            "precision": float(correct[exits].mean()) if n else None,
+        })
+    return rows
+
+
+def choose_threshold(p: np.ndarray, correct: np.ndarray, min_precision: float, min_exits: int = 20) -> float:
+    """Lowest threshold whose exits are right ≥ min_precision of the time (1.01 = never exit)."""
+    for row in sweep(p, correct):
+        if row["precision"] is not None and row["exit_rate"] * len(p) >= min_exits \
+                and row["precision"] >= min_precision:
+            return row["threshold"]
+    return 1.01
+
+
+def evaluate_gate(
+    gate: ExitGate, features: np.ndarray, labels: np.ndarray, classifier: Optional[np.ndarray] = None,
+) -> dict:
+    """Exit rate / precision per side; with classifier labels, the cascade's disagreement with it."""
+    decisions = [gate.decide(tf, sb) for tf, sb in features]
+    kinds = np.array([d["decision"] for d in decisions])
+    gate_labels = np.array([d["label"] for d in decisions])
+    report = {"pairs": len(labels), "reject_threshold": gate.reject_threshold,
+              "accept_threshold": gate.accept_threshold}
+    for kind in ("reject", "accept"):
+        mask = kinds == kind
+        report[f"{kind}_rate"] = float(mask.mean()) if len(mask) else 0.0
+        report[f"{kind}_precision"] = float((gate_labels[mask] == labels[mask]).mean()) if mask.any() else None
+    exits = kinds != "continue"
+    report["exit_rate"] = float(exits.mean()) if len(exits) else 0.0
+    if classifier is not None:
+        cascade = np.where(exits, gate_labels, classifier)
+        report["classifier_accuracy"] = float((classifier == labels).mean())
+        report["cascade_accuracy"] = float((cascade == labels).mean())
+        report["changed_vs_classifier"] = float((cascade != classifier).mean())
+    return report
+
+
+# --------------------------------------------------------------------------- #
+# Fit dataset (same source and split as train_classifier.py)
+# --------------------------------------------------------------------------- #
+
+def load_fit_dataset(limit: Optional[int] = None):
+    """(train, test, label_names) with resume / job_description / labels columns."""
+    from datasets import ClassLabel, load_dataset
+
+    ds = load_dataset("cnamuangtoun/resume-job-description-fit", split="train")
+    ds = ds.rename_column("resume_text", "resume") \
+           .rename_column("job_description_text", "job_description") \
+           .rename_column("label", "labels")
+    if not isinstance(ds.features["labels"], ClassLabel):
+        ds = ds.class_encode_column("labels")
+    split = ds.train_test_split(test_size=0.1, seed=42)
+    train, test = split["train"], split["test"]
+    if limit:
+        train = train.shuffle(seed=0).select(range(min(limit, len(train))))
+    return train, test, ds.features["labels"].names
+
+
+def split_held_out(test):
+    """(calibration, evaluation) halves of the held-out split: tune on one, report on the other."""
+    halves = test.train_test_split(test_size=0.5, seed=42)
+    return halves["train"], halves["test"]
+
+
+def similarity_features(ds, batch_size: int = 64) -> np.ndarray:
+    from .pipeline import get_similarity
+
+    sim = get_similarity()
+    out = []
+    for start in range(0, len(ds), batch_size):
+        rows = ds[start:start + batch_size]
+        out.extend(sim.score_batch(list(zip(rows["resume"], rows["job_description"]))))
+    return np.asarray(out, dtype=np.float64)
+
+
+def classifier_labels(ds, batch_size: int = 16) -> np.ndarray:
+    from .suggester import _predict_fit_batch
+
+    out = []
+    for start in range(0, len(ds), batch_size):
+        rows = ds[start:start + batch_size]
+        out.extend(label for label, _ in _predict_fit_batch(list(zip(rows["resume"], rows["job_description"]))))
+    return np.asarray(out)
+
+
+@app.command()
+def fit(
+    out: Path            = typer.Option(EARLY_EXIT_GATE, help="Where to write the gate"),
+    limit: int           = typer.Option(None, help="Train on at most this many pairs"),
+    min_precision: float = typer.Option(EARLY_EXIT_MIN_PRECISION, help="Required exit precision per side"),
+    classifier: bool     = typer.Option(False, help="Also compare with the DistilBERT classifier on the test split"),
+):
+    """Fit the gate on the train split; tune thresholds and report on separate held-out halves."""
+    train, test, names = load_fit_dataset(limit)
+    calib, held = split_held_out(test)
+    typer.echo(f"[early_exit] scoring {len(train)} train / {len(calib)} calibration / {len(held)} eval pairs")
+    gate = fit_gate(similarity_features(train), np.asarray(train["labels"]), names)
+
+    x_calib, y_calib = similarity_features(calib), np.asarray(calib["labels"])
+    p = gate.proba(x_calib)
+    gate.reject_threshold = choose_threshold(p[:, gate.reject_class], y_calib == gate.reject_class, min_precision)
+    gate.accept_threshold = choose_threshold(p[:, gate.accept_class], y_calib == gate.accept_class, min_precision)
+    gate.save(out)
+
+    x_held, y_held = similarity_features(held), np.asarray(held["labels"])
+    report = evaluate_gate(gate, x_held, y_held, classifier_labels(held) if classifier else None)
+    report["labels"] = list(names)
+    typer.echo(json.dumps(report, indent=2))
+    (Path(out).with_suffix(".report.json")).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+@app.command()
+def evaluate(
+    gate_path: Path  = typer.Option(EARLY_EXIT_GATE, "--gate", help="Gate to evaluate"),
+    reject: float    = typer.Option(None, help="Override reject_threshold"),
+    accept: float    = typer.Option(None, help="Override accept_threshold"),
+    classifier: bool = typer.Option(False, help="Compare with the DistilBERT classifier"),
+    save: bool       = typer.Option(False, help="Write the overridden thresholds back to the gate"),
+):
+    """Exit rate and precision on the held-out evaluation half, plus the full threshold sweep."""
+    gate = ExitGate.load(gate_path)
+    if reject is not None:
+        gate.reject_threshold = reject
+    if accept is not None:
+        gate.accept_threshold = accept
+    _, test, _ = load_fit_dataset()
+    _, held = split_held_out(test)
+    x_test, y_test = similarity_features(held), np.asarray(held["labels"])
+    report = evaluate_gate(gate, x_test, y_test, classifier_labels(held) if classifier else None)
+    p = gate.proba(x_test)
+    report["sweep"] = {
+        "reject": sweep(p[:, gate.reject_class], y_test == gate.reject_class),
+        "accept": sweep(p[:, gate.accept_class], y_test == gate.accept_class),
+    }
+    typer.echo(json.dumps(report, indent=2))
+    if save:
+        gate.save(gate_path)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,54 @@
+"""
+Fit classifier label ids → names → how good a fit they are.
+
+The classifier is trained on `class_encode_column` ids, which follow the
+dataset's label names in alphabetical order:
+
+    0 Good Fit    1 No Fit    2 Potential Fit
+
+so an id says nothing about fit quality.  Anything that sorts by fit goes
+through `fit_rank` (No < Potential < Good), which reads the label name.
+Names come from the classifier's config.json `id2label` when it was saved
+with real names, otherwise from the dataset order above.
+"""
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence, Tuple
+
+from .config import CLASSIFY_MODEL
+
+# ClassLabel names of cnamuangtoun/resume-job-description-fit after class_encode_column
+DATASET_LABELS = ("Good Fit", "No Fit", "Potential Fit")
+
+
+def label_rank(name: str) -> int:
+    """0 for "No Fit" / "Not a Fit", 2 for "Good Fit", 1 for anything in between."""
+    name = name.lower()
+    if name.startswith("no"):
+        return 0
+    if "good" in name:
+        return 2
+    return 1
+
+
+@lru_cache(maxsize=None)
+def label_names(model_path: str = CLASSIFY_MODEL) -> Tuple[str, ...]:
+    """Class names by id for the classifier at model_path."""
+    try:
+        config = json.loads((Path(model_path) / "config.json").read_text(encoding="utf-8"))
+        id2label = {int(i): name for i, name in config.get("id2label", {}).items()}
+    except (OSError, ValueError):
+        id2label = {}
+    names = tuple(id2label[i] for i in sorted(id2label))
+    # Trainer's default id2label is LABEL_0, LABEL_1, ...: no names were saved
+    if len(names) != len(DATASET_LABELS) or any(n.startswith("LABEL_") for n in names):
+        return DATASET_LABELS
+    return names
+
+
+def fit_rank(label: int, names: Sequence[str] = ()) -> int:
+    """Ordinal fit of a class id: 0 = no fit … 2 = good fit."""
+    return label_rank((names or label_names())[label])
@@ -0,0 +1,178 @@
+"""
+Diff-aware re-scoring for the edit → re-scan loop.
+
+The résumé is cut into sections: a new section starts at a heading line, and
+after any line whose crc32 is divisible by `SECTION_SPLIT` (content-defined
+boundaries, so inserting a line only disturbs the sections around it).
+Per-section work is cached by the section's sha1:
+
+    terms   TF-IDF analyzer counts      → document TF-IDF vector
+    nouns   NOUN/PROPN lemmas (spaCy)   → keyword gaps
+    emb     SBERT embedding             → document embedding
+
+Document-level results are then assembled from the parts, so a re-scan
+after editing one bullet parses and embeds one or two sections, not the
+whole résumé.  The job side is cached whole by its hash.
+
+The TF-IDF score equals `DualSimilarity`'s (same analyzer, same smoothed
+IDF over the two documents).  The SBERT score is the cosine between the job
+and the length-weighted mean of section embeddings, so unlike a single
+`encode` of the whole résumé it is not truncated at the model's max length.
+Keyword gaps parse sections separately, so a word at a section edge may be
+tagged slightly differently than in a whole-document parse.  The fit
+classifier reads the whole pair and is not incremental.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import LRUCache
+from .config import SECTION_CACHE_SIZE, TOP_N_GAPS
+from .metrics import Counter as MetricCounter
+
+SECTION_SPLIT = 8        # ≈ average lines per section between headings
+_HEADING_RE = re.compile(r"^\s*(?:[A-Z][A-Z0-9 &/,\-]{2,40}|[A-Za-z][\w &/,\-]{0,40}:)\s*$")
+
+SECTION_LOOKUPS = MetricCounter(
+    "resume_incremental_sections_total", "Résumé sections reused from / added to the cache", ["result"],
+)
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+
+def split_sections(text: str) -> List[str]:
+    """Cut text into sections; "\\n".join(sections) gives the text back."""
+    sections: List[str] = []
+    current: List[str] = []
+    for line in text.split("\n"):
+        if current and _HEADING_RE.match(line):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+        if zlib.crc32(line.encode("utf-8")) % SECTION_SPLIT == 0:
+            sections.append("\n".join(current))
+            current = []
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def tfidf_cosine(a: Counter, b: Counter) -> float:
+    """Cosine of TfidfVectorizer defaults (smooth IDF, l2 norm) fitted on exactly [a, b]."""
+    idf = {t: math.log(3 / (1 + (t in a) + (t in b))) + 1 for t in a.keys() | b.keys()}
+    dot = sum(a[t] * b[t] * idf[t] ** 2 for t in a.keys() & b.keys())
+    na = math.sqrt(sum((n * idf[t]) ** 2 for t, n in a.items()))
+    nb = math.sqrt(sum((n * idf[t]) ** 2 for t, n in b.items()))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+class IncrementalAnalyzer:
+    def __init__(
+        self,
+        encode: Optional[Encoder] = None,
+        parse: Optional[Callable[[str], object]] = None,
+        cache_size: int = SECTION_CACHE_SIZE,
+    ):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self._analyzer = TfidfVectorizer(stop_words="english").build_analyzer()
+        self._encode = encode
+        self._parse = parse
+        self.sections = LRUCache(cache_size)
+        self.jobs = LRUCache(max(16, cache_size // 64))
+
+    # ── lazily bound models (the defaults load SBERT / spaCy) ────────────────
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self._encode is None:
+            from .pipeline import get_similarity
+            sbert = get_similarity().sbert
+            self._encode = lambda t: sbert.encode(t, normalize_embeddings=True)
+        return np.asarray(self._encode(texts))
+
+    def parse(self, text: str):
+        if self._parse is None:
+            from .parser import ParsedDocument
+            self._parse = ParsedDocument.from_text
+        return self._parse(text)
+
+    # ── per-part state ───────────────────────────────────────────────────────
+    def _section_states(self, resume_text: str) -> List[Tuple[str, dict]]:
+        states = []
+        for text in split_sections(resume_text):
+            key = _digest(text)
+            state = self.sections.get(key)
+            SECTION_LOOKUPS.inc(result="hit" if state is not None else "miss")
+            if state is None:
+                state = {"terms": Counter(self._analyzer(text)), "words": len(text.split())}
+                self.sections.set(key, state)
+            states.append((text, state))
+        return states
+
+    def _job_state(self, job_text: str) -> dict:
+        key = _digest(job_text)
+        state = self.jobs.get(key)
+        if state is None:
+            state = {"terms": Counter(self._analyzer(job_text))}
+            self.jobs.set(key, state)
+        return state
+
+    def _fill_embeddings(self, states: Sequence[Tuple[str, dict]]) -> None:
+        todo = [(text, st) for text, st in states if "emb" not in st and st["words"]]
+        if todo:
+            for (_, st), emb in zip(todo, self.encode([t for t, _ in todo])):
+                st["emb"] = emb
+
+    # ── document-level results ──────────────────────────────────────────────
+    def similarity(self, resume_text: str, job_text: str) -> Tuple[float, float]:
+        states = self._section_states(resume_text)
+        job = self._job_state(job_text)
+
+        terms = Counter()
+        for _, st in states:
+            terms.update(st["terms"])
+        tf = tfidf_cosine(terms, job["terms"])
+
+        self._fill_embeddings(states)
+        if "emb" not in job:
+            job["emb"] = self.encode([job_text])[0]
+        weighted = [(st["emb"], st["words"]) for _, st in states if "emb" in st]
+        if not weighted:
+            return tf, 0.0
+        doc = np.average(np.stack([e for e, _ in weighted]), axis=0, weights=[w for _, w in weighted])
+        norm = np.linalg.norm(doc)
+        sb = float(np.dot(doc / norm, job["emb"])) if norm else 0.0
+        return tf, sb
+
+    def gaps(self, resume_text: str, job_text: str, top: int = TOP_N_GAPS) -> List[str]:
+        from .suggester import _looks_like_real_word, _rank_missing
+        from .parser import IS_ALPHA, IS_STOP
+
+        lemmas: set = set()
+        for text, st in self._section_states(resume_text):
+            if "nouns" not in st:
+                st["nouns"] = frozenset(self.parse(text).lemmas_with_pos("NOUN", "PROPN"))
+            lemmas |= st["nouns"]
+
+        job = self._job_state(job_text)
+        if "candidates" not in job:
+            doc = self.parse(job_text)
+            keep = np.isin(doc.pos, _noun_codes()) & ((doc.flags & IS_ALPHA) > 0) & ((doc.flags & IS_STOP) == 0)
+            words = [doc.strings[i] for i in doc.orth[keep]]
+            job["candidates"] = [w for w in words if _looks_like_real_word(w)]
+        return _rank_missing(lemmas, job["candidates"], top)
+
+
+def _noun_codes() -> List[int]:
+    from .parser import POS_TAGS
+    return [POS_TAGS.index("NOUN"), POS_TAGS.index("PROPN")]
@@ -4,6 +4,9 @@ import cloudscraper
 from bs4 import BeautifulSoup
 import trafilatura
 
+from .config import SCRAPE_JS_MIN_SECONDS
+from .deadline import NO_DEADLINE, Deadline
+
 # Optional JavaScript rendering fallback
 try:
     from requests_html import HTMLSession
@@ -48,8 +51,14 @@ def _fallback_bs_extract(soup) -> str:
     best = max(candidates, key=lambda tag: len(tag.get_text()), default=None)
     return best.get_text(separator="\n") if best else ""
 
-def fetch(url: str) -> str:
-    html = _get_html(url)
+def fetch(url: str, deadline: Deadline = NO_DEADLINE) -> str:
+    """
+    Job description text from a posting URL. The HTTP timeout ends at the
+    deadline, and the slow JS-render fallback only runs with at least
+    SCRAPE_JS_MIN_SECONDS left.
+    """
+    deadline.check("job fetch")
+    html = _get_html(url, timeout=deadline.timeout(10))
     soup = BeautifulSoup(html, "html.parser")
 
     # 1. Try Trafilatura
@@ -64,9 +73,9 @@ def fetch(url: str) -> str:
         txt = _fallback_bs_extract(soup)
 
     # 4. Last-resort: JS render fallback
-    if not txt and _have_js:
-        r = _js_session.get(url)
-        r.html.render(timeout=20)
+    if not txt and _have_js and deadline.allows(SCRAPE_JS_MIN_SECONDS):
+        r = _js_session.get(url, timeout=deadline.timeout(10))
+        r.html.render(timeout=deadline.timeout(20))
         txt = r.html.full_text or ""
 
     # Filter out boilerplate and blank lines
@@ -0,0 +1,190 @@
+"""
+In-process timers and counters, rendered in the Prometheus text format.
+
+    @timed("keyword_gaps")                 # latency histogram + call/error counters
+    def _keyword_gaps(...): ...
+
+    BATCH_SIZE.observe(len(pairs), kind="fit")
+    gauge("api_in_flight", "Stage calls running or queued", lambda: executor.in_flight)
+
+    render()                               # body for GET /metrics
+
+With `METRICS_ENABLED` off, `timed` hands back the undecorated function and
+`observe` / `inc` return immediately, so instrumented code pays nothing but
+one attribute check.  Metrics are per process: with the process executor,
+stage timings are recorded in the pool workers, not the API process.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .config import METRICS_ENABLED
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_registry: List["_Metric"] = []
+_registry_lock = threading.Lock()
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(head + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_str(self.labels, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        out = []
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = _label_str(self.labels, key, f'le="{_fmt(bound)}"')
+                out.append(f"{self.name}_bucket{le} {running}")
+            out.append(f"{self.name}_sum{_label_str(self.labels, key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_label_str(self.labels, key)} {running}")
+        return out
+
+
+class Gauge(_Metric):
+    """
+    Read at scrape time from `fn`, which returns a number or, for a gauge
+    with one label, a {label_value: number} dict.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], object], label: str = ""):
+        super().__init__(name, help, (label,) if label else ())
+        self.fn = fn
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:           # a broken callback must not break the scrape
+            return []
+        if isinstance(value, dict):
+            return [f"{self.name}{_label_str(self.labels, (k,))} {_fmt(v)}" for k, v in sorted(value.items())]
+        return [f"{self.name} {_fmt(value)}"]
+
+
+def gauge(name: str, help: str, fn: Callable[[], object], label: str = "") -> Gauge:
+    """Register a scrape-time gauge, replacing any earlier one of the same name."""
+    with _registry_lock:
+        _registry[:] = [m for m in _registry if m.name != name]
+    return Gauge(name, help, fn, label)
+
+
+STAGE_SECONDS = Histogram("resume_stage_seconds", "Wall time of an instrumented stage", ["stage"])
+STAGE_ERRORS = Counter("resume_stage_errors_total", "Instrumented stage calls that raised", ["stage"])
+BATCH_SIZE = Histogram("resume_batch_size", "Items per batched model call", ["kind"], buckets=SIZE_BUCKETS)
+
+
+def timed(stage: str):
+    """Record latency (and failures) of every call under stage=<stage>."""
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                STAGE_ERRORS.inc(stage=stage)
+                raise
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - t0, stage=stage)
+        return wrapper
+    return decorator
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(m.render() for m in metrics) + "\n"
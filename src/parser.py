@@ -1,24 +1,242 @@
-from functools import cached_property
-import spacy, re
+"""
+Compact parsed documents.
+
+A spaCy `Doc` keeps every token, vector and annotation alive; holding
+thousands of them for ranking costs far more memory than the lemmas and
+skills callers actually read.  `ParsedDocument` keeps only parallel numpy
+arrays and lets the Doc be freed right after parsing:
+
+    orth    uint32  token text id          lemma  uint32  lowercased lemma id
+    pos     uint8   index into POS_TAGS    flags  uint8   IS_STOP | IS_PUNCT | IS_ALPHA
+    skill_ids uint32  SKILL_PATTERN matches, sorted by string
+
+Ids index a process-wide `StringTable`, so a word shared by many documents
+is stored once.  The shared table holds at most STRING_TABLE_MAX strings:
+once full, new documents intern into a fresh one, and each document keeps
+the table its ids index, so an old table is freed with its last document.
+Pickling ships just the strings a document uses and re-interns them on
+load; `save_corpus` / `load_corpus` write many documents as flat .npy
+arrays that load memory-mapped.
+
+`Resume` and `JobPost` are ParsedDocuments built straight from raw text.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import spacy
+
+from .config import STRING_TABLE_MAX
 
 # load SpaCy model (disable unnecessary pipes for speed)
 nlp = spacy.load("en_core_web_sm", disable=["ner"])
 SKILL_PATTERN = re.compile(r"\b([A-Za-z\+]+)\b")
 
-class Resume:
-    def __init__(self, raw_text: str):
-        self.doc = nlp(raw_text)
+POS_TAGS = (
+    "", "ADJ", "ADP", "ADV", "AUX", "CONJ", "CCONJ", "DET", "INTJ", "NOUN", "NUM", "PART",
+    "PRON", "PROPN", "PUNCT", "SCONJ", "SYM", "VERB", "X", "EOL", "SPACE",
+)
+_POS_CODE = {tag: i for i, tag in enumerate(POS_TAGS)}
+
+IS_STOP, IS_PUNCT, IS_ALPHA = 1, 2, 4
+
+
+class StringTable:
+    """Append-only string ↔ id interning."""
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self._strings: List[str] = []
+        self._ids: dict = {}
+        self._lock = threading.Lock()
+        for s in strings:
+            self.intern(s)
+
+    def intern(self, s: str) -> int:
+        i = self._ids.get(s)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(s)
+                if i is None:
+                    i = self._ids[s] = len(self._strings)
+                    self._strings.append(s)
+        return i
+
+    def intern_many(self, strings: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.intern(s) for s in strings), dtype=np.uint32, count=len(strings))
+
+    def __getitem__(self, i: int) -> str:
+        return self._strings[i]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+STRINGS = StringTable()
+_rotate_lock = threading.Lock()
+
+
+def shared_strings() -> StringTable:
+    """The process-wide table, replaced by an empty one once it is full."""
+    global STRINGS
+    if len(STRINGS) >= STRING_TABLE_MAX:
+        with _rotate_lock:
+            if len(STRINGS) >= STRING_TABLE_MAX:
+                STRINGS = StringTable()
+    return STRINGS
+
+
+class ParsedDocument:
+    __slots__ = ("orth", "lemma", "pos", "flags", "skill_ids", "strings")
+
+    def __init__(self, orth, lemma, pos, flags, skill_ids, strings: Optional[StringTable] = None):
+        self.orth = orth
+        self.lemma = lemma
+        self.pos = pos
+        self.flags = flags
+        self.skill_ids = skill_ids
+        self.strings = shared_strings() if strings is None else strings
 
-    @cached_property
-    def tokens(self):
+    @classmethod
+    def from_doc(cls, doc, strings: Optional[StringTable] = None) -> "ParsedDocument":
+        """Copy what callers need out of a spaCy Doc; the Doc can then be dropped."""
+        obj = cls.__new__(cls)
+        obj._fill(doc, strings)
+        return obj
+
+    @classmethod
+    def from_text(cls, raw_text: str, strings: Optional[StringTable] = None) -> "ParsedDocument":
+        return cls.from_doc(nlp(raw_text), strings)
+
+    def _fill(self, doc, strings: Optional[StringTable] = None) -> None:
+        # pick the table per document, so all of its ids index the same one
+        self.strings = strings = shared_strings() if strings is None else strings
+        self.orth = strings.intern_many([t.text for t in doc])
+        self.lemma = strings.intern_many([t.lemma_.lower() for t in doc])
+        self.pos = np.fromiter((_POS_CODE.get(t.pos_, 0) for t in doc), dtype=np.uint8, count=len(doc))
+        self.flags = np.fromiter(
+            (IS_STOP * t.is_stop | IS_PUNCT * t.is_punct | IS_ALPHA * t.is_alpha for t in doc),
+            dtype=np.uint8, count=len(doc),
+        )
+        skills = sorted({m.group(1) for m in SKILL_PATTERN.finditer(doc.text)})
+        self.skill_ids = strings.intern_many(skills)
+
+    def __len__(self) -> int:
+        return len(self.orth)
+
+    @property
+    def tokens(self) -> List[str]:
         """List of normalized lemmas (lowercase) excluding stopwords and punctuation."""
-        return [t.lemma_.lower() for t in self.doc if not t.is_stop and not t.is_punct]
+        keep = (self.flags & (IS_STOP | IS_PUNCT)) == 0
+        return [self.strings[i] for i in self.lemma[keep]]
 
-    @cached_property
-    def skills(self):
+    @property
+    def skills(self) -> List[str]:
         """Unique skill tokens matched by SKILL_PATTERN."""
-        return sorted({m.group(1) for m in SKILL_PATTERN.finditer(self.doc.text)})
+        return [self.strings[i] for i in self.skill_ids]
+
+    def lemmas_with_pos(self, *tags: str) -> set:
+        """Lowercased lemmas of tokens tagged with any of tags (e.g. "NOUN", "PROPN")."""
+        codes = [_POS_CODE[t] for t in tags]
+        return {self.strings[i] for i in self.lemma[np.isin(self.pos, codes)]}
+
+    # ── pickling: ship only this document's strings, re-intern on load ─────
+    def __getstate__(self):
+        ids = np.concatenate([self.orth, self.lemma, self.skill_ids])
+        used, local = np.unique(ids, return_inverse=True)
+        n, m = len(self.orth), len(self.lemma)
+        return {
+            "strings": [self.strings[i] for i in used],
+            "ids": local.astype(np.uint32),
+            "sizes": (n, m),
+            "pos": self.pos,
+            "flags": self.flags,
+        }
+
+    def __setstate__(self, state):
+        self.strings = shared_strings()
+        mapping = self.strings.intern_many(state["strings"])
+        ids = mapping[state["ids"]]
+        n, m = state["sizes"]
+        self.orth, self.lemma, self.skill_ids = ids[:n], ids[n:n + m], ids[n + m:]
+        self.pos = state["pos"]
+        self.flags = state["flags"]
+
+
+class Resume(ParsedDocument):
+    __slots__ = ()
+
+    def __init__(self, raw_text: str):
+        self._fill(nlp(raw_text))
+
 
 class JobPost(Resume):
     """Inherits token/skill extraction from Resume for job postings."""
-    pass
\ No newline at end of file
+    __slots__ = ()
+
+
+# --------------------------------------------------------------------------- #
+# Many documents on disk: flat arrays + offsets, memory-mapped on load
+# --------------------------------------------------------------------------- #
+
+_COLUMNS = ("orth", "lemma", "pos", "flags")
+
+
+def save_corpus(docs: Sequence[ParsedDocument], root: str | Path) -> Path:
+    """Write docs under root as concatenated .npy columns and one string table."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    table = StringTable()
+    remap = {}
+
+    def local(ids: np.ndarray, strings: StringTable) -> np.ndarray:
+        return np.fromiter(
+            (remap.setdefault((id(strings), i), table.intern(strings[i])) for i in ids.tolist()),
+            dtype=np.uint32, count=len(ids),
+        )
+
+    cols = {c: [] for c in _COLUMNS}
+    skills = []
+    for d in docs:
+        cols["orth"].append(local(d.orth, d.strings))
+        cols["lemma"].append(local(d.lemma, d.strings))
+        cols["pos"].append(d.pos)
+        cols["flags"].append(d.flags)
+        skills.append(local(d.skill_ids, d.strings))
+
+    offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum([len(d) for d in docs], out=offsets[1:])
+    skill_offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in skills], out=skill_offsets[1:])
+
+    for c in _COLUMNS:
+        dtype = np.uint8 if c in ("pos", "flags") else np.uint32
+        np.save(root / f"{c}.npy", np.concatenate(cols[c]) if docs else np.zeros(0, dtype))
+    np.save(root / "skills.npy", np.concatenate(skills) if docs else np.zeros(0, np.uint32))
+    np.save(root / "offsets.npy", offsets)
+    np.save(root / "skill_offsets.npy", skill_offsets)
+    (root / "strings.json").write_text(json.dumps(table._strings, ensure_ascii=False), encoding="utf-8")
+    return root
+
+
+def load_corpus(root: str | Path, mmap: bool = True) -> List[ParsedDocument]:
+    """Documents saved by save_corpus; with mmap their arrays are views of the files."""
+    root = Path(root)
+    mode = "r" if mmap else None
+    table = StringTable(json.loads((root / "strings.json").read_text(encoding="utf-8")))
+    cols = {c: np.load(root / f"{c}.npy", mmap_mode=mode) for c in _COLUMNS}
+    skills = np.load(root / "skills.npy", mmap_mode=mode)
+    offsets = np.load(root / "offsets.npy")
+    skill_offsets = np.load(root / "skill_offsets.npy")
+    return [
+        ParsedDocument(
+            *(cols[c][offsets[i]:offsets[i + 1]] for c in _COLUMNS),
+            skills[skill_offsets[i]:skill_offsets[i + 1]],
+            table,
+        )
+        for i in range(len(offsets) - 1)
+    ]
@@ -0,0 +1,282 @@
+"""
+Staged analysis of one résumé / job pair.
+
+Each stage is a `cached_property` on `Analysis`, so it runs at most once
+per pair and later stages reuse earlier results. For example,
+`suggestions` is built from the `fit` and `gaps` stages rather than running
+the classifier and spaCy again. Callers request only the stages they need:
+
+    Analysis(resume_text, job_text).result(["similarity", "fit"])
+
+`analyze_batch` does the same for many pairs, running SBERT and the
+classifier once over the whole batch. `analyze_many` scores one résumé
+against many jobs, parsing, embedding and tokenizing the résumé once, and
+returns the results ranked best match first.
+
+`Analysis(..., incremental=True)` takes the similarity and gaps stages from
+the process-wide `IncrementalAnalyzer`, which only reprocesses the résumé
+sections that changed since an earlier scan (see incremental.py).
+
+`Analysis(..., cascade=True)` asks the early-exit gate (early_exit.py)
+about the similarity scores first; for a clear mismatch or a near-perfect
+match the gate answers the fit stage, gaps and suggestions are skipped, and
+the result lists them in `skipped_stages`.
+
+`Analysis(..., deadline=Deadline.after_ms(300))` gives the analysis a time
+budget (deadline.py). Similarity always runs, since scores are the least a
+caller needs; every later stage runs only if its expected cost (a running
+average of past timings, plus any dependency not computed yet) fits in the
+time left. Otherwise it is skipped, listed in `skipped_stages`, and the
+result carries `degraded: true`.
+
+Stages
+------
+similarity   TF-IDF + SBERT cosine          → tf_idf_score, sbert_score
+fit          DistilBERT fit classifier      → predicted_class, fit_level, fit_confidence
+gaps         spaCy keyword gaps             → missing_keywords
+suggestions  bracketed bullet notes         → suggestions_markdown
+"""
+from __future__ import annotations
+
+import time
+from functools import cached_property, lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .config import HF_MODEL_EMBED, TOP_N_GAPS
+from .deadline import COSTS, NO_DEADLINE, Deadline
+from .early_exit import EXIT_STAGES, get_gate
+from .fit_labels import fit_rank
+from .incremental import IncrementalAnalyzer
+from .similarity import DualSimilarity
+from .suggester import (
+    FIT_LABELS, _keyword_gaps, _keyword_gaps_many, _predict_fit, _predict_fit_batch, _predict_fit_many,
+    strip_suggestions, suggest_resume,
+)
+
+STAGES = ("similarity", "fit", "gaps", "suggestions")
+SCORE_STAGES = ("similarity", "fit")
+MANY_STAGES = ("similarity", "fit", "gaps")
+# stages whose cached_property reads other stages
+_DEPENDS = {"suggestions": ("fit", "gaps")}
+
+
+@lru_cache(maxsize=1)
+def get_similarity() -> DualSimilarity:
+    """Process-wide DualSimilarity (loading SBERT is the expensive part)."""
+    return DualSimilarity(HF_MODEL_EMBED)
+
+
+@lru_cache(maxsize=1)
+def get_incremental() -> IncrementalAnalyzer:
+    """Process-wide section cache for edit → re-scan loops."""
+    return IncrementalAnalyzer()
+
+
+def parse_stages(spec: str | Iterable[str] | None) -> Tuple[str, ...]:
+    """
+    "all" / None → every stage; otherwise a comma-separated string or list.
+    Returned in pipeline order. Raises ValueError on unknown names.
+    """
+    if spec is None or spec == "all":
+        return STAGES
+    names = [s.strip() for s in (spec.split(",") if isinstance(spec, str) else spec) if s.strip()]
+    unknown = sorted(set(names) - set(STAGES))
+    if unknown:
+        raise ValueError(f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(STAGES)}")
+    return tuple(s for s in STAGES if s in names)
+
+
+class Analysis:
+    def __init__(
+        self, resume_text: str, job_text: str, top_n_keywords: int = TOP_N_GAPS,
+        incremental: bool = False, cascade: bool = False, deadline: Deadline = NO_DEADLINE,
+    ):
+        self.resume_text = strip_suggestions(resume_text)
+        self.job_text = job_text
+        self.top_n_keywords = top_n_keywords
+        self.incremental = incremental
+        self.cascade = cascade
+        self.deadline = deadline
+        self.timed_out: List[str] = []          # stages skipped for lack of time
+
+    @cached_property
+    def similarity(self) -> Tuple[float, float]:
+        if self.incremental:
+            return get_incremental().similarity(self.resume_text, self.job_text)
+        tf, sb = get_similarity().score(self.resume_text, self.job_text)
+        return float(tf), float(sb)
+
+    @cached_property
+    def gate(self) -> Optional[dict]:
+        """Early-exit decision over the similarity scores (cascade mode with a trained gate)."""
+        gate = get_gate() if self.cascade else None
+        return gate.decide(*self.similarity) if gate else None
+
+    def skips(self, stage: str) -> bool:
+        return self.cascade and stage in EXIT_STAGES and self.gate is not None \
+            and self.gate["decision"] != "continue"
+
+    @cached_property
+    def fit(self) -> Tuple[int, float]:
+        return _predict_fit(self.resume_text, self.job_text)
+
+    @cached_property
+    def gaps(self) -> List[str]:
+        if self.incremental:
+            return get_incremental().gaps(self.resume_text, self.job_text, self.top_n_keywords)
+        return _keyword_gaps(self.resume_text, self.job_text, self.top_n_keywords)
+
+    @cached_property
+    def suggestions(self) -> str:
+        md, _ = suggest_resume(
+            self.resume_text, self.job_text, self.top_n_keywords,
+            fit=self.fit, keywords=self.gaps,
+        )
+        return md
+
+    def _expected_cost(self, stage: str) -> float:
+        todo = [s for s in (*_DEPENDS.get(stage, ()), stage) if s not in self.__dict__]
+        return sum(COSTS.estimate(s) for s in todo)
+
+    def _out_of_time(self, stage: str) -> bool:
+        if stage in self.timed_out:
+            return True
+        if any(dep in self.timed_out for dep in _DEPENDS.get(stage, ())):
+            self.timed_out.append(stage)
+            return True
+        if stage == "similarity" or self.deadline.allows(self._expected_cost(stage)):
+            return False
+        self.timed_out.append(stage)
+        return True
+
+    def _compute(self, stage: str) -> None:
+        """Run a stage (dependencies first), recording each one's own wall time."""
+        for dep in _DEPENDS.get(stage, ()):
+            self._compute(dep)
+        if stage not in self.__dict__:
+            t0 = time.perf_counter()
+            getattr(self, stage)
+            COSTS.observe(stage, time.perf_counter() - t0)
+
+    def stage_result(self, stage: str) -> dict:
+        """Response fields contributed by one stage ({} when it was skipped)."""
+        if stage not in STAGES:
+            raise ValueError(f"unknown stage {stage!r}")
+        if self.skips(stage):
+            if stage != "fit":
+                return {}
+            label = self.gate["label"]
+            return {
+                # gates saved before label_names was stored fall back to the classifier's names
+                "predicted_class": label, "fit_level": self.gate["fit_level"] or FIT_LABELS[label],
+                "fit_confidence": self.gate["confidence"], "fit_source": "cascade",
+            }
+        if self._out_of_time(stage):
+            return {}
+        self._compute(stage)
+        if stage == "similarity":
+            tf, sb = self.similarity
+            return {"tf_idf_score": tf, "sbert_score": sb}
+        if stage == "fit":
+            label, conf = self.fit
+            return {"predicted_class": label, "fit_level": FIT_LABELS[label], "fit_confidence": conf}
+        if stage == "gaps":
+            return {"missing_keywords": self.gaps}
+        return {"suggestions_markdown": self.suggestions}
+
+    def skipped(self, stage: str) -> bool:
+        """Skipped by the early-exit gate or for lack of time."""
+        return self.skips(stage) or stage in self.timed_out
+
+    def result(self, stages: Sequence[str] = STAGES) -> dict:
+        out: dict = {"stages": list(stages)}
+        for stage in stages:
+            out.update(self.stage_result(stage))
+        bounded = self.deadline.expires is not None
+        if self.cascade or bounded:
+            out["skipped_stages"] = [s for s in stages if self.skipped(s)]
+        if self.cascade:
+            out["cascade"] = self.gate or {"decision": "continue"}
+        if bounded:
+            out["degraded"] = bool(self.timed_out)
+        return out
+
+
+def analyze_batch(pairs: Sequence[Tuple[str, str]], stages: Sequence[str] = STAGES) -> List[dict]:
+    """
+    Analysis.result for many (resume, job) pairs. The similarity and fit
+    stages run as single batched model calls; the rest run per pair.
+    """
+    analyses = [Analysis(r, j) for r, j in pairs]
+    pairs = [(a.resume_text, a.job_text) for a in analyses]
+    # seed the cached_property slots so per-pair stages reuse batched results
+    if "similarity" in stages:
+        for a, (tf, sb) in zip(analyses, get_similarity().score_batch(pairs)):
+            a.__dict__["similarity"] = (float(tf), float(sb))
+    if "fit" in stages or "suggestions" in stages:
+        for a, fit in zip(analyses, _predict_fit_batch(pairs)):
+            a.__dict__["fit"] = fit
+    return [a.result(stages) for a in analyses]
+
+
+def _rank_key(result: dict) -> tuple:
+    # fit first (by label name: class ids are alphabetical), then semantic, then lexical similarity
+    label = result.get("predicted_class")
+    return (
+        -1 if label is None else fit_rank(label, FIT_LABELS),
+        result.get("sbert_score", 0.0),
+        result.get("tf_idf_score", 0.0),
+        result.get("fit_confidence", 0.0),
+    )
+
+
+def _seed_batched(analyses: List[Analysis], stage: str, run, deadline: Deadline) -> None:
+    """
+    Fill `stage` on every analysis from one batched call, or mark it timed
+    out on all of them if the batch is not expected to finish in time.
+    Batched timings are kept per job under "<stage>@many", since they run
+    well below the single-pair cost that seeds the first estimate.
+    """
+    key = f"{stage}@many"
+    if not deadline.allows(len(analyses) * (COSTS.estimate(key) or COSTS.estimate(stage))):
+        for a in analyses:
+            a.timed_out.append(stage)
+        return
+    t0 = time.perf_counter()
+    for a, value in zip(analyses, run()):
+        a.__dict__[stage] = value
+    COSTS.observe(key, (time.perf_counter() - t0) / len(analyses))
+
+
+def analyze_many(
+    resume_text: str,
+    job_texts: Sequence[str],
+    stages: Sequence[str] = MANY_STAGES,
+    top_n_keywords: int = TOP_N_GAPS,
+    deadline: Deadline = NO_DEADLINE,
+) -> List[dict]:
+    """
+    Analysis.result of one résumé against each job, best match first.
+    Every result carries `index` (position in job_texts) and `rank` (1-based).
+    With a deadline the batched fit and gaps passes run only if they are
+    expected to finish in time, as for a single Analysis.
+    """
+    analyses = [Analysis(resume_text, j, top_n_keywords, deadline=deadline) for j in job_texts]
+    if not analyses:
+        return []
+    resume = analyses[0].resume_text
+    jobs = [a.job_text for a in analyses]
+    # score_batch embeds each distinct text once, so the résumé is encoded once
+    if "similarity" in stages:
+        for a, (tf, sb) in zip(analyses, get_similarity().score_batch([(resume, j) for j in jobs])):
+            a.__dict__["similarity"] = (float(tf), float(sb))
+    if "fit" in stages or "suggestions" in stages:
+        _seed_batched(analyses, "fit", lambda: _predict_fit_many(resume, jobs), deadline)
+    if "gaps" in stages or "suggestions" in stages:
+        _seed_batched(analyses, "gaps", lambda: _keyword_gaps_many(resume, jobs, top_n_keywords), deadline)
+
+    results = [{"index": i, **a.result(stages)} for i, a in enumerate(analyses)]
+    results.sort(key=_rank_key, reverse=True)
+    for rank, r in enumerate(results, 1):
+        r["rank"] = rank
+    return results
@@ -0,0 +1,149 @@
+"""
+Per-stage profiling for the CLI (`analyze --profile`, `suggest --profile`).
+
+    prof = StageProfiler(enabled=True, dump="slow_resume")
+    with prof:                            # whole run: cProfile + stack sampler
+        with prof.stage("read_resume"):
+            ...
+    prof.records                          # [{stage, wall_ms, cpu_ms, peak_py_mb, rss_growth_mb}]
+
+For every stage it records wall time, CPU time of the process (so torch's
+intra-op threads count), the peak of Python allocations (tracemalloc) and
+the growth of the process's peak RSS, which is where native buffers such as
+model weights and activations show up.
+
+With `dump` set, the run is also written as `<dump>.pstats` (open with
+`python -m pstats` or snakeviz) and `<dump>.collapsed`: main-thread stacks
+sampled every `interval` seconds, one `frame;frame;frame count` line per
+stack, ready for flamegraph.pl or speedscope.
+
+When disabled, `stage()` is a no-op context manager.
+"""
+from __future__ import annotations
+
+import cProfile
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import List, Optional
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer; `collapsed()` folds the samples."""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = False, dump: Optional[Path] = None, interval: float = 0.005):
+        self.enabled = enabled
+        self.dump = Path(dump) if dump else None
+        self.interval = interval
+        self.records: List[dict] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+    def __enter__(self) -> "StageProfiler":
+        if not self.enabled:
+            return self
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        if self.dump:
+            self._sampler = StackSampler(threading.get_ident(), self.interval)
+            self._sampler.start()
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self.enabled:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+            self._sampler.stop()
+            self.dump.parent.mkdir(parents=True, exist_ok=True)
+            self._profile.dump_stats(str(self.dump.with_suffix(".pstats")))
+            self.dump.with_suffix(".collapsed").write_text(self._sampler.collapsed(), encoding="utf-8")
+        if self._tracing:
+            tracemalloc.stop()
+
+    def stage(self, name: str):
+        return self._measure(name) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _measure(self, name: str):
+        tracemalloc.reset_peak()
+        base_py = tracemalloc.get_traced_memory()[0]
+        rss0 = _max_rss_mb()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            self.records.append({
+                "stage": name,
+                "wall_ms": wall * 1000,
+                "cpu_ms": cpu * 1000,
+                "peak_py_mb": (tracemalloc.get_traced_memory()[1] - base_py) / (1024 * 1024),
+                "rss_growth_mb": _max_rss_mb() - rss0,
+            })
+
+    def table(self):
+        """rich Table of the recorded stages plus a total row."""
+        from rich.table import Table
+
+        table = Table(title="Stage profile")
+        for col in ("Stage", "Wall ms", "CPU ms", "Peak Python MB", "Peak RSS +MB"):
+            table.add_column(col, justify="left" if col == "Stage" else "right")
+        for r in self.records:
+            table.add_row(
+                r["stage"], f"{r['wall_ms']:.1f}", f"{r['cpu_ms']:.1f}",
+                f"{r['peak_py_mb']:.1f}", f"{r['rss_growth_mb']:.1f}",
+            )
+        table.add_row(
+            "[bold]total[/]",
+            f"{sum(r['wall_ms'] for r in self.records):.1f}",
+            f"{sum(r['cpu_ms'] for r in self.records):.1f}",
+            "", f"{sum(r['rss_growth_mb'] for r in self.records):.1f}",
+        )
+        return table
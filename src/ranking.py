@@ -0,0 +1,296 @@
+"""
+Rank a pool of candidate résumés against one job posting with a cascade:
+
+    lexical   BM25 over the whole pool            → top `lexical_k`
+    semantic  SBERT cosine (DualSimilarity.sbert) → top `semantic_k`
+    fit       models/resume-fit classifier        → top `fit_k`
+
+Each stage only sees the survivors of the previous one, so the classifier
+runs `fit_k` times instead of once per résumé.  BM25 is one vectorised pass
+over the pool; the semantic and fit stages may have time budgets.  They work
+in batches in the previous stage's order and stop when their budget is
+spent; unscored survivors keep their earlier order behind the scored ones
+and the stage is listed in `Ranking.truncated`.
+
+    python -m src.ranking rank --job posting.txt --top 10
+    python -m src.ranking evaluate --sample labelled.jsonl --k 10
+
+`evaluate` compares the cascade with exhaustive scoring (classifier on the
+whole pool) and reports recall@k, the recall lost, and how many relevant
+résumés each stage let through.  Sample lines are
+`{"job": "...", "relevant": ["<person_id>", ...]}`; without "relevant",
+the exhaustive top-k stands in as the label.
+"""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import typer
+
+from .fit_labels import fit_rank
+
+app = typer.Typer(help="Candidate pool ranking cascade")
+
+
+@app.callback()
+def main():
+    """Rank Resume_Database candidates against a job posting."""
+
+
+@dataclass
+class CascadeConfig:
+    lexical_k: int = 200
+    semantic_k: int = 50
+    fit_k: int = 10
+    # per-stage budgets in ms; None = unlimited
+    semantic_ms: Optional[float] = None
+    fit_ms: Optional[float] = None
+    batch_size: int = 32
+
+
+@dataclass
+class Ranking:
+    ids: List[str]                                          # best first
+    scores: Dict[str, dict]                                 # id → {"bm25", "sbert", "fit_level", ...}
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)      # stages that hit their budget
+
+
+# --------------------------------------------------------------------------- #
+# Stage 1: BM25
+# --------------------------------------------------------------------------- #
+
+class BM25:
+    """Okapi BM25 over a fixed corpus (sparse term counts from CountVectorizer)."""
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.vectorizer = CountVectorizer(stop_words="english")
+        tf = self.vectorizer.fit_transform(texts).tocsc().astype(np.float32)
+        n = tf.shape[0]
+        lengths = np.asarray(tf.sum(axis=1)).ravel()
+        df = np.diff(tf.indptr)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1e-9))
+        # precompute the saturated, idf-weighted term weights once per corpus
+        rows = tf.indices
+        cols = np.repeat(np.arange(tf.shape[1]), df)
+        weights = tf.data * (k1 + 1) / (tf.data + norm[rows]) * self.idf[cols]
+        self.weights = tf.copy()
+        self.weights.data = weights.astype(np.float32)
+        self.n_docs = n
+
+    def scores(self, query: str) -> np.ndarray:
+        terms = self.vectorizer.transform([query]).indices
+        if len(terms) == 0:
+            return np.zeros(self.n_docs, dtype=np.float32)
+        return np.asarray(self.weights[:, terms].sum(axis=1)).ravel()
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+def _over(t0: float, budget_ms: Optional[float]) -> bool:
+    return budget_ms is not None and (time.perf_counter() - t0) * 1000 >= budget_ms
+
+
+# --------------------------------------------------------------------------- #
+# Cascade
+# --------------------------------------------------------------------------- #
+
+class Cascade:
+    def __init__(self, ids: Sequence[str], texts: Sequence[str], config: CascadeConfig = CascadeConfig()):
+        self.ids = list(ids)
+        self.texts = list(texts)
+        self.config = config
+        self.bm25 = BM25(self.texts)
+        self._emb: Dict[int, np.ndarray] = {}       # pool index → normalised SBERT embedding
+
+    @classmethod
+    def from_database(cls, root: str | Path = "Resume_Database", config: CascadeConfig = CascadeConfig()) -> "Cascade":
+        from backend.parsing import parse_data
+        from .dataset_builder import _entry_to_text
+
+        data = parse_data(root)
+        return cls([str(k) for k in data], [_entry_to_text(v) for v in data.values()], config)
+
+    # heavy models load on first use
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        from .pipeline import get_similarity
+        return get_similarity().sbert.encode(texts, normalize_embeddings=True)
+
+    def _fit(self, pairs: List[Tuple[str, str]]) -> List[Tuple[int, float]]:
+        from .suggester import _predict_fit_batch
+        return _predict_fit_batch(pairs)
+
+    def _embeddings(self, idx: Sequence[int]) -> np.ndarray:
+        missing = [i for i in idx if i not in self._emb]
+        if missing:
+            for i, e in zip(missing, self._encode([self.texts[i] for i in missing])):
+                self._emb[i] = e
+        return np.stack([self._emb[i] for i in idx])
+
+    def rank(self, job_text: str, config: Optional[CascadeConfig] = None) -> Ranking:
+        cfg = config or self.config
+        timings, truncated = {}, []
+        scores: Dict[int, dict] = {}
+
+        # 1. lexical: whole pool, vectorised
+        t0 = time.perf_counter()
+        bm25 = self.bm25.scores(job_text)
+        order = list(_top(bm25, cfg.lexical_k))
+        for i in order:
+            scores[i] = {"bm25": float(bm25[i])}
+        timings["lexical"] = (time.perf_counter() - t0) * 1000
+
+        # 2. semantic: batches in BM25 order until the budget runs out
+        t0 = time.perf_counter()
+        job_emb = self._encode([job_text])[0]
+        done: List[int] = []
+        for start in range(0, len(order), cfg.batch_size):
+            if _over(t0, cfg.semantic_ms):
+                truncated.append("semantic")
+                break
+            batch = order[start:start + cfg.batch_size]
+            for i, s in zip(batch, self._embeddings(batch) @ job_emb):
+                scores[i]["sbert"] = float(s)
+            done.extend(batch)
+        done.sort(key=lambda i: -scores[i]["sbert"])
+        seen = set(done)
+        order = (done + [i for i in order if i not in seen])[:cfg.semantic_k]
+        timings["semantic"] = (time.perf_counter() - t0) * 1000
+
+        # 3. fit classifier on the top fit_k only
+        t0 = time.perf_counter()
+        head = order[:cfg.fit_k]
+        fitted: List[int] = []
+        for start in range(0, len(head), cfg.batch_size):
+            if _over(t0, cfg.fit_ms):
+                truncated.append("fit")
+                break
+            batch = head[start:start + cfg.batch_size]
+            for i, (label, conf) in zip(batch, self._fit([(self.texts[i], job_text) for i in batch])):
+                scores[i].update(fit_class=label, fit_confidence=conf, fit_score=_fit_score(label, conf))
+            fitted.extend(batch)
+        fitted.sort(key=lambda i: -scores[i]["fit_score"])
+        seen = set(fitted)
+        order = fitted + [i for i in order if i not in seen]
+        timings["fit"] = (time.perf_counter() - t0) * 1000
+
+        return Ranking(
+            ids=[self.ids[i] for i in order],
+            scores={self.ids[i]: scores[i] for i in order},
+            timings_ms=timings,
+            truncated=truncated,
+        )
+
+    def exhaustive(self, job_text: str) -> List[str]:
+        """Reference ranking: the classifier on every résumé in the pool."""
+        fits = []
+        for start in range(0, len(self.texts), self.config.batch_size):
+            batch = self.texts[start:start + self.config.batch_size]
+            fits.extend(self._fit([(t, job_text) for t in batch]))
+        order = sorted(range(len(fits)), key=lambda i: -_fit_score(*fits[i]))
+        return [self.ids[i] for i in order]
+
+
+def _fit_score(label: int, conf: float) -> float:
+    # ordinal fit first (class ids are alphabetical, see fit_labels.py), confidence breaks ties
+    return fit_rank(label) + conf
+
+
+def evaluate(cascade: Cascade, sample: Sequence[dict], k: int = 10) -> dict:
+    """
+    Recall@k of the cascade and of exhaustive scoring per labelled job, plus
+    how many relevant résumés survive each stage and the mean stage timings.
+    """
+    rows = []
+    for item in sample:
+        full = cascade.exhaustive(item["job"])
+        relevant = set(item.get("relevant") or full[:k])
+        if not relevant:
+            continue
+        r = cascade.rank(item["job"])
+        lexical = {cascade.ids[i] for i in _top(cascade.bm25.scores(item["job"]), cascade.config.lexical_k)}
+        rows.append({
+            "recall_cascade": len(relevant & set(r.ids[:k])) / len(relevant),
+            "recall_exhaustive": len(relevant & set(full[:k])) / len(relevant),
+            "survive_lexical": len(relevant & lexical) / len(relevant),
+            "survive_semantic": len(relevant & set(r.ids)) / len(relevant),   # r.ids = semantic_k survivors
+            **{f"{s}_ms": ms for s, ms in r.timings_ms.items()},
+        })
+    if not rows:
+        return {"queries": 0}
+    report = {key: float(np.mean([row[key] for row in rows])) for key in rows[0]}
+    report["recall_loss"] = report["recall_exhaustive"] - report["recall_cascade"]
+    report["queries"] = len(rows)
+    report["k"] = k
+    return report
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+
+def _config(lexical_k, semantic_k, fit_k, semantic_ms=None, fit_ms=None) -> CascadeConfig:
+    return CascadeConfig(lexical_k, semantic_k, fit_k, semantic_ms, fit_ms)
+
+
+@app.command()
+def rank(
+    job: Path          = typer.Option(..., help="Job description file"),
+    db: Path           = typer.Option(Path("Resume_Database"), help="Resume_Database directory"),
+    top: int           = typer.Option(10, help="Results to print"),
+    lexical_k: int     = typer.Option(200, help="BM25 survivors"),
+    semantic_k: int    = typer.Option(50, help="SBERT survivors"),
+    fit_k: int         = typer.Option(10, help="Résumés scored by the classifier"),
+    semantic_ms: float = typer.Option(None, help="SBERT stage budget (ms)"),
+    fit_ms: float      = typer.Option(None, help="Classifier stage budget (ms)"),
+):
+    """Rank the candidate pool against JOB."""
+    from .data_loader import read_file
+
+    cascade = Cascade.from_database(db, _config(lexical_k, semantic_k, fit_k, semantic_ms, fit_ms))
+    r = cascade.rank(read_file(job))
+    for pos, pid in enumerate(r.ids[:top], 1):
+        s = r.scores[pid]
+        fit = f"fit={s['fit_class']} ({s['fit_confidence']:.2f})" if "fit_class" in s else "fit=–"
+        sbert = f"{s['sbert']:.3f}" if "sbert" in s else "–"
+        typer.echo(f"{pos:3}. {pid:>8}  bm25={s['bm25']:7.2f}  sbert={sbert:>6}  {fit}")
+    typer.echo(" ".join(f"{k}={v:.0f}ms" for k, v in r.timings_ms.items())
+               + (f"  (budget hit: {', '.join(r.truncated)})" if r.truncated else ""))
+
+
+@app.command("evaluate")
+def evaluate_cmd(
+    sample: Path       = typer.Option(..., help="JSONL of {\"job\": ..., \"relevant\": [ids]} lines"),
+    db: Path           = typer.Option(Path("Resume_Database"), help="Resume_Database directory"),
+    k: int             = typer.Option(10, help="Recall cut-off"),
+    lexical_k: int     = typer.Option(200, help="BM25 survivors"),
+    semantic_k: int    = typer.Option(50, help="SBERT survivors"),
+    fit_k: int         = typer.Option(10, help="Résumés scored by the classifier"),
+    out: Path          = typer.Option(None, help="Write the report as JSON"),
+):
+    """Recall loss of the cascade versus exhaustive classifier scoring."""
+    cascade = Cascade.from_database(db, _config(lexical_k, semantic_k, fit_k))
+    items = [json.loads(line) for line in sample.read_text(encoding="utf-8").splitlines() if line.strip()]
+    report = evaluate(cascade, items, k)
+    typer.echo(json.dumps(report, indent=2))
+    if out:
+        out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    app()
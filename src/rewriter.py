@@ -0,0 +1,183 @@
+"""
+Bullet rewriting with the fine-tuned Flan-T5 model (`HF_MODEL_GENERATION`).
+
+All bullets of a résumé go through the model together: they are padded
+into batches of `GEN_BATCH_SIZE` and decoded with the KV cache enabled.
+Decoding is greedy, or beam search when `GEN_NUM_BEAMS > 1`. Output is
+capped at `MAX_NEW_TOKENS` per bullet, and each batch is further capped
+relative to its longest input, so a rewrite cannot run away.
+
+Public API
+----------
+`get_rewriter()` → shared, lazily loaded `Rewriter`
+
+`default_settings(streaming)` → the generation settings that shape its output
+
+`Rewriter.rewrite(bullets, keywords)` → list of rewritten bullets
+
+`Rewriter.stream(bullets, keywords)` → iterator of `Chunk(index, text, done)`
+    Token-level deltas for every bullet as the batch decodes (greedy only).
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Sequence
+
+from .config import HF_MODEL_GENERATION, MAX_NEW_TOKENS, GEN_NUM_BEAMS, GEN_BATCH_SIZE
+
+
+class Chunk(NamedTuple):
+    index: int      # position of the bullet in the request
+    text: str       # newly decoded text (delta); empty on the final event
+    done: bool      # True once the bullet has finished decoding
+
+
+def default_settings(streaming: bool = False) -> dict:
+    """Settings `get_rewriter()` decodes with; streaming is always greedy."""
+    return {"max_new_tokens": MAX_NEW_TOKENS, "num_beams": 1 if streaming else GEN_NUM_BEAMS}
+
+
+def build_prompt(bullet: str, keyword: Optional[str] = None) -> str:
+    kw = f' and work in "{keyword}"' if keyword else ""
+    return f"Rewrite this resume bullet with a strong action verb and measurable impact{kw}: {bullet}"
+
+
+def _batches(n: int, size: int) -> Iterator[range]:
+    for start in range(0, n, size):
+        yield range(start, min(start + size, n))
+
+
+class _BatchStreamer:
+    """
+    `generate(streamer=...)` hook that turns per-step token ids of a whole
+    batch into per-bullet text deltas on a queue.
+    """
+
+    def __init__(self, tokenizer, indices: range, eos_id: int, pad_id: int):
+        self.tokenizer = tokenizer
+        self.indices = indices
+        self.stop_ids = {eos_id, pad_id}
+        self.ids: List[List[int]] = [[] for _ in indices]
+        self.sent = [""] * len(indices)
+        self.done = [False] * len(indices)
+        self.queue: "queue.Queue[Chunk | None | BaseException]" = queue.Queue()
+        self._prompt_seen = False
+
+    def put(self, value):
+        # the first call carries the decoder start tokens, not generated text
+        if not self._prompt_seen:
+            self._prompt_seen = True
+            return
+        for row, tok in enumerate(value.view(-1).tolist()):
+            if self.done[row]:
+                continue
+            if tok in self.stop_ids:
+                self.done[row] = True
+                self.queue.put(Chunk(self.indices[row], "", True))
+                continue
+            self.ids[row].append(tok)
+            text = self.tokenizer.decode(self.ids[row], skip_special_tokens=True)
+            # SentencePiece may re-segment the tail; only emit stable growth
+            if len(text) > len(self.sent[row]) and text.startswith(self.sent[row]):
+                self.queue.put(Chunk(self.indices[row], text[len(self.sent[row]):], False))
+                self.sent[row] = text
+
+    def end(self):
+        for row, finished in enumerate(self.done):
+            if not finished:
+                self.done[row] = True
+                self.queue.put(Chunk(self.indices[row], "", True))
+        self.queue.put(None)
+
+
+class Rewriter:
+    def __init__(
+        self,
+        model_id: str = HF_MODEL_GENERATION,
+        max_new_tokens: int = MAX_NEW_TOKENS,
+        num_beams: int = GEN_NUM_BEAMS,
+        batch_size: int = GEN_BATCH_SIZE,
+    ):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+        self._torch = torch
+        self.model_id = model_id
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_id)
+        self.model.eval()
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.batch_size = batch_size
+
+    @property
+    def settings(self) -> dict:
+        """Generation settings that change the output (used in cache keys)."""
+        return {"max_new_tokens": self.max_new_tokens, "num_beams": self.num_beams}
+
+    def _encode(self, prompts: Sequence[str]):
+        return self.tokenizer(
+            list(prompts), padding=True, truncation=True, max_length=256, return_tensors="pt",
+        )
+
+    def _gen_kwargs(self, enc, num_beams: int) -> dict:
+        # a rewrite should not be much longer than the bullet it replaces
+        longest = int(enc["attention_mask"].sum(dim=1).max())
+        return dict(
+            max_new_tokens=min(self.max_new_tokens, 2 * longest + 8),
+            num_beams=num_beams,
+            early_stopping=num_beams > 1,
+            do_sample=False,
+            use_cache=True,
+        )
+
+    def rewrite(self, bullets: Sequence[str], keywords: Optional[Sequence[Optional[str]]] = None) -> List[str]:
+        """Rewrite every bullet; one padded generate() call per GEN_BATCH_SIZE bullets."""
+        keywords = keywords or [None] * len(bullets)
+        prompts = [build_prompt(b, k) for b, k in zip(bullets, keywords)]
+        out: List[str] = []
+        for idx in _batches(len(prompts), self.batch_size):
+            enc = self._encode(prompts[idx.start:idx.stop])
+            with self._torch.inference_mode():
+                ids = self.model.generate(**enc, **self._gen_kwargs(enc, self.num_beams))
+            out.extend(t.strip() for t in self.tokenizer.batch_decode(ids, skip_special_tokens=True))
+        return out
+
+    def stream(
+        self, bullets: Sequence[str], keywords: Optional[Sequence[Optional[str]]] = None,
+    ) -> Iterator[Chunk]:
+        """
+        Greedy-decode all bullets batch by batch, yielding text deltas as soon
+        as each step is decoded (transformers streamers exclude beam search).
+        """
+        keywords = keywords or [None] * len(bullets)
+        prompts = [build_prompt(b, k) for b, k in zip(bullets, keywords)]
+        for idx in _batches(len(prompts), self.batch_size):
+            enc = self._encode(prompts[idx.start:idx.stop])
+            streamer = _BatchStreamer(
+                self.tokenizer, idx, self.tokenizer.eos_token_id, self.tokenizer.pad_token_id,
+            )
+
+            def run():
+                try:
+                    with self._torch.inference_mode():
+                        self.model.generate(**enc, **self._gen_kwargs(enc, 1), streamer=streamer)
+                except BaseException as e:     # surface in the consuming thread
+                    streamer.queue.put(e)
+                    streamer.queue.put(None)
+
+            worker = threading.Thread(target=run, daemon=True)
+            worker.start()
+            while (item := streamer.queue.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+            worker.join()
+
+
+@lru_cache(maxsize=1)
+def get_rewriter() -> Rewriter:
+    """Process-wide Rewriter, loaded on first use."""
+    return Rewriter()
@@ -1,20 +1,37 @@
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .metrics import BATCH_SIZE, timed
+
 class DualSimilarity:
     def __init__(self, hf_model: str):
         self.sbert = SentenceTransformer(hf_model)
         self.tfidf = TfidfVectorizer(stop_words="english")
 
     def _tfidf_score(self, a: str, b: str) -> float:
-        mat = self.tfidf.fit_transform([a, b])
+        # fit a fresh copy: a shared instance may be scored from several threads
+        mat = clone(self.tfidf).fit_transform([a, b])
         return cosine_similarity(mat[0], mat[1])[0, 0]
 
     def _sbert_score(self, a: str, b: str) -> float:
         emb = self.sbert.encode([a, b], normalize_embeddings=True)
         return float(np.dot(emb[0], emb[1]))
 
+    @timed("similarity")
     def score(self, resume_text: str, job_text: str) -> tuple[float, float]:
-        return self._tfidf_score(resume_text, job_text), self._sbert_score(resume_text, job_text)
\ No newline at end of file
+        return self._tfidf_score(resume_text, job_text), self._sbert_score(resume_text, job_text)
+
+    @timed("similarity_batch")
+    def score_batch(self, pairs: list[tuple[str, str]]) -> list[tuple[float, float]]:
+        """score() for many pairs with one SBERT pass over the distinct texts."""
+        BATCH_SIZE.observe(len(pairs), kind="similarity")
+        texts = list(dict.fromkeys(t for pair in pairs for t in pair))
+        emb = self.sbert.encode(texts, normalize_embeddings=True) if texts else []
+        row = {t: i for i, t in enumerate(texts)}
+        return [
+            (self._tfidf_score(a, b), float(np.dot(emb[row[a]], emb[row[b]])))
+            for a, b in pairs
+        ]
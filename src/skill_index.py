@@ -0,0 +1,380 @@
+"""
+Inverted index over Resume_Database for boolean recruiter queries.
+
+    python -m src.skill_index build                       # → SKILL_INDEX_DIR
+    python -m src.skill_index query 'python AND kubernetes NOT intern'
+
+Terms are every skill and ability as a whole lowercased phrase
+("machine learning") plus the word tokens of `_entry_to_text(entry)`.
+Each term's postings are the sorted ordinals of the people containing it,
+stored as gaps in variable-byte code (7 bits per byte, high bit set on a
+value's last byte), so a common term costs about one byte per person.
+
+Layout of an index directory::
+
+    meta.json        people, terms, source directory
+    terms.json       sorted terms; term i owns postings[offsets[i]:offsets[i + 1]]
+    ids.json         person_id of each ordinal
+    postings.npy     uint8, all encoded postings back to back
+    offsets.npy      int64, len = terms + 1
+    df.npy           uint32, people per term
+
+`SkillIndex.load` memory-maps postings.npy; only the postings a query
+touches are read and decoded (decoded lists are kept in a small LRU).
+
+Query syntax: terms, "quoted phrases", AND, OR, NOT and parentheses;
+adjacent terms are ANDed and NOT binds tightest.  A term matching a
+skill/ability phrase uses its postings; otherwise its words are ANDed.
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+import typer
+
+from .cache import LRUCache
+from .config import SKILL_INDEX_DIR
+
+app = typer.Typer(help="Boolean skill/keyword index over Resume_Database")
+
+
+@app.callback()
+def main():
+    """Build and query the Resume_Database inverted index."""
+
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens ("c++", "node.js", "ci-cd" stay whole)."""
+    return _WORD_RE.findall(text.lower())
+
+
+def _phrase(text: str) -> str:
+    return " ".join(tokenize(text))
+
+
+# --------------------------------------------------------------------------- #
+# Variable-byte gap coding
+# --------------------------------------------------------------------------- #
+
+def vbyte_encode(ids: np.ndarray) -> np.ndarray:
+    """Sorted, unique ids → uint8 gap code."""
+    gaps = np.diff(np.asarray(ids, dtype=np.uint64), prepend=np.uint64(0))
+    nbytes = np.ones(len(gaps), dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        nbytes += gaps >= (1 << shift)
+    starts = np.zeros(len(gaps), dtype=np.int64)
+    np.cumsum(nbytes[:-1], out=starts[1:])
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(5):
+        more = nbytes > k
+        out[starts[more] + k] = (gaps[more] >> np.uint64(7 * k)) & np.uint64(0x7F)
+    out[starts + nbytes - 1] |= 0x80
+    return out
+
+
+def vbyte_decode(code: np.ndarray) -> np.ndarray:
+    """Inverse of vbyte_encode → sorted uint32 ids."""
+    code = np.asarray(code, dtype=np.uint8)
+    if len(code) == 0:
+        return np.zeros(0, dtype=np.uint32)
+    ends = np.flatnonzero(code & 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # each byte's position within its value → its 7-bit shift
+    pos = np.arange(len(code)) - np.repeat(starts, ends - starts + 1)
+    parts = (code & 0x7F).astype(np.uint64) << (7 * pos).astype(np.uint64)
+    gaps = np.add.reduceat(parts, starts)
+    return np.cumsum(gaps).astype(np.uint32)
+
+
+# --------------------------------------------------------------------------- #
+# Sorted postings algebra
+# --------------------------------------------------------------------------- #
+
+def intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Sorted a ∩ b; binary-searches the shorter list into the longer one."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return a
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = len(b) - 1
+    return a[b[idx] == a]
+
+
+def union(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.union1d(a, b).astype(np.uint32)
+
+
+def difference(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Sorted a \\ b."""
+    if len(a) == 0 or len(b) == 0:
+        return a
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = len(b) - 1
+    return a[b[idx] != a]
+
+
+# --------------------------------------------------------------------------- #
+# Queries
+# --------------------------------------------------------------------------- #
+
+class QueryError(ValueError):
+    pass
+
+
+_QUERY_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+
+# parsed query: ("term", text) | ("not", q) | ("and", [q, ...]) | ("or", [q, ...])
+Query = tuple
+
+
+def parse_query(text: str) -> Query:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _QUERY_TOKEN_RE.match(text, pos)
+        if m is None or m.end() == pos:
+            raise QueryError(f"Unbalanced quote at {pos}")
+        lpar, rpar, quoted, word = m.groups()
+        if lpar or rpar:
+            tokens.append(lpar or rpar)
+        elif quoted is not None:
+            tokens.append(("term", quoted))
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append(word)
+        else:
+            tokens.append(("term", word))
+        pos = m.end()
+    if not tokens:
+        raise QueryError("Empty query")
+
+    def peek():
+        return tokens[0] if tokens else None
+
+    def or_expr():
+        parts = [and_expr()]
+        while peek() == "OR":
+            tokens.pop(0)
+            parts.append(and_expr())
+        return parts[0] if len(parts) == 1 else ("or", parts)
+
+    def and_expr():
+        parts = [not_expr()]
+        while tokens and peek() not in ("OR", ")"):
+            if peek() == "AND":
+                tokens.pop(0)
+            parts.append(not_expr())
+        return parts[0] if len(parts) == 1 else ("and", parts)
+
+    def not_expr():
+        if peek() == "NOT":
+            tokens.pop(0)
+            return ("not", not_expr())
+        return atom()
+
+    def atom():
+        if not tokens:
+            raise QueryError("Query ends where a term was expected")
+        tok = tokens.pop(0)
+        if tok == "(":
+            q = or_expr()
+            if peek() != ")":
+                raise QueryError("Missing ')'")
+            tokens.pop(0)
+            return q
+        if isinstance(tok, tuple):
+            return tok
+        raise QueryError(f"Unexpected {tok!r}")
+
+    q = or_expr()
+    if tokens:
+        raise QueryError(f"Unexpected {tokens[0]!r}")
+    return q
+
+
+# --------------------------------------------------------------------------- #
+# Index
+# --------------------------------------------------------------------------- #
+
+class SkillIndex:
+    def __init__(self, terms: Sequence[str], ids: Sequence, postings: np.ndarray,
+                 offsets: np.ndarray, df: np.ndarray, cache_size: int = 1024):
+        self.terms = list(terms)
+        self.ids = list(ids)
+        self.postings = postings
+        self.offsets = offsets
+        self.df = df
+        self._term_ids: Dict[str, int] = {t: i for i, t in enumerate(self.terms)}
+        self._decoded = LRUCache(cache_size)
+
+    @classmethod
+    def build(cls, data: Dict) -> "SkillIndex":
+        """Index parse_data() output: {person_id: entry}."""
+        from .dataset_builder import _entry_to_text
+
+        lists: Dict[str, List[int]] = {}
+        for doc, entry in enumerate(data.values()):
+            terms = set(tokenize(_entry_to_text(entry)))
+            for value in list(entry.get("skills", [])) + list(entry.get("abilities", [])):
+                if isinstance(value, str) and _phrase(value):
+                    terms.add(_phrase(value))
+            for t in terms:
+                lists.setdefault(t, []).append(doc)     # docs arrive in order → sorted
+
+        terms = sorted(lists)
+        encoded = [vbyte_encode(np.asarray(lists[t])) for t in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        postings = np.concatenate(encoded) if encoded else np.zeros(0, dtype=np.uint8)
+        df = np.array([len(lists[t]) for t in terms], dtype=np.uint32)
+        return cls(terms, [_jsonable(k) for k in data], postings, offsets, df)
+
+    def save(self, root: str | Path, source: str = "") -> Path:
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        np.save(root / "postings.npy", np.asarray(self.postings))
+        np.save(root / "offsets.npy", self.offsets)
+        np.save(root / "df.npy", self.df)
+        (root / "terms.json").write_text(json.dumps(self.terms, ensure_ascii=False), encoding="utf-8")
+        (root / "ids.json").write_text(json.dumps(self.ids), encoding="utf-8")
+        (root / "meta.json").write_text(json.dumps({
+            "people": len(self.ids), "terms": len(self.terms),
+            "postings_bytes": int(len(self.postings)), "source": source,
+        }, indent=2), encoding="utf-8")
+        return root
+
+    @classmethod
+    def load(cls, root: str | Path = SKILL_INDEX_DIR, mmap: bool = True) -> "SkillIndex":
+        root = Path(root)
+        if not (root / "meta.json").exists():
+            raise FileNotFoundError(f"No skill index at {root}; run `python -m src.skill_index build`")
+        return cls(
+            json.loads((root / "terms.json").read_text(encoding="utf-8")),
+            json.loads((root / "ids.json").read_text(encoding="utf-8")),
+            np.load(root / "postings.npy", mmap_mode="r" if mmap else None),
+            np.load(root / "offsets.npy"),
+            np.load(root / "df.npy"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ── postings ───────────────────────────────────────────────────────────
+    def postings_for(self, term: str) -> np.ndarray:
+        """Sorted ordinals for one term: a skill phrase, else all of its words."""
+        phrase = _phrase(term)
+        if phrase in self._term_ids:
+            return self._decode(self._term_ids[phrase])
+        words = phrase.split()
+        if not words:
+            return np.zeros(0, dtype=np.uint32)
+        lists = []
+        for w in words:
+            i = self._term_ids.get(w)
+            if i is None:
+                return np.zeros(0, dtype=np.uint32)
+            lists.append(i)
+        lists.sort(key=lambda i: self.df[i])             # rarest first keeps the running result small
+        result = self._decode(lists[0])
+        for i in lists[1:]:
+            result = intersect(result, self._decode(i))
+        return result
+
+    def _decode(self, term_id: int) -> np.ndarray:
+        hit = self._decoded.get(term_id)
+        if hit is None:
+            hit = vbyte_decode(self.postings[self.offsets[term_id]:self.offsets[term_id + 1]])
+            self._decoded.set(term_id, hit)
+        return hit
+
+    # ── queries ────────────────────────────────────────────────────────────
+    def search(self, query: Union[str, Query]) -> List:
+        """person_ids matching a boolean query, in index order."""
+        q = parse_query(query) if isinstance(query, str) else query
+        return [self.ids[i] for i in self._eval(q)]
+
+    def count(self, query: Union[str, Query]) -> int:
+        q = parse_query(query) if isinstance(query, str) else query
+        return len(self._eval(q))
+
+    def _eval(self, q: Query) -> np.ndarray:
+        kind, arg = q
+        if kind == "term":
+            return self.postings_for(arg)
+        if kind == "not":
+            return difference(np.arange(len(self.ids), dtype=np.uint32), self._eval(arg))
+        if kind == "or":
+            result = self._eval(arg[0])
+            for sub in arg[1:]:
+                result = union(result, self._eval(sub))
+            return result
+        # and: intersect the positive parts smallest first, then subtract the NOTs
+        positive = [self._eval(sub) for sub in arg if sub[0] != "not"]
+        negative = [sub[1] for sub in arg if sub[0] == "not"]
+        if positive:
+            positive.sort(key=len)
+            result = positive[0]
+            for p in positive[1:]:
+                if len(result) == 0:
+                    break
+                result = intersect(result, p)
+        else:
+            result = np.arange(len(self.ids), dtype=np.uint32)
+        for sub in negative:
+            if len(result) == 0:
+                break
+            result = difference(result, self._eval(sub))
+        return result
+
+
+def _jsonable(key):
+    return key.item() if isinstance(key, np.generic) else key
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+
+@app.command()
+def build(
+    db: Path  = typer.Option(Path("Resume_Database"), help="Resume_Database directory"),
+    out: Path = typer.Option(SKILL_INDEX_DIR, help="Index directory"),
+):
+    """Index the skills, abilities and text of every person in DB."""
+    from backend.parsing import parse_data
+
+    index = SkillIndex.build(parse_data(db))
+    index.save(out, source=str(db))
+    typer.echo(
+        f"[skill_index] {len(index)} people, {len(index.terms)} terms, "
+        f"{len(index.postings) / 1024:.1f} KiB of postings → {out}"
+    )
+
+
+@app.command()
+def query(
+    q: str      = typer.Argument(..., help='e.g. \'python AND kubernetes NOT intern\''),
+    index: Path = typer.Option(SKILL_INDEX_DIR, help="Index directory"),
+    limit: int  = typer.Option(50, help="person_ids to print"),
+):
+    """Print the person_ids matching Q."""
+    idx = SkillIndex.load(index)
+    try:
+        ids = idx.search(q)
+    except QueryError as e:
+        raise typer.BadParameter(str(e), param_hint="Q")
+    typer.echo(f"{len(ids)} match(es)")
+    for pid in ids[:limit]:
+        typer.echo(pid)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,6 +1,6 @@
+import hashlib
 import streamlit as st
-from pathlib import Path
-from src.data_loader import read_file
+from src.data_loader import read_bytes
 from src.similarity import DualSimilarity
 from src.suggester import suggest_edits
 from src.config import HF_MODEL_EMBED
@@ -9,6 +9,46 @@ from src.job_scraper import fetch as fetch_job
 st.set_page_config(page_title="Resume Optimizer", layout="wide")
 st.title("📄 Resume Optimizer")
 
+# ── Cached resources & results ────────────────────────────────────────────────
+# Streamlit reruns this script on every widget change; models load once per
+# server process and results are reused for the same résumé / job content.
+
+@st.cache_resource
+def get_similarity() -> DualSimilarity:
+    return DualSimilarity(HF_MODEL_EMBED)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def extract(digest: str, name: str, _data: bytes) -> str:
+    # _data is skipped by Streamlit's hasher; digest stands in for it
+    return read_bytes(_data, name)
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def fetch_cached(url: str) -> str:
+    return fetch_job(url)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def score(res_digest: str, job_digest: str, _res_text: str, _job_text: str) -> tuple[float, float]:
+    tf, sb = get_similarity().score(_res_text, _job_text)
+    return float(tf), float(sb)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def suggestions(res_digest: str, job_digest: str, _res_text: str, _job_text: str) -> str:
+    return suggest_edits(_res_text, _job_text)
+
+
+def _read_upload(f) -> str:
+    data = f.getvalue()
+    return extract(hashlib.sha256(data).hexdigest(), f.name, data)
+
+
 col1, col2 = st.columns(2)
 with col1:
     res_f = st.file_uploader("Upload Resume", type=["pdf","docx","txt"])
@@ -17,14 +57,18 @@ with col2:
     url  = st.text_input("…or paste job URL")
 
 if res_f and (job_f or url):
-    res_text = read_file(res_f)
-    job_text = fetch_job(url) if url else read_file(job_f)
+    res_text = _read_upload(res_f)
+    job_text = fetch_cached(url) if url else _read_upload(job_f)
+    keys = (_digest(res_text), _digest(job_text))
 
-    tf, sb = DualSimilarity(HF_MODEL_EMBED).score(res_text, job_text)
+    tf, sb = score(*keys, res_text, job_text)
     st.success(f"**TF-IDF:** {tf:.3f}   **SBERT:** {sb:.3f}")
 
+    # remember the click, so later reruns keep showing the cached result
     if st.button("Suggest Improvements"):
+        st.session_state.suggested = keys
+    if st.session_state.get("suggested") == keys:
         with st.spinner("Generating…"):
-            out = suggest_edits(res_text, job_text)
+            out = suggestions(*keys, res_text, job_text)
         st.download_button("Download .md", out, file_name="improved_resume.md")
-        st.markdown(out)
\ No newline at end of file
+        st.markdown(out)
@@ -18,11 +18,23 @@ Improvements over the previous version
 4. **Clean markdown**
    • Single header section; each line printed once with bracketed suggestions.
 
+5. **Generative rewrites (optional)**
+   • With `rewrite=True` every bullet is also rewritten by the fine‑tuned
+     Flan‑T5 model in one batched pass (see `rewriter.py`).
+   • Rewrites are memoised by (normalised bullet, keyword, model version,
+     generation settings) in a memory + SQLite cache; only misses are generated.
+
 Public API
 ----------
 `suggest_resume(resume_text, job_text, top_n_keywords=TOP_N_GAPS)`
     → (markdown_str, missing_keywords)
 
+`suggest_resume(..., rewrite=True)`
+    Same, with a model rewrite under every bullet.
+
+`stream_rewrites(resume_text, job_text, top_n_keywords=TOP_N_GAPS)`
+    → iterator of event dicts: the bullets, then per‑bullet text deltas.
+
 `suggest_edits(resume_text, job_text)`
     Legacy shim returning only the markdown.
 """
@@ -30,11 +42,18 @@ from __future__ import annotations
 
 import logging
 import re
+import zlib
 from collections import Counter
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
-import spacy
-from .config import TOP_N_GAPS
+from functools import lru_cache
+from .config import (
+    TOP_N_GAPS, CLASSIFY_MODEL, HF_MODEL_GENERATION, REWRITE_CACHE_SIZE, REWRITE_CACHE_PATH,
+)
+from .cache import LRUCache, SQLiteCache, TieredCache, make_key, model_version
+from .metrics import BATCH_SIZE, timed
+from .fit_labels import label_names
+from .rewriter import default_settings, get_rewriter
 
 from typing import Tuple, List
 import torch
@@ -42,7 +61,7 @@ import torch.nn.functional as F
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
 # Load model + tokenizer once (can be moved to a global init block)
-_model_path = "models/resume-fit"
+_model_path = CLASSIFY_MODEL
 _tokenizer = AutoTokenizer.from_pretrained(_model_path)
 _model = AutoModelForSequenceClassification.from_pretrained(_model_path)
 _model.eval()
@@ -51,7 +70,7 @@ _model.eval()
 # spaCy setup
 # --------------------------------------------------------------------------- #
 logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
-nlp = spacy.load("en_core_web_sm", disable=["ner"])
+from .parser import nlp    # one shared pipeline per process
 
 # --------------------------------------------------------------------------- #
 # Constants & regexes
@@ -64,6 +83,15 @@ BULLET_RE  = re.compile(r"^[\s]*[•▪\-o\*]")
 CONTACT_RE = re.compile(r"@|https?://|\b\d{3}[-\s]?\d{3}[-\s]?\d{4}\b")
 DIGIT_RE   = re.compile(r"\d")
 
+# Classifier output index → label (see fit_labels.py for the dataset order)
+FIT_LABELS = list(label_names())
+
+# Previously generated suggestion block (stripped before re-analysis)
+_SUGGESTION_BLOCK_RE = re.compile(
+    r"## 🔑 Keywords / Skills to Consider Adding[\s\S]*?## 📄 Revised Resume\n",
+    flags=re.MULTILINE
+)
+
 # Strong action verbs (lower‑case)
 ACTION_VERBS = {
     "achieved","adapted","analyzed","built","captured","collaborated",
@@ -77,6 +105,7 @@ ACTION_VERBS = {
     "saved","scaled","simplified","solved","streamlined","spearheaded",
     "strengthened","tested","trained","transformed","won",
 }
+_SORTED_VERBS = sorted(ACTION_VERBS)
 
 # Mapping cues → verbs to pick tailored verbs
 CUE_TO_VERB = {
@@ -100,13 +129,12 @@ def _looks_like_real_word(w: str) -> bool:
     return True
 
 
-def _keyword_gaps(res: str, job: str, top: int) -> List[str]:
-    """Extract up to top missing keywords (title‑cased)."""
-    res_doc = nlp(res)
-    job_doc = nlp(job)
-    res_lemmas = {t.lemma_.lower() for t in res_doc if t.pos_ in ("NOUN","PROPN")}
+def _noun_lemmas(doc) -> set:
+    return {t.lemma_.lower() for t in doc if t.pos_ in ("NOUN","PROPN")}
+
 
-    candidates = [
+def _keyword_candidates(job_doc) -> List[str]:
+    return [
         tok.text
         for tok in job_doc
         if tok.pos_ in ("NOUN","PROPN")
@@ -114,6 +142,9 @@ def _keyword_gaps(res: str, job: str, top: int) -> List[str]:
         and _looks_like_real_word(tok.text)
     ]
 
+
+def _rank_missing(res_lemmas: set, candidates: List[str], top: int) -> List[str]:
+    """Most frequent candidates the résumé lacks, title-cased."""
     freq = Counter(w.lower() for w in candidates)
     missing: List[str] = []
     for w, _ in freq.most_common():
@@ -124,6 +155,23 @@ def _keyword_gaps(res: str, job: str, top: int) -> List[str]:
     return missing
 
 
+def _missing_keywords(res_lemmas: set, job_doc, top: int) -> List[str]:
+    return _rank_missing(res_lemmas, _keyword_candidates(job_doc), top)
+
+
+@timed("gaps")
+def _keyword_gaps(res: str, job: str, top: int) -> List[str]:
+    """Extract up to top missing keywords (title‑cased)."""
+    return _missing_keywords(_noun_lemmas(nlp(res)), nlp(job), top)
+
+
+@timed("gaps_many")
+def _keyword_gaps_many(res: str, jobs: List[str], top: int) -> List[List[str]]:
+    """_keyword_gaps for one résumé against many jobs; the résumé is parsed once."""
+    res_lemmas = _noun_lemmas(nlp(res))
+    return [_missing_keywords(res_lemmas, doc, top) for doc in nlp.pipe(jobs)]
+
+
 def _contains_word(line: str, word: str) -> bool:
     return re.search(rf"\b{re.escape(word)}\b", line, flags=re.I) is not None
 
@@ -138,8 +186,8 @@ def _pick_action_verb(bullet: str) -> str | None:
     for cue, verb in CUE_TO_VERB.items():
         if cue in low:
             return verb
-    # fallback: pick pseudo‑random by hash
-    return sorted(ACTION_VERBS)[abs(hash(bullet)) % len(ACTION_VERBS)]
+    # fallback: pseudo‑random but stable across processes (hash() is salted per process)
+    return _SORTED_VERBS[zlib.crc32(bullet.encode("utf-8")) % len(_SORTED_VERBS)]
 
 
 def _bullet_notes(line: str, kw: str|None) -> List[str]:
@@ -155,71 +203,167 @@ def _bullet_notes(line: str, kw: str|None) -> List[str]:
         notes.append("split into shorter bullet")
     return notes
 
-def _predict_fit(resume_text: str, job_text: str) -> Tuple[int, float]:
+def _bullet_body(line: str) -> str:
+    """Bullet text without its leading marker."""
+    return BULLET_RE.sub("", line, count=1).strip()
+
+
+def _plan_lines(resume_text: str, keywords: List[str]) -> List[Tuple[str, str|None, bool]]:
+    """
+    Walk the résumé once and decide, per line, which missing keyword (if any)
+    to suggest and whether the line is an editable bullet.
+    Returns (line, keyword, is_bullet) triples in order.
+    """
+    remaining = keywords.copy()
+    plan: List[Tuple[str, str|None, bool]] = []
+
+    for line in resume_text.splitlines():
+        # always skip contact and heading lines
+        if CONTACT_RE.search(line) or line.strip().isupper():
+            plan.append((line, None, False))
+            continue
+
+        # keyword injection only on bullets
+        kw_for_line: str|None = None
+        is_bullet = bool(BULLET_RE.match(line))
+        if remaining and is_bullet:
+            for k in remaining:
+                if not _contains_word(line, k):
+                    kw_for_line = k
+                    remaining.remove(k)
+                    break
+
+        plan.append((line, kw_for_line, is_bullet))
+    return plan
+
+
+@lru_cache(maxsize=1)
+def rewrite_cache() -> TieredCache:
+    return TieredCache(LRUCache(REWRITE_CACHE_SIZE), SQLiteCache(REWRITE_CACHE_PATH))
+
+
+def _rewrite_key(bullet: str, kw: str|None, streaming: bool) -> str:
+    norm = " ".join(bullet.split()).casefold()
+    return make_key(
+        "rewrite", norm, (kw or "").casefold(),
+        model_version(HF_MODEL_GENERATION), default_settings(streaming),
+    )
+
+
+def _rewrite_cached(bullets: List[str], kws: List[str|None]) -> List[str]:
+    """Rewrite bullets, generating only the ones missing from the cache."""
+    cache = rewrite_cache()
+    keys = [_rewrite_key(b, k, streaming=False) for b, k in zip(bullets, kws)]
+    out = [cache.get(key) for key in keys]
+    misses = [i for i, v in enumerate(out) if v is None]
+    if misses:
+        BATCH_SIZE.observe(len(misses), kind="rewrite")
+        texts = get_rewriter().rewrite([bullets[i] for i in misses], [kws[i] for i in misses])
+        for i, text in zip(misses, texts):
+            cache.set(keys[i], text)
+            out[i] = text
+    return out
+
+
+def strip_suggestions(resume_text: str) -> str:
+    """Drop a suggestion block left over from a previous run."""
+    return _SUGGESTION_BLOCK_RE.sub("", resume_text, count=1)
+
+
+@timed("fit_batch")
+def _predict_fit_batch(pairs: List[Tuple[str, str]]) -> List[Tuple[int, float]]:
+    """Classify many (resume, job) pairs in one forward pass, padded to the longest."""
+    if not pairs:
+        return []
+    BATCH_SIZE.observe(len(pairs), kind="fit")
     inputs = _tokenizer(
-        resume_text,
-        job_text,
+        [r for r, _ in pairs],
+        [j for _, j in pairs],
         return_tensors="pt",
         truncation=True,
-        padding="max_length",
+        padding=True,
         max_length=512,
     )
+    return _classify(inputs)
+
+
+@timed("fit_many")
+def _predict_fit_many(resume_text: str, job_texts: List[str]) -> List[Tuple[int, float]]:
+    """
+    _predict_fit_batch for one résumé against many jobs. The résumé is
+    tokenized once and its ids are paired with each job's ids, giving the
+    same inputs as tokenizing every pair from scratch.
+    """
+    if not job_texts:
+        return []
+    BATCH_SIZE.observe(len(job_texts), kind="fit")
+    res_ids = _tokenizer(resume_text, add_special_tokens=False)["input_ids"]
+    job_ids = _tokenizer(list(job_texts), add_special_tokens=False)["input_ids"]
+    features = [
+        _tokenizer.prepare_for_model(res_ids, ids, truncation=True, max_length=512)
+        for ids in job_ids
+    ]
+    return _classify(_tokenizer.pad(features, return_tensors="pt"))
+
+
+def _classify(inputs) -> List[Tuple[int, float]]:
     with torch.no_grad():
         outputs = _model(**inputs)
         probs = F.softmax(outputs.logits, dim=1)
-        predicted_class = torch.argmax(probs, dim=1).item()
-        confidence = probs[0][predicted_class].item()
-    return predicted_class, confidence
+        confidence, predicted_class = probs.max(dim=1)
+    return list(zip(predicted_class.tolist(), confidence.tolist()))
+
+
+@timed("fit")
+def _predict_fit(resume_text: str, job_text: str) -> Tuple[int, float]:
+    return _predict_fit_batch([(resume_text, job_text)])[0]
 
 # --------------------------------------------------------------------------- #
 # Core public API
 # --------------------------------------------------------------------------- #
 
+@timed("suggestions")
 def suggest_resume(
     resume_text: str,
     job_text: str,
     top_n_keywords: int = TOP_N_GAPS,
+    rewrite: bool = False,
+    fit: Tuple[int, float]|None = None,
+    keywords: List[str]|None = None,
 ) -> Tuple[str, List[str]]:
     """
     Generate markdown suggestions and missing keywords list.
+    With rewrite=True each bullet is followed by a model-generated rewrite.
+    Pass fit / keywords when already computed to skip those stages.
     """
     # ——— Strip out any existing suggestion block to avoid duplication ———
-    strip_re = re.compile(
-        r"## 🔑 Keywords / Skills to Consider Adding[\s\S]*?## 📄 Revised Resume\n",
-        flags=re.MULTILINE
-    )
-    resume_text = strip_re.sub("", resume_text, count=1)
+    resume_text = strip_suggestions(resume_text)
 
     # Predict fit score
-    fit_label, fit_conf = _predict_fit(resume_text, job_text)
-    label_names = ["Not a Fit", "Potential Fit", "Good Fit"]  # Adjust to match dataset
-    fit_summary = f"**Model Predict Fit Score:** {label_names[fit_label]} (confidence: {fit_conf:.2f})"
+    fit_label, fit_conf = fit if fit is not None else _predict_fit(resume_text, job_text)
+    fit_summary = f"**Model Predict Fit Score:** {FIT_LABELS[fit_label]} (confidence: {fit_conf:.2f})"
 
-    keywords = _keyword_gaps(resume_text, job_text, top_n_keywords)
-    remaining = keywords.copy()
-    out: List[str] = []
+    if keywords is None:
+        keywords = _keyword_gaps(resume_text, job_text, top_n_keywords)
+    plan = _plan_lines(resume_text, keywords)
 
-    for line in resume_text.splitlines():
-        # always skip contact and heading lines
-        if CONTACT_RE.search(line) or line.strip().isupper():
-            out.append(line)
-            continue
+    rewrites: Dict[int, str] = {}
+    if rewrite:
+        targets = [(i, _bullet_body(line), kw) for i, (line, kw, is_bullet) in enumerate(plan) if is_bullet]
+        if targets:
+            texts = _rewrite_cached([b for _, b, _ in targets], [k for _, _, k in targets])
+            rewrites = {i: t for (i, _, _), t in zip(targets, texts)}
 
-        # keyword injection only on bullets
-        kw_for_line: str|None = None
-        if remaining and BULLET_RE.match(line):
-            for k in remaining:
-                if not _contains_word(line, k):
-                    kw_for_line = k
-                    remaining.remove(k)
-                    break
-
-        notes = _bullet_notes(line, kw_for_line) if BULLET_RE.match(line) else []
+    out: List[str] = []
+    for i, (line, kw_for_line, is_bullet) in enumerate(plan):
+        notes = _bullet_notes(line, kw_for_line) if is_bullet else []
 
         if notes:
             out.append(f"{line}  [{'; '.join(notes)}]")
         else:
             out.append(line)
+        if rewrites.get(i):
+            out.append(f"    Suggested rewrite: {rewrites[i]}")
 
     # build markdown
     header = ["## 🔍 Resume Fit Evaluation", fit_summary, ""]
@@ -234,6 +378,49 @@ def suggest_resume(
     return md, keywords
 
 
+def stream_rewrites(
+    resume_text: str,
+    job_text: str,
+    top_n_keywords: int = TOP_N_GAPS,
+) -> Iterator[Dict]:
+    """
+    Progressive bullet rewrites for CLI/API consumers.
+
+    Yields `{"event": "bullets", "bullets": [...], "keywords": [...]}` first,
+    then `{"event": "token", "index": i, "text": delta}` while decoding and
+    `{"event": "done", "index": i}` as each bullet finishes.
+    """
+    resume_text = strip_suggestions(resume_text)
+    keywords = _keyword_gaps(resume_text, job_text, top_n_keywords)
+    targets = [(_bullet_body(line), kw) for line, kw, is_bullet in _plan_lines(resume_text, keywords) if is_bullet]
+
+    yield {"event": "bullets", "bullets": [b for b, _ in targets], "keywords": keywords}
+
+    # cached rewrites are emitted at once; only misses go through the model
+    cache = rewrite_cache()
+    keys = [_rewrite_key(b, k, streaming=True) for b, k in targets]
+    misses: List[int] = []
+    for i, key in enumerate(keys):
+        text = cache.get(key)
+        if text is None:
+            misses.append(i)
+            continue
+        yield {"event": "token", "index": i, "text": text}
+        yield {"event": "done", "index": i}
+    if not misses:
+        return
+
+    partial: Dict[int, str] = {}
+    for chunk in get_rewriter().stream([targets[i][0] for i in misses], [targets[i][1] for i in misses]):
+        i = misses[chunk.index]
+        if chunk.done:
+            cache.set(keys[i], partial.get(i, "").strip())
+            yield {"event": "done", "index": i}
+        else:
+            partial[i] = partial.get(i, "") + chunk.text
+            yield {"event": "token", "index": i, "text": chunk.text}
+
+
 def suggest_edits(resume_text: str, job_text: str) -> str:
     """Shim for CLI/Streamlit: returns only markdown."""
     md, _ = suggest_resume(resume_text, job_text)
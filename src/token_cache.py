@@ -0,0 +1,71 @@
+"""
+On-disk cache of tokenized 🤗 datasets for the classifier scripts.
+
+Tokenized splits are saved as Arrow under `TOKEN_CACHE_DIR`, keyed by the
+tokenizer, `max_length` and the source dataset fingerprint.
+`datasets.load_from_disk` memory-maps those files, so repeated runs skip
+preprocessing entirely and keep the token ids out of the Python heap.
+
+Sequences are *not* padded here: pair this with `DataCollatorWithPadding`
+(pad per batch) and `group_by_length=True` (batch similar lengths together),
+using the `length` column this module adds.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from datasets import Dataset, load_from_disk
+
+from .config import TOKEN_CACHE_DIR
+
+LENGTH_COLUMN = "length"
+
+
+def cache_key(tokenizer, max_length: int, fingerprint: str) -> str:
+    """Stable key for (tokenizer, max_length, dataset state)."""
+    meta = {
+        "tokenizer": tokenizer.name_or_path,
+        "class": type(tokenizer).__name__,
+        "vocab": len(tokenizer),
+        "max_length": max_length,
+        "data": fingerprint,
+    }
+    return hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def tokenize_pairs_cached(
+    ds: Dataset,
+    tokenizer,
+    first: str = "resume",
+    second: str = "job_description",
+    max_length: int = 512,
+    cache_dir: Path = TOKEN_CACHE_DIR,
+) -> Dataset:
+    """
+    Tokenize (first, second) text pairs with truncation but no padding,
+    drop the raw text columns and add a `length` column.
+    Returns a memory-mapped dataset, building the cache on first use.
+    """
+    slug = re.sub(r"[^\w.-]+", "_", tokenizer.name_or_path).strip("_")
+    path = Path(cache_dir) / f"{slug}-{max_length}-{cache_key(tokenizer, max_length, ds._fingerprint)}"
+
+    if not path.exists():
+        def preprocess(examples):
+            enc = tokenizer(
+                examples[first],
+                examples[second],
+                truncation=True,
+                max_length=max_length,
+            )
+            enc[LENGTH_COLUMN] = [len(ids) for ids in enc["input_ids"]]
+            return enc
+
+        tokenized = ds.map(preprocess, batched=True, remove_columns=[first, second])
+        tmp = path.with_name(path.name + ".tmp")
+        tokenized.save_to_disk(str(tmp))
+        tmp.rename(path)
+
+    return load_from_disk(str(path))
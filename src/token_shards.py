@@ -0,0 +1,150 @@
+"""
+Pre-tokenized seq2seq shards for `train_finetune.py`.
+
+`write_token_shards` streams records out of (possibly sharded) JSONL files,
+tokenizes them in batches and appends the ids to flat int32 files.  An
+int64 offsets array marks where each record starts, so record *i* is the
+slice `ids[offsets[i]:offsets[i + 1]]`.  `TokenShards` opens those files with
+`np.memmap`, so a training run touches only the rows it samples and never
+holds the corpus in the Python heap.
+
+Nothing is padded on disk: `DataCollatorForSeq2Seq` pads each batch.
+
+Layout of a shard directory::
+
+    meta.json          tokenizer, max_len, record count, sources
+    input_ids.i32      concatenated encoder ids
+    input_ids.off      int64 offsets, len = count + 1
+    labels.i32         concatenated target ids
+    labels.off         int64 offsets, len = count + 1
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+FIELDS = ("input_ids", "labels")
+
+
+def shard_paths(pattern: str | Path) -> list[Path]:
+    """Expand a file, directory or glob into a sorted list of JSONL shards."""
+    p = Path(pattern)
+    if p.is_dir():
+        return sorted(p.glob("*.jsonl"))
+    return sorted(Path(x) for x in glob.glob(str(pattern)))
+
+
+def iter_jsonl(paths: Iterable[Path]) -> Iterator[dict]:
+    """Lazily yield records from each JSONL shard in turn."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def count_records(paths: Iterable[Path]) -> int:
+    """Number of non-blank lines across all shards, without parsing JSON."""
+    total = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            total += sum(1 for line in f if line.strip())
+    return total
+
+
+def shard_dir_for(base: Path, tokenizer, max_len: int, paths: list[Path]) -> Path:
+    """Cache directory keyed by tokenizer, max_len and the source shards' size/mtime."""
+    meta = {
+        "tokenizer": tokenizer.name_or_path,
+        "vocab": len(tokenizer),
+        "max_len": max_len,
+        "sources": [(str(p), p.stat().st_size, p.stat().st_mtime_ns) for p in paths],
+    }
+    key = hashlib.sha1(json.dumps(meta, sort_keys=True).encode()).hexdigest()[:16]
+    return Path(base) / f"seq2seq-{max_len}-{key}"
+
+
+def write_token_shards(
+    paths: list[Path],
+    tokenizer,
+    out_dir: Path,
+    max_len: int,
+    batch_size: int = 1024,
+) -> Path:
+    """
+    One-time pass: tokenize every record's input/target (truncated to max_len)
+    and write the flat id + offset files described in the module docstring.
+    """
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    offsets = {k: [0] for k in FIELDS}
+    files = {k: open(tmp / f"{k}.i32", "wb") for k in FIELDS}
+
+    def flush(inputs: list[str], targets: list[str]):
+        enc = tokenizer(inputs, max_length=max_len, truncation=True, text_target=targets)
+        for k in FIELDS:
+            for ids in enc[k]:
+                files[k].write(np.asarray(ids, dtype=np.int32).tobytes())
+                offsets[k].append(offsets[k][-1] + len(ids))
+
+    try:
+        inputs, targets = [], []
+        for rec in iter_jsonl(paths):
+            inputs.append(rec["input"])
+            targets.append(rec["target"])
+            if len(inputs) >= batch_size:
+                flush(inputs, targets)
+                inputs, targets = [], []
+        if inputs:
+            flush(inputs, targets)
+    finally:
+        for f in files.values():
+            f.close()
+
+    for k in FIELDS:
+        np.asarray(offsets[k], dtype=np.int64).tofile(tmp / f"{k}.off")
+    meta = {
+        "tokenizer": tokenizer.name_or_path,
+        "max_len": max_len,
+        "count": len(offsets["input_ids"]) - 1,
+        "sources": [str(p) for p in paths],
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    tmp.rename(out_dir)
+    return out_dir
+
+
+class TokenShards:
+    """Read-only, memory-mapped view over a directory written by `write_token_shards`."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        self.meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        self._ids = {}
+        self._off = {}
+        for k in FIELDS:
+            self._off[k] = np.fromfile(path / f"{k}.off", dtype=np.int64)
+            # np.memmap refuses empty files, which an empty corpus produces
+            size = int(self._off[k][-1])
+            self._ids[k] = np.memmap(path / f"{k}.i32", dtype=np.int32, mode="r") if size \
+                else np.empty(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._off["input_ids"]) - 1
+
+    def lengths(self, field: str = "input_ids") -> np.ndarray:
+        return np.diff(self._off[field])
+
+    def __getitem__(self, i: int) -> dict:
+        out = {}
+        for k in FIELDS:
+            lo, hi = self._off[k][i], self._off[k][i + 1]
+            out[k] = self._ids[k][lo:hi]
+        return out
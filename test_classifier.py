@@ -2,8 +2,10 @@ from datasets import load_dataset, ClassLabel
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
     Trainer,
 )
+from src.token_cache import tokenize_pairs_cached
 from sklearn.metrics import accuracy_score, classification_report
 import numpy as np
 
@@ -21,20 +23,7 @@ ds = ds.rename_column("resume_text", "resume") \
 if not isinstance(ds.features["labels"], ClassLabel):
     ds = ds.class_encode_column("labels")
 
-def preprocess(examples):
-    return tokenizer(
-        examples["resume"],
-        examples["job_description"],
-        truncation=True,
-        padding="max_length",
-        max_length=512,
-    )
-
-ds = ds.map(
-    preprocess,
-    batched=True,
-    remove_columns=["resume", "job_description"],
-)
+ds = tokenize_pairs_cached(ds, tokenizer, max_length=512)
 
 # Define compute_metrics function
 def compute_metrics(eval_pred):
@@ -47,6 +36,7 @@ def compute_metrics(eval_pred):
 trainer = Trainer(
     model=model,
     tokenizer=tokenizer,
+    data_collator=DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8),
     compute_metrics=compute_metrics
 )
 
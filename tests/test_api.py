@@ -0,0 +1,54 @@
+import base64
+import time
+
+from fastapi.testclient import TestClient
+
+from backend import api
+from backend.executor import StageExecutor
+from backend.jobs import JobStore, JobWorkerPool
+from src.cache import LRUCache, TieredCache
+
+
+def test_identical_score_requests_hit_the_response_cache(monkeypatch):
+    calls = []
+
+    def run_analysis(resume_bytes, resume_name, job_bytes, job_name, stages, incremental, cascade, deadline):
+        calls.append(cascade)
+        return {"stages": list(stages), "tf_idf_score": 0.5}
+
+    executor = StageExecutor("thread", max_workers=1, max_queue=4)
+    monkeypatch.setattr(api, "executor", executor)
+    monkeypatch.setattr(api, "response_cache", TieredCache(LRUCache(8)))
+    monkeypatch.setattr(api, "_run_analysis", run_analysis)
+    client = TestClient(api.app)
+    files = {"resume": ("cv.txt", b"python sql"), "job": ("job.txt", b"data engineer")}
+    try:
+        first = client.post("/score", files=files)
+        second = client.post("/score", files=files)
+        other = client.post("/score", files=files, params={"cascade": "true"})
+    finally:
+        executor.shutdown()
+    assert [r.headers["X-Cache"] for r in (first, second, other)] == ["miss", "hit", "miss"]
+    assert second.json() == first.json() and calls == [False, True]
+
+
+def test_unreadable_upload_fails_only_its_own_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "analyze_batch", lambda pairs, stages: [{"job": job} for _, job in pairs])
+    store = JobStore(tmp_path / "jobs.sqlite", result_ttl=60)
+
+    def payload(job: bytes) -> dict:
+        return {"resume": base64.b64encode(b"python sql").decode(), "resume_name": "cv.txt",
+                "job": base64.b64encode(job).decode(), "job_name": "job.txt"}
+
+    ids = [store.submit("similarity", payload(job)) for job in (b"first", b"\xff\xfe not utf-8", b"third")]
+    pool = JobWorkerPool(store, api._run_job_batch, workers=1, batch_size=8, poll_interval=0.01)
+    pool.start()
+    deadline = time.time() + 5
+    while any(store.get(i)["status"] in ("queued", "running") for i in ids) and time.time() < deadline:
+        time.sleep(0.01)
+    pool.stop()
+
+    good, bad, other = (store.get(i) for i in ids)
+    assert (good["status"], good["result"]) == ("done", {"job": "first"})
+    assert (other["status"], other["result"]) == ("done", {"job": "third"})
+    assert bad["status"] == "failed" and bad["error"].startswith("UnicodeDecodeError")
@@ -0,0 +1,26 @@
+import random
+
+from backend.parsing import parse_data
+from src.bench import _compare, _write_database
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = [
+        {"stage": "parse_data", "size": "small", "p50_ms": 100.0},
+        {"stage": "read_txt", "size": "small", "p50_ms": 0.1},
+    ]
+    results = [
+        {"stage": "parse_data", "size": "small", "p50_ms": 130.0},
+        {"stage": "read_txt", "size": "small", "p50_ms": 0.3},      # 3x, but under min_delta_ms
+        {"stage": "pipeline", "size": "small", "p50_ms": 999.0},    # no baseline yet
+    ]
+    regressions = _compare(results, baseline, threshold=0.2, min_delta_ms=1.0)
+    assert [(r["stage"], round(r["ratio"], 2)) for r in regressions] == [("parse_data", 1.3)]
+    assert _compare(results, baseline, threshold=0.5, min_delta_ms=1.0) == []
+
+
+def test_synthetic_database_parses(tmp_path):
+    root = _write_database(tmp_path, 5, random.Random(0))
+    data = parse_data(root)
+    assert len(data) == 5
+    assert all(entry["skills"] and entry["experience"] for entry in data.values())
@@ -0,0 +1,57 @@
+from src.cache import LRUCache, SQLiteCache, TieredCache, make_key
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(tmp_path / "c.sqlite")
+    cache = TieredCache(LRUCache(2), disk)
+    key = make_key("rewrite", "led team", "", {"num_beams": 1})
+    cache.set(key, "Led a team of 5")
+
+    fresh = TieredCache(LRUCache(2), SQLiteCache(tmp_path / "c.sqlite"))
+    assert fresh.get(key) == "Led a team of 5"
+    assert fresh.get(key) == "Led a team of 5"
+    assert fresh.get("missing") is None
+    assert fresh.stats == {"memory_hits": 1, "disk_hits": 1, "misses": 1}
+
+
+def test_lru_evicts_least_recent():
+    lru = LRUCache(2)
+    lru.set("a", 1); lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert lru.get("b") is None and lru.get("a") == 1 and len(lru) == 2
+
+
+def _set_in_child(disk):
+    disk.set("from-child", [1, 2])
+
+
+def test_sqlite_cache_reopens_after_fork(tmp_path):
+    import multiprocessing
+    disk = SQLiteCache(tmp_path / "c.sqlite")
+    disk.set("from-parent", 1)
+    child = multiprocessing.get_context("fork").Process(target=_set_in_child, args=(disk,))
+    child.start(); child.join()
+    assert child.exitcode == 0
+    assert disk.get("from-child") == [1, 2] and disk.get("from-parent") == 1
+
+
+def test_ttl_expires_both_tiers(tmp_path, monkeypatch):
+    import src.cache as cache_mod
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    lru, disk = LRUCache(4, ttl=10), SQLiteCache(tmp_path / "c.sqlite", ttl=10)
+    lru.set("k", 1); disk.set("k", 1)
+    now[0] += 5
+    assert lru.get("k") == 1 and disk.get("k") == 1
+    now[0] += 6
+    assert lru.get("k") is None and disk.get("k") is None
+
+
+def test_sqlite_prune_keeps_newest(tmp_path):
+    disk = SQLiteCache(tmp_path / "c.sqlite", max_entries=3)
+    for i in range(5):
+        disk.set(f"k{i}", i)
+    disk.prune()
+    assert len(disk) == 3 and disk.get("k0") is None and disk.get("k4") == 4
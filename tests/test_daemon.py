@@ -0,0 +1,28 @@
+import threading
+import time
+
+import pytest
+
+from src import daemon
+
+
+def test_call_without_daemon_returns_none(tmp_path):
+    assert daemon.call("ping", tmp_path / "none.sock") is None
+
+
+def test_round_trip_and_shutdown(tmp_path):
+    sock = tmp_path / "d.sock"
+    ops = {"ping": lambda: 1, "analyze": lambda resume_text, job_text: {"n": len(resume_text + job_text)}}
+    t = threading.Thread(target=daemon.serve, args=(sock, ops), daemon=True)
+    t.start()
+    for _ in range(100):
+        if sock.exists():
+            break
+        time.sleep(0.01)
+
+    assert daemon.call("analyze", sock, resume_text="ab", job_text="c") == {"n": 3}
+    with pytest.raises(daemon.DaemonError):
+        daemon.call("nope", sock)
+    daemon.call("shutdown", sock)
+    t.join(timeout=5)
+    assert not t.is_alive() and not sock.exists()
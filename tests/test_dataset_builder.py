@@ -0,0 +1,19 @@
+from src.dataset_builder import _entry_to_text, find_near_duplicates
+
+
+def test_near_duplicates_are_clustered():
+    base = {"name": "Data Engineer",
+            "skills": ["Python", "SQL", "Spark", "Airflow", "Kafka", "dbt", "Snowflake", "Terraform"],
+            "abilities": ["Built ETL pipelines for daily finance reporting across three regions",
+                          "Tuned slow warehouse queries and cut dashboard load times in half",
+                          "Mentored two junior engineers through code review and pairing"]}
+    # one skill swapped: shingle Jaccard with base ≈ 0.87
+    twin = dict(base, skills=["Python", "SQL", "Spark", "Airflow", "Kafka", "dbt", "BigQuery", "Terraform"])
+    # same role and first ability, different stack and history: Jaccard ≈ 0.18
+    cousin = dict(base, skills=["Java", "Scala", "Spark", "Hadoop"],
+                  abilities=base["abilities"][:1] + ["Led migration of batch jobs to streaming",
+                                                     "Owned on-call rotation for the data platform"])
+    other = {"name": "Nurse", "skills": ["Patient care", "Triage"],
+             "abilities": ["Administered medication on a busy ward"]}
+    texts = [_entry_to_text(e) for e in (base, twin, cousin, other)]
+    assert find_near_duplicates(texts, threshold=0.8) == [[0, 1], [2], [3]]
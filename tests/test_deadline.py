@@ -0,0 +1,97 @@
+import math
+import pickle
+import time
+
+import pytest
+
+from src.deadline import NO_DEADLINE, Deadline, DeadlineExceeded, StageCosts
+
+
+def test_deadline_budget_and_timeouts():
+    assert NO_DEADLINE.remaining() == math.inf and NO_DEADLINE.timeout(10) == 10
+    d = Deadline.after_ms(50)
+    assert d.allows(0.01) and not d.allows(1) and d.timeout(10) <= 0.05
+    d = pickle.loads(pickle.dumps(d))
+    time.sleep(0.06)
+    assert d.expired and d.timeout(10) == 0.001
+    with pytest.raises(DeadlineExceeded):
+        d.check("test")
+
+
+def test_stage_costs_start_from_priors():
+    costs = StageCosts({"fit": 200})
+    assert costs.estimate("fit") == 0.2 and costs.estimate("other") == 0.0
+    costs.observe("fit", 0.1)
+    assert 0.1 < costs.estimate("fit") < 0.2
+    costs.observe("gaps", 0.05)
+    assert costs.estimate("gaps") == 0.05
+
+
+def test_pdf_extraction_stops_at_deadline(tmp_path):
+    from fpdf import FPDF
+    from src.data_loader import read_file
+
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)
+    for i in range(3):
+        pdf.add_page()
+        pdf.cell(0, 10, f"page {i}")
+    path = tmp_path / "r.pdf"
+    pdf.output(str(path))
+
+    assert "page 2" in read_file(path, Deadline.after_ms(10_000))
+    with pytest.raises(DeadlineExceeded):
+        read_file(path, Deadline.after_ms(0))
+
+
+def _stub_models(monkeypatch):
+    from src import pipeline
+    from src.config import STAGE_COST_PRIORS_MS
+
+    class Similarity:
+        def score(self, resume, job):
+            return 0.4, 0.6
+
+        def score_batch(self, pairs):
+            return [self.score(*p) for p in pairs]
+
+    monkeypatch.setattr(pipeline, "COSTS", StageCosts(STAGE_COST_PRIORS_MS))
+    monkeypatch.setattr(pipeline, "get_similarity", lambda: Similarity())
+    monkeypatch.setattr(pipeline, "_predict_fit", lambda resume, job: (2, 0.9))
+    monkeypatch.setattr(pipeline, "_predict_fit_many", lambda resume, jobs: [(2, 0.9)] * len(jobs))
+    monkeypatch.setattr(pipeline, "_keyword_gaps", lambda resume, job, n: ["airflow"])
+    monkeypatch.setattr(pipeline, "_keyword_gaps_many", lambda resume, jobs, n: [["airflow"]] * len(jobs))
+    return pipeline
+
+
+def test_analysis_out_of_time_keeps_similarity(monkeypatch):
+    pipeline = _stub_models(monkeypatch)
+    analysis = pipeline.Analysis("python sql", "data engineer", deadline=Deadline.after_ms(0))
+    out = analysis.result(["similarity", "fit", "gaps", "suggestions"])
+    assert (out["tf_idf_score"], out["sbert_score"]) == (0.4, 0.6)
+    assert "predicted_class" not in out and "missing_keywords" not in out
+    assert analysis.timed_out == ["fit", "gaps", "suggestions"]
+    assert out["skipped_stages"] == ["fit", "gaps", "suggestions"] and out["degraded"] is True
+
+    out = pipeline.Analysis("python sql", "data engineer", deadline=Deadline.after_ms(60_000)).result(["fit", "gaps"])
+    assert out["fit_confidence"] == 0.9 and out["missing_keywords"] == ["airflow"]
+    assert out["skipped_stages"] == [] and out["degraded"] is False
+
+
+def test_analyze_many_skips_batched_stages_out_of_time(monkeypatch):
+    pipeline = _stub_models(monkeypatch)
+    results = pipeline.analyze_many("python sql", ["job a", "job b"], deadline=Deadline.after_ms(0))
+    assert [r["sbert_score"] for r in results] == [0.6, 0.6]
+    assert all(r["skipped_stages"] == ["fit", "gaps"] and r["degraded"] for r in results)
+    assert not any("predicted_class" in r for r in results)
+
+
+def test_degraded_responses_are_not_cached(monkeypatch):
+    from backend import api
+    from src.cache import LRUCache, TieredCache
+
+    monkeypatch.setattr(api, "response_cache", TieredCache(LRUCache(8)))
+    api._run_and_store("full", lambda: {"degraded": False})
+    api._run_and_store("partial", lambda: {"degraded": True})
+    assert api.response_cache.get("full") == {"degraded": False}
+    assert api.response_cache.get("partial") is None
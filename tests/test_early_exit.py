@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.early_exit import ExitGate, choose_threshold, evaluate_gate, fit_gate
+
+NAMES = ["Good Fit", "No Fit", "Potential Fit"]     # class_encode_column order
+
+
+def _data(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 3, n)
+    centre = {0: (0.35, 0.75), 1: (0.05, 0.2), 2: (0.2, 0.5)}
+    x = np.array([centre[y] for y in labels]) + rng.normal(scale=0.05, size=(n, 2))
+    return x, labels
+
+
+def test_gate_exits_on_confident_extremes(tmp_path):
+    x, y = _data()
+    gate = fit_gate(x, y, NAMES)
+    assert (gate.reject_class, gate.accept_class) == (1, 0)
+    assert np.allclose(gate.proba(x).sum(axis=1), 1)
+
+    gate.reject_threshold = gate.accept_threshold = 0.9
+    gate = ExitGate.load(gate.save(tmp_path / "gate.json"))
+    assert gate.label_names == NAMES
+    reject, accept = gate.decide(0.0, 0.1), gate.decide(0.4, 0.85)
+    assert (reject["decision"], reject["fit_level"]) == ("reject", "No Fit")
+    assert (accept["decision"], accept["fit_level"]) == ("accept", "Good Fit")
+    assert gate.decide(0.2, 0.5)["decision"] == "continue"
+
+
+def test_thresholds_meet_precision_target():
+    x, y = _data(seed=1)
+    gate = fit_gate(x, y, NAMES)
+    p = gate.proba(x)
+    gate.reject_threshold = choose_threshold(p[:, 1], y == 1, 0.97)
+    gate.accept_threshold = choose_threshold(p[:, 0], y == 0, 0.97)
+    report = evaluate_gate(gate, x, y, classifier=y)
+    assert report["reject_precision"] >= 0.97 and report["accept_precision"] >= 0.97
+    assert 0 < report["exit_rate"] < 1
+    assert report["cascade_accuracy"] >= 0.97 * report["exit_rate"]
+    assert choose_threshold(np.full(10, 0.6), np.zeros(10, bool), 0.9) > 1
+
+
+def test_cascade_reject_is_reported_as_no_fit(monkeypatch):
+    from src import pipeline
+
+    class Similarity:
+        def score(self, resume, job):
+            return 0.0, 0.1
+
+    x, y = _data()
+    gate = fit_gate(x, y, NAMES)
+    gate.reject_threshold = gate.accept_threshold = 0.9
+    monkeypatch.setattr(pipeline, "get_similarity", lambda: Similarity())
+    monkeypatch.setattr(pipeline, "get_gate", lambda: gate)
+    out = pipeline.Analysis("resume", "job", cascade=True).result(["similarity", "fit"])
+    assert (out["fit_level"], out["fit_source"]) == ("No Fit", "cascade")
+    assert out["predicted_class"] == NAMES.index("No Fit")
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.executor import Overloaded, StageExecutor
+
+
+def test_rejects_beyond_workers_plus_queue():
+    ex = StageExecutor("thread", max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(ex.run(gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert (ex.in_flight, ex.queued) == (2, 1)
+        with pytest.raises(Overloaded):
+            await ex.run(gate.wait)
+        gate.set()
+        await asyncio.gather(*running)
+        assert await ex.run(sum, [1, 2]) == 3
+
+    asyncio.run(scenario())
+    ex.shutdown()
+
+
+def test_stream_holds_one_slot_until_exhausted():
+    ex = StageExecutor("thread", max_workers=1, max_queue=0)
+
+    def numbers(n):
+        for i in range(n):
+            yield i
+
+    async def scenario():
+        stream = ex.open_stream(numbers, 3)
+        assert ex.in_flight == 1
+        with pytest.raises(Overloaded):
+            ex.open_stream(numbers, 1)
+        assert [i async for i in stream] == [0, 1, 2]
+        assert ex.in_flight == 0
+
+        stream = ex.open_stream(numbers, 3)
+        assert await stream.__anext__() == 0
+        await stream.aclose()
+        assert ex.in_flight == 0
+
+    asyncio.run(scenario())
+    ex.shutdown()
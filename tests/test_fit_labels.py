@@ -0,0 +1,32 @@
+import json
+
+from src.fit_labels import DATASET_LABELS, fit_rank, label_names
+
+
+def _model_dir(path, id2label=None):
+    path.mkdir()
+    if id2label is not None:
+        (path / "config.json").write_text(json.dumps({"id2label": id2label}), encoding="utf-8")
+    return str(path)
+
+
+def test_names_come_from_id2label_or_dataset_order(tmp_path):
+    assert label_names(_model_dir(tmp_path / "none")) == DATASET_LABELS
+    default = {"0": "LABEL_0", "1": "LABEL_1", "2": "LABEL_2"}
+    assert label_names(_model_dir(tmp_path / "default", default)) == DATASET_LABELS
+    named = {"2": "Good Fit", "0": "No Fit", "1": "Potential Fit"}
+    assert label_names(_model_dir(tmp_path / "named", named)) == ("No Fit", "Potential Fit", "Good Fit")
+
+
+def test_rank_follows_label_names_not_ids():
+    good, no, potential = (DATASET_LABELS.index(n) for n in ("Good Fit", "No Fit", "Potential Fit"))
+    assert fit_rank(good, DATASET_LABELS) > fit_rank(potential, DATASET_LABELS) > fit_rank(no, DATASET_LABELS)
+
+
+def test_batch_ranking_puts_good_fit_first():
+    from src.pipeline import FIT_LABELS, _rank_key
+
+    results = [{"predicted_class": FIT_LABELS.index(name), "sbert_score": 0.5}
+               for name in ("Potential Fit", "No Fit", "Good Fit")]
+    ranked = sorted(results, key=_rank_key, reverse=True)
+    assert [FIT_LABELS[r["predicted_class"]] for r in ranked] == ["Good Fit", "Potential Fit", "No Fit"]
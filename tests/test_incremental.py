@@ -0,0 +1,38 @@
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from src.incremental import IncrementalAnalyzer, split_sections
+
+RESUME = "\n".join(
+    ["EXPERIENCE"]
+    + [f"- built pipeline number {i} in python and sql" for i in range(40)]
+    + ["SKILLS", "python, sql"]
+)
+JOB = "data engineer python sql airflow"
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.append(len(texts))
+        vecs = [np.random.default_rng(len(t)).normal(size=8) for t in texts]
+        return np.stack([v / np.linalg.norm(v) for v in vecs])
+    return encode
+
+
+def test_sections_round_trip():
+    sections = split_sections(RESUME)
+    assert len(sections) > 2
+    assert "\n".join(sections) == RESUME
+
+
+def test_tfidf_matches_full_fit_and_edits_reembed_locally():
+    calls = []
+    inc = IncrementalAnalyzer(encode=_encoder(calls))
+    tf, _ = inc.similarity(RESUME, JOB)
+    m = TfidfVectorizer(stop_words="english").fit_transform([RESUME, JOB])
+    assert abs(tf - cosine_similarity(m[0], m[1])[0, 0]) < 1e-9
+
+    first = calls[0]
+    inc.similarity(RESUME.replace("number 7 ", "number 7 with spark "), JOB)
+    assert first == len(split_sections(RESUME)) and calls[2:] == [1]
@@ -0,0 +1,26 @@
+import time
+
+from backend.jobs import JobStore, JobWorkerPool
+
+
+def test_compatible_jobs_run_as_one_batch(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite", result_ttl=60)
+    batches = []
+
+    def handler(kind, payloads):
+        batches.append((kind, len(payloads)))
+        return [{"echo": p["n"]} for p in payloads]
+
+    ids = [store.submit("similarity,fit", {"n": n}) for n in range(3)]
+    other = store.submit("gaps", {"n": 9})
+
+    pool = JobWorkerPool(store, handler, workers=1, batch_size=8, poll_interval=0.01)
+    pool.start()
+    deadline = time.time() + 5
+    while store.get(other)["status"] != "done" and time.time() < deadline:
+        time.sleep(0.01)
+    pool.stop()
+
+    assert batches == [("similarity,fit", 3), ("gaps", 1)]
+    assert [store.get(i)["result"] for i in ids] == [{"echo": 0}, {"echo": 1}, {"echo": 2}]
+    assert store.get("nope") is None
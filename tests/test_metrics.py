@@ -0,0 +1,39 @@
+import pytest
+
+from src import metrics
+
+
+def test_timed_records_latency_and_errors():
+    @metrics.timed("unit_ok")
+    def ok(x):
+        return x * 2
+
+    @metrics.timed("unit_fail")
+    def fail():
+        raise RuntimeError("boom")
+
+    assert ok(3) == 6
+    with pytest.raises(RuntimeError):
+        fail()
+    assert metrics.STAGE_SECONDS.count(stage="unit_ok") == 1
+    assert metrics.STAGE_SECONDS.count(stage="unit_fail") == 1
+    assert metrics.STAGE_ERRORS.value(stage="unit_fail") == 1
+    assert ok.__name__ == "ok"
+
+
+def test_render_prometheus_text():
+    h = metrics.Histogram("unit_sizes", "sizes", ["kind"], buckets=(1, 4))
+    h.observe(1, kind="a")
+    h.observe(3, kind="a")
+    h.observe(9, kind="a")
+    metrics.gauge("unit_depth", "depth", lambda: 5)
+    metrics.gauge("unit_hits", "hits", lambda: {"memory": 2, "misses": 1}, label="result")
+
+    text = metrics.render()
+    assert "# TYPE unit_sizes histogram" in text
+    assert 'unit_sizes_bucket{kind="a",le="1"} 1' in text
+    assert 'unit_sizes_bucket{kind="a",le="4"} 2' in text
+    assert 'unit_sizes_bucket{kind="a",le="+Inf"} 3' in text
+    assert 'unit_sizes_sum{kind="a"} 13' in text
+    assert "unit_depth 5" in text
+    assert 'unit_hits{result="memory"} 2' in text
@@ -1,7 +1,29 @@
-from src.parser import Resume
+import pickle
+
+from src.parser import Resume, load_corpus, save_corpus
 
 def test_tokenization_and_skills():
     doc = Resume("Python developer. C++ guru.")
     assert "python" in doc.tokens
     assert "developer" in doc.tokens
-    assert any(s.lower().startswith("c++") for s in doc.skills)
\ No newline at end of file
+    assert any(s.lower().startswith("c++") for s in doc.skills)
+
+def test_pickle_and_corpus_round_trip(tmp_path):
+    docs = [Resume("Python developer. C++ guru."), Resume("Built SQL pipelines.")]
+    clone = pickle.loads(pickle.dumps(docs[0]))
+    assert type(clone) is Resume
+    assert (clone.tokens, clone.skills) == (docs[0].tokens, docs[0].skills)
+
+    loaded = load_corpus(save_corpus(docs, tmp_path), mmap=True)
+    assert [(d.tokens, d.skills) for d in loaded] == [(d.tokens, d.skills) for d in docs]
+
+def test_shared_string_table_is_capped(monkeypatch):
+    from src import parser
+
+    monkeypatch.setattr(parser, "STRING_TABLE_MAX", 5)
+    monkeypatch.setattr(parser, "STRINGS", parser.StringTable())
+    first = Resume("Python developer. C++ guru.")
+    tokens = first.tokens
+    second = Resume("Built SQL pipelines.")
+    assert first.strings is not second.strings and second.strings is parser.STRINGS
+    assert first.tokens == tokens and pickle.loads(pickle.dumps(first)).tokens == tokens
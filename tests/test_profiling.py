@@ -0,0 +1,32 @@
+import pstats
+
+from src.profiling import StageProfiler
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_stages_and_dumps(tmp_path):
+    prof = StageProfiler(enabled=True, dump=tmp_path / "run", interval=0.001)
+    with prof:
+        with prof.stage("alloc"):
+            blob = [bytes(1024) for _ in range(2048)]
+        with prof.stage("busy"):
+            _busy(300_000)
+    del blob
+
+    assert [r["stage"] for r in prof.records] == ["alloc", "busy"]
+    assert prof.records[0]["peak_py_mb"] >= 2
+    assert all(r["wall_ms"] > 0 for r in prof.records)
+    stats = pstats.Stats(str(tmp_path / "run.pstats"))
+    assert any(fn[2] == "_busy" for fn in stats.stats)
+    collapsed = (tmp_path / "run.collapsed").read_text()
+    assert "_busy" in collapsed and collapsed.splitlines()[0].rsplit(" ", 1)[1].isdigit()
+
+
+def test_disabled_records_nothing():
+    prof = StageProfiler()
+    with prof, prof.stage("x"):
+        pass
+    assert prof.records == []
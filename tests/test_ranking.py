@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.fit_labels import DATASET_LABELS
+from src.ranking import BM25, Cascade, CascadeConfig, evaluate
+
+TEXTS = [
+    "python developer building kubernetes operators",
+    "java developer spring services",
+    "python data scientist pandas sklearn",
+    "kubernetes site reliability engineer terraform",
+    "retail store manager scheduling staff",
+]
+VOCAB = ["python", "kubernetes", "java", "pandas", "terraform", "retail"]
+# class ids by number of matched keywords, in the dataset's alphabetical label order
+FIT_IDS = [DATASET_LABELS.index(n) for n in ("No Fit", "Potential Fit", "Good Fit")]
+
+
+class FakeCascade(Cascade):
+    """Bag-of-words 'embeddings' and a keyword 'classifier', so no models load."""
+
+    def _encode(self, texts):
+        v = np.array([[t.count(w) for w in VOCAB] for t in texts], dtype=float) + 1e-6
+        return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+    def _fit(self, pairs):
+        self.fit_calls = getattr(self, "fit_calls", 0) + len(pairs)
+        return [(FIT_IDS[int("python" in r) + int("kubernetes" in r)], 0.5) for r, _ in pairs]
+
+
+def test_bm25_prefers_matching_terms():
+    scores = BM25(TEXTS).scores("kubernetes terraform")
+    assert int(np.argmax(scores)) == 3
+    assert scores[4] == 0
+
+
+def test_cascade_scores_fit_only_on_survivors():
+    c = FakeCascade([str(i) for i in range(len(TEXTS))], TEXTS, CascadeConfig(lexical_k=4, semantic_k=3, fit_k=2))
+    r = c.rank("python kubernetes")
+    assert r.ids[0] == "0"
+    assert len(r.ids) == 3 and c.fit_calls == 2
+    assert set(r.timings_ms) == {"lexical", "semantic", "fit"}
+
+
+def test_budget_truncates_and_evaluate_reports_recall():
+    c = FakeCascade([str(i) for i in range(len(TEXTS))], TEXTS, CascadeConfig(lexical_k=5, semantic_k=5, fit_k=5))
+    r = c.rank("python", CascadeConfig(semantic_ms=0))
+    assert r.truncated == ["semantic"]
+    report = evaluate(c, [{"job": "python kubernetes", "relevant": ["0"]}], k=1)
+    assert report["recall_cascade"] == report["recall_exhaustive"] == 1.0
+    assert report["recall_loss"] == 0.0
+
+
+def test_good_fit_outranks_potential_fit():
+    c = FakeCascade([str(i) for i in range(len(TEXTS))], TEXTS, CascadeConfig(lexical_k=5, semantic_k=5, fit_k=5))
+    # the data scientist matches as many query terms, but is only a potential fit
+    r = c.rank("python pandas kubernetes")
+    assert r.ids[:2] == ["0", "2"]
+    assert r.scores["0"]["fit_class"] == DATASET_LABELS.index("Good Fit")
+    assert c.exhaustive("python pandas kubernetes")[0] == "0"
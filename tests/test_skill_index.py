@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src.skill_index import QueryError, SkillIndex, parse_query, vbyte_decode, vbyte_encode
+
+DATA = {
+    101: {"name": "A", "skills": ["Python", "Kubernetes"], "abilities": ["Machine Learning"], "experience": []},
+    102: {"name": "B", "skills": ["Python"], "abilities": [], "experience": [{"title": "Data Intern", "firm": "X"}]},
+    103: {"name": "C", "skills": ["Java", "Kubernetes"], "abilities": [], "experience": []},
+    104: {"name": "D", "skills": ["C++"], "abilities": ["machine vision"], "experience": []},
+}
+
+
+def test_vbyte_round_trip():
+    ids = np.array([0, 1, 127, 128, 16384, 2**21 + 5, 2**31], dtype=np.uint64)
+    code = vbyte_encode(ids)
+    assert code.dtype == np.uint8 and len(code) < ids.nbytes
+    assert vbyte_decode(code).tolist() == ids.tolist()
+
+
+def test_boolean_queries(tmp_path):
+    SkillIndex.build(DATA).save(tmp_path)
+    idx = SkillIndex.load(tmp_path)
+    assert isinstance(idx.postings, np.memmap)
+    assert idx.search("python AND kubernetes") == [101]
+    assert idx.search("python NOT intern") == [101]
+    assert idx.search("java OR c++") == [103, 104]
+    assert idx.search('"machine learning"') == [101]
+    assert idx.search("(python OR java) AND NOT kubernetes") == [102]
+
+
+def test_query_errors():
+    assert parse_query("a b") == ("and", [("term", "a"), ("term", "b")])
+    for bad in ("", "python AND", "(python", 'python "ml'):
+        with pytest.raises(QueryError):
+            parse_query(bad)
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_fallback_verb_is_stable_across_hash_seeds():
+    # no cue word, so the verb comes from the checksum fallback
+    code = "from src.suggester import _pick_action_verb; print(_pick_action_verb('Handled the weekly payroll run'))"
+    verbs = {
+        subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, env=dict(os.environ, PYTHONHASHSEED=seed),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        for seed in ("1", "2")
+    }
+    assert len(verbs) == 1 and verbs != {"None"}
@@ -0,0 +1,25 @@
+import json
+
+from src.token_shards import TokenShards, count_records, write_token_shards
+
+
+class _WordTokenizer:
+    """Stand-in tokenizer: one id per whitespace-separated word."""
+    name_or_path = "words"
+
+    def __call__(self, texts, max_length, truncation, text_target):
+        ids = lambda t: [len(w) for w in t.split()][:max_length]
+        return {"input_ids": [ids(t) for t in texts], "labels": [ids(t) for t in text_target]}
+
+
+def test_shards_roundtrip(tmp_path):
+    src = tmp_path / "pairs-0.jsonl"
+    rows = [{"input": "a bb ccc", "target": "dddd"}, {"input": "ee", "target": "f gg hhh iiii"}]
+    src.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+
+    out = write_token_shards([src], _WordTokenizer(), tmp_path / "shards", max_len=3, batch_size=1)
+    shards = TokenShards(out)
+    assert count_records([src]) == len(shards) == 2
+    assert shards[0]["input_ids"].tolist() == [1, 2, 3]
+    assert shards[1]["labels"].tolist() == [1, 2, 3]
+    assert shards.lengths().tolist() == [3, 1]
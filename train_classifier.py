@@ -4,9 +4,11 @@ from datasets import load_dataset, ClassLabel
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
     TrainingArguments,
     Trainer,
 )
+from src.token_cache import tokenize_pairs_cached, LENGTH_COLUMN
 
 # 1. Load the HF dataset
 ds = load_dataset("cnamuangtoun/resume-job-description-fit", split="train")
@@ -20,23 +22,9 @@ ds = ds.rename_column("resume_text", "resume") \
 if not isinstance(ds.features["labels"], ClassLabel):
     ds = ds.class_encode_column("labels")
 
-# 4. Tokenize inputs (and drop raw text fields)
+# 4. Tokenize inputs once (cached as memory-mapped Arrow, no padding)
 tok = AutoTokenizer.from_pretrained("distilbert-base-uncased")
-
-def preprocess(examples):
-    return tok(
-        examples["resume"],
-        examples["job_description"],
-        truncation=True,
-        padding="max_length",
-        max_length=512,
-    )
-
-ds = ds.map(
-    preprocess,
-    batched=True,
-    remove_columns=["resume", "job_description"],
-)
+ds = tokenize_pairs_cached(ds, tok, max_length=512)
 
 # 5. Split into train/test once
 split = ds.train_test_split(test_size=0.1, seed=42)
@@ -45,10 +33,14 @@ test_ds  = split["test"]
 
 # 6. Prepare model and training arguments
 num_labels = ds.features["labels"].num_classes
+label_names = ds.features["labels"].names
 
+# save the class names with the model: ids are alphabetical, not ordered by fit (src/fit_labels.py)
 model = AutoModelForSequenceClassification.from_pretrained(
     "distilbert-base-uncased",
     num_labels=num_labels,
+    id2label=dict(enumerate(label_names)),
+    label2id={name: i for i, name in enumerate(label_names)},
 )
 
 args = TrainingArguments(
@@ -59,6 +51,8 @@ args = TrainingArguments(
     logging_steps=500,
     num_train_epochs=5,
     save_total_limit=1,
+    group_by_length=True,     # batch similar lengths → little padding
+    length_column_name=LENGTH_COLUMN,
 )
 
 trainer = Trainer(
@@ -67,6 +61,7 @@ trainer = Trainer(
     train_dataset=train_ds,
     eval_dataset=test_ds,
     tokenizer=tok,
+    data_collator=DataCollatorWithPadding(tok, pad_to_multiple_of=8),
 )
 
 # 7. Train and save
@@ -8,11 +8,14 @@ Lightweight fine-tuning on resume–job pairs for rapid iteration:
 - Larger batch size, single accumulation
 - Single epoch and partial dataset
 - Disabled generation during eval
+- Records are pre-tokenized once into memory-mapped int32 shards
+  (see src/token_shards.py) and padded per batch by the collator;
+  STREAM=True instead tokenizes lazily while reading sharded JSONL
 """
-import json
 import random
+import zlib
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, IterableDataset, get_worker_info
 from transformers import (
     AutoTokenizer,
     AutoModelForSeq2SeqLM,
@@ -21,6 +24,10 @@ from transformers import (
     DataCollatorForSeq2Seq,
 )
 import logging
+from src.config import TOKEN_CACHE_DIR
+from src.token_shards import (
+    TokenShards, count_records, iter_jsonl, shard_dir_for, shard_paths, write_token_shards,
+)
 
 # ——— LOGGING —————————————————————————————————–––––––
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -28,64 +35,79 @@ logger = logging.getLogger(__name__)
 
 # ——— CONFIG —————————————————————————————————–––––––
 MODEL_ID   = "google/flan-t5-small"  # smaller model
-DATA_PATH  = "data/pairs.jsonl"
+DATA_PATH  = "data/pairs.jsonl"       # file, directory or glob of JSONL shards
 MAX_LEN    = 512                     # shorter sequences
 TRAIN_FRAC = 0.01                     # subset of data
 BATCH_SIZE = 8                       # larger batch
 EPOCHS     = 1                       # single epoch
 LR         = 4e-5
+STREAM     = False                   # tokenize on the fly instead of pre-tokenized shards
 
 # ——— DEVICE —————————————————————————————————–––––––
 DEVICE = "cuda" if torch.cuda.is_available() else (
          "mps" if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available() else "cpu")
 logger.info(f"Using device: {DEVICE}")
 
-# ——— LOAD DATA —————————————————————————————————–––––––
-def load_records(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [json.loads(line) for line in f]
-
-records = load_records(DATA_PATH)
-N = len(records)
-logger.info(f"Total records: {N}")
-
-# ——— SPLIT —————————————————————————————————–––––––
-idxs = list(range(N)); random.seed(42); random.shuffle(idxs)
-split = int(N * TRAIN_FRAC)
-train_idx, eval_idx = idxs[:split], idxs[split:]
-logger.info(f"Train: {len(train_idx)}, Eval: {len(eval_idx)}")
-
 # ——— TOKENIZER & MODEL —————————————————————————————————–––––––
 tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
 model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_ID).to(DEVICE)
 model.config.pad_token_id = tokenizer.pad_token_id
 
-# ——— DATASET —————————————————————————————————–––––––
-class Seq2SeqDataset(Dataset):
-    def __init__(self, idxs, records, tokenizer, max_len):
-        self.inputs = [records[i]['input'] for i in idxs]
-        self.targets = [records[i]['target'] for i in idxs]
+# ——— DATASETS —————————————————————————————————–––––––
+def in_train_split(i: int) -> bool:
+    """Deterministic TRAIN_FRAC sample that needs no index list or shuffle."""
+    return zlib.crc32(i.to_bytes(8, "little")) % 10_000 < TRAIN_FRAC * 10_000
+
+class JsonlStream(IterableDataset):
+    """Reads sharded JSONL lazily and tokenizes each record as it goes (no padding)."""
+    def __init__(self, paths, tokenizer, max_len):
+        self.paths = paths
         self.tokenizer = tokenizer
         self.max_len = max_len
+    def __iter__(self):
+        info = get_worker_info()
+        wid, nw = (info.id, info.num_workers) if info else (0, 1)
+        for i, rec in enumerate(iter_jsonl(self.paths)):
+            if i % nw != wid or not in_train_split(i):
+                continue
+            yield dict(self.tokenizer(
+                rec['input'],
+                max_length=self.max_len,
+                truncation=True,
+                text_target=rec['target'],
+            ))
+
+class PretokenizedDataset(Dataset):
+    """Map-style view over memory-mapped token shards (no padding)."""
+    def __init__(self, shards, idxs):
+        self.shards = shards
+        self.idxs = idxs
     def __len__(self):
-        return len(self.inputs)
+        return len(self.idxs)
     def __getitem__(self, i):
-        inp, tgt = self.inputs[i], self.targets[i]
-        enc = self.tokenizer(
-            inp,
-            max_length=self.max_len,
-            truncation=True,
-            padding='max_length',
-            return_tensors='pt',
-            text_target=tgt
-        )
-        # fast-tokenizer provides labels; else fallback
-        if 'labels' not in enc:
-            enc['labels'] = self.tokenizer(tgt, max_length=self.max_len, truncation=True, padding='max_length')['input_ids']
-        return {k:v.squeeze(0) for k,v in enc.items()}
+        row = self.shards[self.idxs[i]]
+        ids = row['input_ids'].tolist()
+        return {'input_ids': ids, 'attention_mask': [1] * len(ids), 'labels': row['labels'].tolist()}
+
+paths = shard_paths(DATA_PATH)
+logger.info(f"JSONL shards: {len(paths)}")
 
-train_dataset = Seq2SeqDataset(train_idx, records, tokenizer, MAX_LEN)
-eval_dataset  = Seq2SeqDataset(eval_idx, records, tokenizer, MAX_LEN)
+if STREAM:
+    n_train = sum(1 for i in range(count_records(paths)) if in_train_split(i))
+    train_dataset = JsonlStream(paths, tokenizer, MAX_LEN)
+    max_steps = max(1, -(-n_train // BATCH_SIZE) * EPOCHS)   # IterableDataset has no len()
+else:
+    shard_dir = shard_dir_for(TOKEN_CACHE_DIR, tokenizer, MAX_LEN, paths)
+    if not shard_dir.exists():
+        logger.info(f"Pre-tokenizing into {shard_dir}")
+        write_token_shards(paths, tokenizer, shard_dir, MAX_LEN)
+    shards = TokenShards(shard_dir)
+    train_idx = [i for i in range(len(shards)) if in_train_split(i)]
+    random.seed(42); random.shuffle(train_idx)
+    train_dataset = PretokenizedDataset(shards, train_idx)
+    n_train = len(train_dataset)
+    max_steps = -1
+logger.info(f"Train: {n_train}")
 
 # ——— TRAINING ARGS —————————————————————————————————–––––––
 training_args = Seq2SeqTrainingArguments(
@@ -93,6 +115,7 @@ training_args = Seq2SeqTrainingArguments(
     per_device_train_batch_size=BATCH_SIZE,
     gradient_accumulation_steps=1,
     num_train_epochs=EPOCHS,
+    max_steps=max_steps,
     learning_rate=LR,
     eval_strategy="no",                  # skip eval
     predict_with_generate=False,          # speed up
@@ -103,6 +126,7 @@ training_args = Seq2SeqTrainingArguments(
 )
 
 # ——— COLLATOR & TRAINER —————————————————————————————————–––––––
+# pads input_ids/labels per batch, so no row is padded to MAX_LEN
 collator = DataCollatorForSeq2Seq(tokenizer, model=model, label_pad_token_id=-100)
 trainer = Seq2SeqTrainer(
     model=model,